@@ -7,13 +7,9 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
 
 try:
-    from config import Config
-    from file_scanner import file_scanner
-    from token_manager import token_manager
+    from warm_cache import get_scan_summary
 except ImportError:
-    Config = None
-    file_scanner = None
-    token_manager = None
+    get_scan_summary = None
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
@@ -28,11 +24,12 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error_response(400, "Question is required")
                 return
             
-            # Get real data from OneDrive to provide accurate responses
-            if file_scanner:
-                scan_result = file_scanner.scan_all_folders()
-                real_data = scan_result["extracted_data"]
+            # Get real data from OneDrive to provide accurate responses (served from the warm cache when fresh)
+            if get_scan_summary:
+                scan_result = get_scan_summary()
+                real_data = dict(scan_result["extracted_data"])
                 real_data["total_files"] = scan_result.get("total_items", 0)
+                real_data["file_count"] = scan_result.get("total_items", 0)
                 real_data["data_source"] = scan_result.get("data_source", "onedrive")
             else:
                 real_data = self._get_fallback_data()
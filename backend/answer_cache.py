@@ -0,0 +1,252 @@
+"""
+Answer caches
+Exact-match LRU cache of bot answers keyed on the normalized question, the LLM
+provider/model and the version of the data the answer was built from, plus a
+semantic cache that also matches paraphrased questions
+"""
+
+import re
+import time
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from config import Config
+from embeddings import HashingEmbedder, embedder, tokenize
+from search_index import CATEGORY_KEYWORDS
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Everyday operations vocabulary; any other word (a name, place, account or id) is an anchor that a
+# cached question must share exactly, since swapping one barely moves the embedding of a long question
+_COMMON_TERMS = set(tokenize(" ".join(
+    list(Config.DATA_CATEGORIES) + [keyword for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords]
+))) | {
+    "count", "many", "much", "status", "details", "detail", "how", "all", "every", "each", "get", "find", "see",
+    "this", "last", "next", "previous", "current", "month", "week", "quarter", "year", "day", "today", "date",
+    "closed", "active", "pending", "new", "billed", "allocated", "assigned", "expired", "expiring", "due",
+    "people", "team", "member", "manager", "name", "role", "skill", "level", "location", "office", "hold",
+    "held", "done", "completed", "certification", "trainee", "engineer", "summary", "report", "percentage",
+    "percent", "average", "rate", "per", "by", "between", "over", "under", "more", "less", "than", "most",
+    "least", "top", "where", "when", "why", "who", "whose", "will", "should", "their", "they", "them", "his",
+    "her", "not", "no", "yes", "doe", "which", "expire", "expiry", "from", "into", "about", "been", "being", "did", "does", "doing", "in",
+}
+
+
+def anchor_terms(question: str) -> frozenset:
+    """Words of a question outside the everyday vocabulary: numbers, names, places, accounts and ids"""
+    return frozenset(term for term in tokenize(question) if term not in _COMMON_TERMS or any(c.isdigit() for c in term))
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", question.lower())).strip()
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (created, response, categories)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(question: str, provider: str, model: str, data_version: str) -> Tuple[str, str, str, str]:
+        return (normalize_question(question), provider, model, data_version)
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Get a cached response if present and not expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple, response: Dict[str, Any], categories: List[str]):
+        """Cache a response, tagged with the categories it was built from"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response, frozenset(categories))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_categories(self, categories: List[str]) -> int:
+        """Drop every answer built from any of the given categories"""
+        changed = set(categories)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[2] & changed or not entry[2]]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
+
+
+class SemanticCache:
+    def __init__(self, question_embedder: HashingEmbedder, max_entries: int, threshold: float, ttl_seconds: int):
+        self.embedder = question_embedder
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        # One row per slot; free or invalidated slots are zero vectors and never match
+        self._matrix = np.zeros((max_entries, question_embedder.dim), dtype=np.float32)
+        self._entries = [None] * max_entries  # slot -> entry dict
+        self._next_slot = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, question: str, provider: str, model: str,
+               current_version: Callable[[List[str]], str]) -> Optional[Dict[str, Any]]:
+        """Find the most similar cached answer above the threshold that is still valid for current data"""
+        vector = self.embedder.embed(question)
+        anchors = anchor_terms(question)
+        now = time.monotonic()
+        with self._lock:
+            scores = self._matrix @ vector
+            # Best candidates first; only a few ever need the validity checks
+            for slot in np.argsort(-scores)[:5]:
+                similarity = float(scores[slot])
+                if similarity < self.threshold:
+                    break
+                entry = self._entries[slot]
+                # "bench in Pune" and "bench in Delhi" embed alike; the anchors tell them apart
+                if (entry is None or entry["anchors"] != anchors or now - entry["created"] > self.ttl_seconds
+                        or entry["provider"] != provider or entry["model"] != model
+                        or entry["data_version"] != current_version(entry["categories"])):
+                    continue
+                self.hits += 1
+                return dict(entry["response"], similarity=round(similarity, 4), matched_question=entry["question"])
+            self.misses += 1
+            return None
+
+    def put(self, question: str, provider: str, model: str, response: Dict[str, Any],
+            categories: List[str], data_version: str):
+        """Store an answer, overwriting the oldest slot once full"""
+        vector = self.embedder.embed(question)
+        with self._lock:
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.max_entries
+            self._matrix[slot] = vector
+            self._entries[slot] = {
+                "question": question,
+                "anchors": anchor_terms(question),
+                "provider": provider,
+                "model": model,
+                "response": response,
+                "categories": list(categories),
+                "data_version": data_version,
+                "created": time.monotonic()
+            }
+
+    def invalidate_categories(self, categories: List[str]) -> int:
+        """Drop every answer built from any of the given categories"""
+        changed = set(categories)
+        dropped = 0
+        with self._lock:
+            for slot, entry in enumerate(self._entries):
+                if entry and (changed & set(entry["categories"]) or not entry["categories"]):
+                    self._entries[slot] = None
+                    self._matrix[slot] = 0
+                    dropped += 1
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": sum(1 for entry in self._entries if entry),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "matrix_bytes": self._matrix.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Paraphrase test set: (cached question, incoming question, should match)
+SEMANTIC_EVAL_CASES = [
+    ("how many people are on bench", "bench count", True),
+    ("how many people are on bench", "how many on bench?", True),
+    ("how many people are on bench", "number of benched engineers", True),
+    ("how many open RRFs are there", "open rrf count", True),
+    ("how many open RRFs are there", "number of open RRFs", True),
+    ("list AWS certifications", "show AWS certs", True),
+    ("what is the utilization this month", "utilization this month?", True),
+    ("how many trainees are in training", "trainee count in training", True),
+    ("how many people are on bench", "how many people are in training", False),
+    ("how many open RRFs are there", "how many closed RRFs are there", False),
+    ("list AWS certifications", "list Azure certifications", False),
+    ("what is the utilization this month", "what was the utilization last month", False),
+    ("how many people are on bench", "who is on bench for account X", False),
+    ("how many trainees are in training", "how many certifications are there", False),
+    ("how many people are on bench in Pune", "bench count in Pune", True),
+    # Long questions that differ only in a name, place or id
+    ("how many people are on bench in the Pune office this month and what are their skills",
+     "how many people are on bench in the Delhi office this month and what are their skills", False),
+    ("how many open RRFs are there for the Acme account this quarter by skill",
+     "how many open RRFs are there for the Globex account this quarter by skill", False),
+    ("which certifications does John Smith hold and when do they expire",
+     "which certifications does Jane Smith hold and when do they expire", False),
+    ("what is the utilization of employee 10423 this month", "what is the utilization of employee 10424 this month", False),
+]
+
+
+def evaluate_semantic_cache(cases: List[Tuple[str, str, bool]] = None, threshold: float = None) -> Dict[str, Any]:
+    """Measure hit rate on paraphrases and false-hit rate on different questions"""
+    cases = cases or SEMANTIC_EVAL_CASES
+    threshold = threshold if threshold is not None else Config.SEMANTIC_CACHE_THRESHOLD
+    results = []
+    for cached_question, question, should_match in cases:
+        cache = SemanticCache(embedder, 4, threshold, 60)
+        cache.put(cached_question, "eval", "eval", {"answer": cached_question}, [], "v")
+        matched = cache.lookup(question, "eval", "eval", lambda categories: "v") is not None
+        results.append((should_match, matched))
+
+    positives = [matched for should_match, matched in results if should_match]
+    negatives = [matched for should_match, matched in results if not should_match]
+    return {
+        "threshold": threshold,
+        "cases": len(results),
+        "hit_rate": round(sum(positives) / len(positives), 4) if positives else None,
+        "false_hit_rate": round(sum(negatives) / len(negatives), 4) if negatives else None
+    }
+
+
+# Global answer cache instances
+answer_cache = AnswerCache(Config.ANSWER_CACHE_MAX_ENTRIES, Config.ANSWER_CACHE_TTL_SECONDS)
+semantic_cache = SemanticCache(
+    embedder,
+    Config.SEMANTIC_CACHE_MAX_ENTRIES,
+    Config.SEMANTIC_CACHE_THRESHOLD,
+    Config.ANSWER_CACHE_TTL_SECONDS
+)
+
+if __name__ == "__main__":
+    for threshold in (0.7, 0.75, 0.8, 0.85, 0.9):
+        print(evaluate_semantic_cache(threshold=threshold))
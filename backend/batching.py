@@ -0,0 +1,71 @@
+"""
+Async micro-batching
+Collects items submitted by concurrent callers for a short window and sends
+them upstream in one call, routing each result back to its caller
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+class MicroBatcher:
+    def __init__(self, send_batch: Callable[[List[Any]], Awaitable[List[Any]]], max_batch: int, max_wait_ms: float):
+        self.send_batch = send_batch
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []  # (item, future) in submission order
+        self._timer = None
+        self._tasks = set()  # in-flight send tasks; the loop only keeps weak references to them
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result from the batch it ends up in"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        """Hand the pending items to a send task; called when the batch is full or the window ends"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that gave up while waiting are dropped before sending
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        self._pending = []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[tuple]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.send_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch returned {len(results)} results for {len(batch)} inputs")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "pending": len(self._pending),
+            "in_flight": len(self._tasks),
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else None
+        }
@@ -1,92 +1,225 @@
 # Operations Bot Logic
+import os
+import re
 import json
+import base64
+import hashlib
 import asyncio
+import tempfile
+import threading
+import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-from config import Config, get_default_model
+from config import Config
 from onedrive import OneDriveClient
-from extractor import extract_file, get_file_summary
-from llm import LLMClient
+from extractor import extract_file, summarize_extraction
+from digest import build_digest
+from column_stats import attach_stats, payload_stats, total_rows, value_count
+from llm import ProviderChain
+from cache import payload_cache, file_version
+from metrics import metrics
+from answer_cache import answer_cache, semantic_cache
+from resilience import llm_limiter
+from search_index import SearchIndex
+from row_index import RowIndex, sheet_tables
+from sql_engine import SQLEngine, format_aggregate_answer
+from intents import IntentAggregates, intent_classifier
+from vector_index import VectorIndex
+from entity_index import EntityIndex
+from joins import JoinViews
+
+# Dashboard metrics read from the column statistics
+_STATUS_COLUMN = re.compile(r"status|stage|state", re.IGNORECASE)
+_OPEN_STATUS = re.compile(r"^(open|active|in progress|pending)$", re.IGNORECASE)
+_PROJECT_COLUMN = re.compile(r"project|account|client", re.IGNORECASE)
 
 class OperationsBot:
     def __init__(self):
-        # Initialize LLM client with provider configuration
-        model = Config.LLM_MODEL or get_default_model(Config.LLM_PROVIDER)
-        self.llm_client = LLMClient(
-            provider=Config.LLM_PROVIDER,
-            api_key=Config.LLM_API_KEY,
-            model=model,
-            endpoint=Config.LLM_ENDPOINT
-        )
+        # Initialize LLM clients with the configured provider failover chain
+        self.llm_client = ProviderChain.from_config()
         self.onedrive_client = OneDriveClient(Config.ONEDRIVE_ACCESS_TOKEN)
         self.cache = {}
         self.last_scan = None
+        self._scan_lock = threading.Lock()
+        self.scan_cache_hits = 0
+        self.scan_cache_misses = 0
+        self.search_index = SearchIndex()
+        self.row_index = RowIndex()
+        self.sql_engine = SQLEngine()
+        self.aggregates = IntentAggregates()
+        self.vector_index = VectorIndex()
+        self.entity_index = EntityIndex()
+        self.join_views = JoinViews()
+        self.indexed_files = {}  # file_id -> (category, file name, version) the indexes were built from
+        self.last_index_update = None
         
     async def scan_all_data(self) -> Dict[str, Any]:
         """Scan all categories and extract data"""
         if self._is_cache_valid():
+            self.scan_cache_hits += 1
             return self.cache.get('scan_data', {})
         
-        scan_results = {}
-        total_files = 0
+        self.scan_cache_misses += 1
+        # Scanning does blocking network and file IO, keep it off the event loop
+        return await asyncio.to_thread(self.rescan, True)
+    
+    def rescan(self, if_stale: bool = False) -> Dict[str, Any]:
+        """Scan all categories; with if_stale, callers that waited for another scan reuse its result"""
+        with self._scan_lock:
+            if if_stale and self._is_cache_valid():
+                return self.cache['scan_data']
+            scan_results = {}
+            for category in Config.DATA_CATEGORIES:
+                scan_results[category] = self._scan_category(category)
+            return self._publish_scan(scan_results)
+    
+    def refresh_category(self, category: str) -> Dict[str, Any]:
+        """Rescan a single category and merge it into the cached scan data"""
+        if not self.is_ready:
+            return self.rescan()
         
-        for category in Config.DATA_CATEGORIES:
-            try:
-                folder_path = f"{Config.ONEDRIVE_BASE_FOLDER}/{category}"
-                files = self.onedrive_client.list_files(folder_path)
-                
-                category_data = {
-                    "folder_path": folder_path,
-                    "files": files,
-                    "file_count": len(files),
-                    "last_scan": datetime.now().isoformat()
-                }
-                
-                # Extract data from files
-                extracted_data = {}
-                for file_info in files:
-                    try:
-                        # Download and extract file
-                        temp_path = f"temp_{file_info['id']}"
-                        self.onedrive_client.download_file(file_info['id'], temp_path)
-                        
-                        # Get file summary first
-                        summary = get_file_summary(temp_path)
-                        extracted_data[file_info['name']] = {
-                            "file_info": file_info,
-                            "summary": summary
-                        }
-                        
-                        # Clean up temp file
-                        import os
-                        if os.path.exists(temp_path):
-                            os.remove(temp_path)
-                            
-                    except Exception as e:
-                        extracted_data[file_info['name']] = {
-                            "file_info": file_info,
-                            "error": str(e)
-                        }
-                
-                category_data["extracted_data"] = extracted_data
-                scan_results[category] = category_data
-                total_files += len(files)
-                
-            except Exception as e:
-                scan_results[category] = {
-                    "folder_path": f"{Config.ONEDRIVE_BASE_FOLDER}/{category}",
-                    "files": [],
-                    "file_count": 0,
-                    "error": str(e),
-                    "last_scan": datetime.now().isoformat()
-                }
+        with self._scan_lock:
+            scan_results = dict(self.cache['scan_data'].get('scan_results', {}))
+            scan_results[category] = self._scan_category(category)
+            return self._publish_scan(scan_results)
+    
+    def refresh_files(self, file_ids: List[str], full_rescan: bool = False) -> List[str]:
+        """Re-extract changed drive items by refreshing the categories that contain them"""
+        file_categories = self._file_categories()
+        for file_id in file_ids:
+            payload_cache.invalidate(file_id)
         
-        # Cache the results
-        self.cache['scan_data'] = scan_results
-        self.cache['last_scan'] = datetime.now()
-        self.last_scan = datetime.now()
+        # New files (or notifications without an item id) can't be located, so rescan
+        # every category; unchanged files are served from the payload cache
+        if full_rescan or any(file_id not in file_categories for file_id in file_ids):
+            categories = list(Config.DATA_CATEGORIES)
+        else:
+            categories = sorted({file_categories[file_id] for file_id in file_ids})
+        
+        for category in categories:
+            self.refresh_category(category)
+        return categories
+    
+    def warm_file(self, file_id: str) -> bool:
+        """Make sure a file's payload is in memory, re-extracting it if needed"""
+        for category_data in self.cache.get('scan_data', {}).get('scan_results', {}).values():
+            for file_info in category_data.get("files", []):
+                if file_info.get("id") == file_id:
+                    self._extract_file(file_info)
+                    return True
+        return False
+    
+    def invalidate(self, category: str = None, file_id: str = None) -> Dict[str, Any]:
+        """Drop cached payloads of a single file or of every file in a category, with everything built from them"""
+        file_ids = [file_id] if file_id else []
+        if category:
+            category_data = self.cache.get('scan_data', {}).get('scan_results', {}).get(category, {})
+            file_ids.extend(f.get("id") for f in category_data.get("files", []))
+        
+        invalidated = [fid for fid in file_ids if fid and payload_cache.invalidate(fid)]
+        
+        # Indexes forget the files too, then the categories are refreshed to re-extract and re-index them
+        categories = {category} if category else set()
+        file_categories = self._file_categories()
+        for fid in file_ids:
+            indexed = self.indexed_files.pop(fid, None)
+            if indexed or fid in file_categories:
+                categories.add(indexed[0] if indexed else file_categories[fid])
+            for index in (self.search_index, self.row_index, self.sql_engine, self.aggregates,
+                          self.vector_index, self.entity_index):
+                index.remove_file(fid)
+        if categories:
+            answer_cache.invalidate_categories(list(categories))
+            semantic_cache.invalidate_categories(list(categories))
+            # Category versions do not move when the same files are re-extracted, so views are rebuilt explicitly
+            self.join_views.forget(categories)
+        
+        refreshed, errors = [], {}
+        if self.is_ready:
+            for name in sorted(categories):
+                try:
+                    self.refresh_category(name)
+                    refreshed.append(name)
+                except Exception as e:
+                    errors[name] = str(e)
+        return {
+            "requested": len(file_ids),
+            "invalidated": invalidated,
+            "refreshed": refreshed,
+            # Files of these categories stay out of the indexes until their next scan
+            "deferred": errors
+        }
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get scan cache, snapshot and per-category cache statistics"""
+        now = datetime.now()
+        categories = {}
+        for category, category_data in self.cache.get('scan_data', {}).get('scan_results', {}).items():
+            last_scan = category_data.get("last_scan")
+            try:
+                age_seconds = round((now - datetime.fromisoformat(last_scan)).total_seconds(), 1)
+            except (TypeError, ValueError):
+                age_seconds = None
+            files = category_data.get("files", [])
+            categories[category] = {
+                "file_count": category_data.get("file_count", 0),
+                "payloads_in_memory": sum(1 for f in files if payload_cache.in_memory(f.get("id"))),
+                "last_scan": last_scan,
+                "age_seconds": age_seconds,
+                "error": category_data.get("error")
+            }
         
+        lookups = self.scan_cache_hits + self.scan_cache_misses
+        snapshot_exists = bool(Config.SNAPSHOT_PATH) and os.path.exists(Config.SNAPSHOT_PATH)
         return {
+            "scan_cache": {
+                "valid": self._is_cache_valid(),
+                "last_scan": self.last_scan.isoformat() if self.last_scan else None,
+                "hits": self.scan_cache_hits,
+                "misses": self.scan_cache_misses,
+                "hit_rate": round(self.scan_cache_hits / lookups, 4) if lookups else 0.0,
+                "ttl_hours": Config.CACHE_DURATION_HOURS
+            },
+            "snapshot": {
+                "path": Config.SNAPSHOT_PATH,
+                "exists": snapshot_exists,
+                "bytes": os.path.getsize(Config.SNAPSHOT_PATH) if snapshot_exists else 0
+            },
+            "search_index": self.search_index.stats(),
+            "row_index": self.row_index.stats(),
+            "sql_engine": self.sql_engine.stats(),
+            "intent_aggregates": self.aggregates.stats(),
+            "vector_index": self.vector_index.stats(),
+            "entity_index": self.entity_index.stats(),
+            "join_views": self.join_views.stats(),
+            "index_update": self.last_index_update,
+            "categories": categories
+        }
+    
+    def _file_categories(self) -> Dict[str, str]:
+        """Map every known file id to its category"""
+        file_categories = {}
+        for category, category_data in self.cache.get('scan_data', {}).get('scan_results', {}).items():
+            for file_info in category_data.get("files", []):
+                file_categories[file_info.get("id")] = category
+        return file_categories
+    
+    def _publish_scan(self, scan_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the scan summary, swap it into the cache and persist a snapshot"""
+        total_files = sum(category_data["file_count"] for category_data in scan_results.values())
+        
+        # Version every category so answers built from changed data are dropped
+        previous = self.cache.get('scan_data', {}).get('scan_results', {})
+        changed = []
+        for category, category_data in scan_results.items():
+            category_data["version"] = self._category_version(category_data)
+            if previous.get(category, {}).get("version") != category_data["version"]:
+                changed.append(category)
+        if changed:
+            answer_cache.invalidate_categories(changed)
+            semantic_cache.invalidate_categories(changed)
+        
+        result = {
             "scan_results": scan_results,
             "summary": {
                 "total_categories": len(Config.DATA_CATEGORIES),
@@ -95,28 +228,313 @@ class OperationsBot:
                 "categories": {cat: scan_results[cat]["file_count"] for cat in scan_results}
             }
         }
+        
+        self._update_indexes(scan_results)
+        
+        # Cache the results
+        self.cache['scan_data'] = result
+        self.cache['last_scan'] = datetime.now()
+        self.last_scan = datetime.now()
+        self.save_snapshot()
+        
+        return result
+    
+    def _update_indexes(self, scan_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Bring every index up to date with the scanned files; only added, changed and removed files are touched"""
+        started = time.perf_counter()
+        current = {}
+        for category, category_data in scan_results.items():
+            for file_name, entry in category_data.get("extracted_data", {}).items():
+                file_id = entry.get("file_info", {}).get("id")
+                if file_id:
+                    current[file_id] = (category, file_name, entry.get("version"))
+        
+        indexes = (self.search_index, self.row_index, self.sql_engine, self.aggregates,
+                   self.vector_index, self.entity_index)
+        removed = [file_id for file_id in self.indexed_files if file_id not in current]
+        changed = [file_id for file_id, key in current.items() if self.indexed_files.get(file_id) != key]
+        for file_id in removed:
+            for index in indexes:
+                index.remove_file(file_id)
+        vectors_changed = bool(removed)
+        failed = {}
+        indexed = dict(current)
+        for file_id in changed:
+            category, file_name, version = current[file_id]
+            try:
+                payload = payload_cache.get(file_id, version)
+                self.search_index.add_file(file_id, category, file_name, payload)
+                self.row_index.add_file(file_id, category, file_name, payload)
+                self.sql_engine.register_file(file_id, category, file_name, payload)
+                self.aggregates.add_file(file_id, category, file_name, payload)
+                # Unchanged document text keeps its embeddings even when the file version moved
+                vectors_changed |= self.vector_index.add_file(file_id, category, file_name, payload)
+                self.entity_index.add_file(file_id, category, file_name, payload, version)
+                scan_results[category]["extracted_data"][file_name].pop("index_error", None)
+            except Exception as e:
+                # One bad file must not abort the scan; indexes not reached keep its previous version,
+                # and it stays marked out of date so the next scan retries it
+                failed[file_name] = str(e)
+                scan_results[category]["extracted_data"][file_name]["index_error"] = str(e)
+                if file_id in self.indexed_files:
+                    indexed[file_id] = self.indexed_files[file_id]
+                else:
+                    indexed.pop(file_id)
+                    for index in indexes:
+                        index.remove_file(file_id)
+                print(f"Failed to index {file_name}: {e}")
+        self.indexed_files = indexed
+        
+        if Config.JOIN_VIEWS_ENABLED:
+            # Views are rebuilt only when an input category changed
+            try:
+                for name in self.join_views.refresh(scan_results, payload_cache.get):
+                    view = self.join_views.views.get(name)
+                    if view is None:
+                        self.sql_engine.remove_file(f"view:{name}")
+                    else:
+                        self.sql_engine.register_frame(f"view:{name}", "view", name, view["frame"])
+            except Exception as e:
+                failed["join views"] = str(e)
+                print(f"Failed to build join views: {e}")
+        if vectors_changed:
+            self.vector_index.save()
+        
+        self.last_index_update = {
+            "files": len(current),
+            "changed": len(changed),
+            "removed": len(removed),
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "at": datetime.now().isoformat()
+        }
+        return self.last_index_update
+    
+    def _category_version(self, category_data: Dict[str, Any]) -> str:
+        """Hash of the file ids and versions in a category"""
+        parts = sorted(f"{f.get('id')}:{file_version(f)}" for f in category_data.get("files", []))
+        if category_data.get("error"):
+            parts.append(f"error:{category_data['error']}")
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+    
+    def data_version(self, categories: List[str] = None) -> str:
+        """Combined version of the given categories (all categories when empty)"""
+        scan_results = self.cache.get('scan_data', {}).get('scan_results', {})
+        categories = sorted(categories or scan_results.keys())
+        parts = [f"{cat}={scan_results.get(cat, {}).get('version')}" for cat in categories]
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+    
+    def _lookup_cached_answer(self, question: str, context: Dict[str, Any]):
+        """Look up an exact, then a semantic, cached answer built from the current data"""
+        # Joined views and entity rows can draw on categories the question was not routed to
+        categories = list(dict.fromkeys(
+            list(context.get("available_data", {}))
+            + [category for view in context.get("joined_views", []) for category in view["inputs"]]
+            + [row["category"] for row in context.get("relevant_rows", [])]
+        ))
+        provider, model = self.llm_client.provider, self.llm_client.model
+        cache_key = answer_cache.make_key(question, provider, model, self.data_version(categories))
+        
+        cached = answer_cache.get(cache_key)
+        if cached:
+            return dict(cached, cache_match="exact"), cache_key, categories
+        
+        if Config.SEMANTIC_CACHE_ENABLED:
+            cached = semantic_cache.lookup(question, provider, model, self.data_version)
+            if cached:
+                return dict(cached, cache_match="semantic"), cache_key, categories
+        
+        return None, cache_key, categories
+    
+    def _store_answer(self, question: str, cache_key, categories: List[str], response: Dict[str, Any]):
+        """Store an answer in the exact and semantic caches"""
+        answer_cache.put(cache_key, response, categories)
+        if Config.SEMANTIC_CACHE_ENABLED:
+            semantic_cache.put(
+                question, self.llm_client.provider, self.llm_client.model,
+                response, categories, self.data_version(categories)
+            )
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether scan data (fresh or from a snapshot) is loaded in memory"""
+        return 'scan_data' in self.cache
+    
+    def save_snapshot(self):
+        """Persist the current scan data so restarts can serve it immediately"""
+        if not self.is_ready or not Config.SNAPSHOT_PATH:
+            return
+        try:
+            temp_path = f"{Config.SNAPSHOT_PATH}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({
+                    "saved_at": self.last_scan.isoformat(),
+                    "scan_data": self.cache['scan_data']
+                }, f, default=str)
+            os.replace(temp_path, Config.SNAPSHOT_PATH)
+        except OSError as e:
+            print(f"Failed to save snapshot: {e}")
+    
+    def load_snapshot(self) -> bool:
+        """Load the last persisted scan data, returns False if there is none"""
+        if not Config.SNAPSHOT_PATH or not os.path.exists(Config.SNAPSHOT_PATH):
+            return False
+        # Scans requested while the snapshot loads wait for it and then find the data valid
+        with self._scan_lock:
+            return self._load_snapshot_locked()
+    
+    def _load_snapshot_locked(self) -> bool:
+        try:
+            with open(Config.SNAPSHOT_PATH) as f:
+                snapshot = json.load(f)
+            self.cache['scan_data'] = snapshot["scan_data"]
+            self.cache['last_scan'] = datetime.fromisoformat(snapshot["saved_at"])
+            self.last_scan = self.cache['last_scan']
+            self.vector_index.load()
+            self._update_indexes(snapshot["scan_data"].get("scan_results", {}))
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Failed to load snapshot: {e}")
+            return False
+    
+    def _scan_category(self, category: str) -> Dict[str, Any]:
+        """List and extract all files of a single category"""
+        folder_path = f"{Config.ONEDRIVE_BASE_FOLDER}/{category}"
+        try:
+            files = self.onedrive_client.list_files(folder_path)
+            
+            category_data = {
+                "folder_path": folder_path,
+                "files": files,
+                "file_count": len(files),
+                "last_scan": datetime.now().isoformat()
+            }
+            
+            # Extract data from files; full payloads live in the payload cache,
+            # only the lightweight summary is kept in the scan results
+            extracted_data = {}
+            for file_info in files:
+                try:
+                    extracted_data[file_info['name']] = self._extract_file(file_info)
+                except Exception as e:
+                    extracted_data[file_info['name']] = {
+                        "file_info": file_info,
+                        "error": str(e)
+                    }
+            
+            category_data["extracted_data"] = extracted_data
+            return category_data
+            
+        except Exception as e:
+            return {
+                "folder_path": folder_path,
+                "files": [],
+                "file_count": 0,
+                "error": str(e),
+                "last_scan": datetime.now().isoformat()
+            }
+    
+    def _extract_file(self, file_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract a file, reusing the cached payload when the file has not changed"""
+        file_id = file_info['id']
+        version = file_version(file_info)
+        
+        payload = payload_cache.get(file_id, version)
+        if payload is None:
+            # Download and extract file
+            suffix = os.path.splitext(file_info['name'])[1]
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+                temp_path = temp_file.name
+            try:
+                self.onedrive_client.download_file(file_id, temp_path)
+                payload = extract_file(temp_path)
+            finally:
+                # Clean up temp file
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            payload["digest"] = build_digest(payload)
+            # Failed extractions are retried on the next scan rather than cached, as in the file scanner
+            if not payload.get("error"):
+                payload_cache.put(file_id, payload, version)
+        elif attach_stats(payload) or "digest" not in payload:
+            # Payload cached by an older build or by the file scanner
+            payload["digest"] = build_digest(payload)
+            if not payload.get("error"):
+                payload_cache.put(file_id, payload, version)
+        
+        return {
+            "file_info": file_info,
+            "version": version,
+            "summary": summarize_extraction(payload, file_info['name']),
+            "digest": payload["digest"],
+            # Kept in the snapshot so the dashboard never reads rows
+            "column_stats": payload_stats(payload)
+        }
+    
+    def get_file_payload(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Get the full extraction payload of a file from the payload cache"""
+        return payload_cache.get(file_id)
     
     async def answer_question(self, question: str) -> Dict[str, Any]:
         """Answer a question using the bot's knowledge base"""
+        started = time.perf_counter()
         try:
             # Get current data
             data = await self.scan_all_data()
             
-            # Prepare context for LLM
-            context = self._prepare_context(data, question)
+            # Common count, list, lookup and metric questions are answered from precomputed aggregates
+            fast = await asyncio.to_thread(self._answer_with_intent, question)
+            if fast:
+                metrics.record("ask.intent", time.perf_counter() - started)
+                return dict(fast, question=question, timestamp=datetime.now().isoformat(),
+                            data_sources=self._get_data_sources(data))
             
-            # Generate response using LLM
-            response = self.llm_client.query(question, context)
+            # Prepare context for LLM; payload reads and pandas work stay off the event loop
+            context = await asyncio.to_thread(self._prepare_context, data, question)
             
-            return {
+            # Aggregate questions over tabular data are answered exactly with SQL
+            structured = await asyncio.to_thread(self._answer_with_sql, question, context)
+            if structured:
+                metrics.record("ask.sql", time.perf_counter() - started)
+                return dict(structured, question=question, timestamp=datetime.now().isoformat(),
+                            data_sources=self._get_data_sources(data))
+            
+            # Serve repeated questions over unchanged data from the answer cache
+            cached, cache_key, categories = self._lookup_cached_answer(question, context)
+            if cached:
+                metrics.record("ask.cached", time.perf_counter() - started)
+                return dict(cached, question=question, timestamp=datetime.now().isoformat(), cached=True)
+            
+            # Shed load when every provider's circuit is open or the concurrency limit is reached
+            if not self.llm_client.available() or not llm_limiter.try_acquire():
+                metrics.record("ask.shed", time.perf_counter() - started)
+                return self._degraded_answer(question, data, context)
+            
+            # Pack the context into the model's prompt budget and generate response using LLM
+            prompt = self.llm_client.build_prompt(question, context)
+            llm_started = time.perf_counter()
+            try:
+                response = await self.llm_client.query(prompt["prompt"])
+            except Exception:
+                llm_limiter.release(time.perf_counter() - llm_started, success=False)
+                raise
+            llm_limiter.release(time.perf_counter() - llm_started, success=True)
+            metrics.record("ask.total", time.perf_counter() - started)
+            
+            result = {
                 "question": question,
                 "answer": response,
                 "timestamp": datetime.now().isoformat(),
                 "data_sources": self._get_data_sources(data),
-                "confidence": "high"  # Could be calculated based on data availability
+                "confidence": "high",  # Could be calculated based on data availability
+                "prompt_tokens": prompt["prompt_tokens"],
+                "cached": False
             }
+            self._store_answer(question, cache_key, categories, result)
+            return result
             
         except Exception as e:
+            metrics.record("ask.total", time.perf_counter() - started, success=False)
             return {
                 "question": question,
                 "answer": f"I'm sorry, I encountered an error while processing your question: {str(e)}",
@@ -124,6 +542,190 @@ class OperationsBot:
                 "error": str(e)
             }
     
+    async def stream_answer(self, question: str):
+        """Answer a question as a stream of (event, data) tuples: meta, token..., done or error"""
+        started = time.perf_counter()
+        first_token_at = None
+        chunks = []
+        try:
+            data = await self.scan_all_data()
+            data_sources = self._get_data_sources(data)
+            yield "meta", {
+                "question": question,
+                "data_sources": data_sources
+            }
+            
+            fast = await asyncio.to_thread(self._answer_with_intent, question)
+            if fast:
+                total = time.perf_counter() - started
+                metrics.record("ask.intent", total)
+                yield "token", {"text": fast["answer"]}
+                yield "done", dict(
+                    fast,
+                    timestamp=datetime.now().isoformat(),
+                    ttft_ms=round(total * 1000, 1),
+                    total_ms=round(total * 1000, 1)
+                )
+                return
+            
+            context = await asyncio.to_thread(self._prepare_context, data, question)
+            structured = await asyncio.to_thread(self._answer_with_sql, question, context)
+            if structured:
+                total = time.perf_counter() - started
+                metrics.record("ask.sql", total)
+                yield "token", {"text": structured["answer"]}
+                yield "done", dict(
+                    structured,
+                    timestamp=datetime.now().isoformat(),
+                    ttft_ms=round(total * 1000, 1),
+                    total_ms=round(total * 1000, 1)
+                )
+                return
+            
+            cached, cache_key, categories = self._lookup_cached_answer(question, context)
+            if cached:
+                total = time.perf_counter() - started
+                metrics.record("ask.cached", total)
+                yield "token", {"text": cached["answer"]}
+                yield "done", {
+                    "answer": cached["answer"],
+                    "timestamp": datetime.now().isoformat(),
+                    "ttft_ms": round(total * 1000, 1),
+                    "total_ms": round(total * 1000, 1),
+                    "cached": True,
+                    "cache_match": cached["cache_match"]
+                }
+                return
+            
+            if not self.llm_client.available() or not llm_limiter.try_acquire():
+                metrics.record("ask.shed", time.perf_counter() - started)
+                degraded = self._degraded_answer(question, data, context)
+                yield "token", {"text": degraded["answer"]}
+                yield "done", {
+                    "answer": degraded["answer"],
+                    "timestamp": degraded["timestamp"],
+                    "cached": False,
+                    "degraded": True
+                }
+                return
+            
+            prompt = self.llm_client.build_prompt(question, context)
+            llm_started = time.perf_counter()
+            try:
+                async for chunk in self.llm_client.stream(prompt["prompt"]):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        metrics.record("ask_stream.ttft", first_token_at - started)
+                    chunks.append(chunk)
+                    yield "token", {"text": chunk}
+            except BaseException:
+                llm_limiter.release(time.perf_counter() - llm_started, success=False)
+                raise
+            llm_limiter.release(time.perf_counter() - llm_started, success=True)
+            
+            total = time.perf_counter() - started
+            metrics.record("ask_stream.total", total)
+            answer = "".join(chunks)
+            self._store_answer(question, cache_key, categories, {
+                "question": question,
+                "answer": answer,
+                "timestamp": datetime.now().isoformat(),
+                "data_sources": data_sources,
+                "confidence": "high",
+                "prompt_tokens": prompt["prompt_tokens"],
+                "cached": False
+            })
+            yield "done", {
+                "answer": answer,
+                "timestamp": datetime.now().isoformat(),
+                "ttft_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+                "total_ms": round(total * 1000, 1),
+                "prompt_tokens": prompt["prompt_tokens"],
+                "cached": False
+            }
+            
+        except Exception as e:
+            metrics.record("ask_stream.total", time.perf_counter() - started, success=False)
+            yield "error", {
+                "error": str(e),
+                "answer": f"I'm sorry, I encountered an error while processing your question: {str(e)}"
+            }
+    
+    def _answer_with_intent(self, question: str) -> Optional[Dict[str, Any]]:
+        """Answer a recognised count, list, lookup or metric question, or None to fall through"""
+        if not Config.INTENT_FAST_PATH_ENABLED:
+            return None
+        intent = intent_classifier.classify(question)
+        if intent["kind"] == "open":
+            return None
+        answer = self.aggregates.answer(intent, question, self.get_file_payload)
+        if not answer:
+            return None
+        return {
+            "answer": answer,
+            "confidence": "high",
+            "mode": "intent",
+            "intent": intent,
+            "cached": False
+        }
+    
+    def _answer_with_sql(self, question: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Answer a recognised aggregate question from the best matching sheet, or None to fall through"""
+        if not Config.SQL_ANSWERS_ENABLED:
+            return None
+        # Questions spanning categories are answered from their joined view first
+        for view in context.get("joined_views", []):
+            table = self.sql_engine.table_for(f"view:{view['name']}", None)
+            plan = self.sql_engine.plan_aggregate(question, table) if table else None
+            if plan and (plan["group_by"] or plan["filters"] or plan["measure"] != "count"):
+                return self._sql_response(plan, " x ".join(view["inputs"]))
+        for hit in context.get("matches", [])[:3]:
+            table = self.sql_engine.table_for(hit["file_id"], hit["sheet"])
+            plan = self.sql_engine.plan_aggregate(question, table) if table else None
+            # A bare row count of some sheet is not a meaningful answer
+            if not plan or not (plan["group_by"] or plan["filters"] or plan["measure"] != "count"):
+                continue
+            source = " / ".join(part for part in (hit["category"], hit["file"], hit["sheet"]) if part)
+            return self._sql_response(plan, source)
+        return None
+    
+    def _sql_response(self, plan: Dict[str, Any], source: str) -> Dict[str, Any]:
+        result = self.sql_engine.run_plan(plan)
+        return {
+            "answer": format_aggregate_answer(plan, result, source),
+            "confidence": "high",
+            "mode": "sql",
+            "sql": plan["sql"],
+            "sql_params": plan["params"],
+            "result": result,
+            "cached": False
+        }
+    
+    def _degraded_answer(self, question: str, data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer from scan metadata alone when the LLM is unavailable or overloaded"""
+        summary = data.get("summary", {})
+        lines = ["The AI assistant is temporarily unavailable, so here is what the data shows right now:"]
+        relevant = context.get("available_data") or {
+            category: category_data for category, category_data in data.get("scan_results", {}).items()
+            if category_data.get("file_count", 0) > 0
+        }
+        for category, category_data in relevant.items():
+            lines.append(f"- {category}: {category_data.get('file_count', 0)} files")
+        categories_with_data = sum(1 for count in summary.get("categories", {}).values() if count)
+        lines.append(
+            f"In total {summary.get('total_files', 0)} files across {categories_with_data} categories "
+            f"(last scan {summary.get('last_scan', 'unknown')}). Please try again shortly for a full answer."
+        )
+        return {
+            "question": question,
+            "answer": "\n".join(lines),
+            "timestamp": datetime.now().isoformat(),
+            "data_sources": self._get_data_sources(data),
+            "confidence": "low",
+            "cached": False,
+            "degraded": True
+        }
+    
     def _prepare_context(self, data: Dict[str, Any], question: str) -> Dict[str, Any]:
         """Prepare context for LLM based on question and available data"""
         context = {
@@ -136,33 +738,62 @@ class OperationsBot:
             "available_data": {}
         }
         
-        # Add relevant data based on question keywords
-        question_lower = question.lower()
+        # Route the question to the best matching categories, files and sheets with the BM25 index
+        hits = self.search_index.search(question, Config.SEARCH_TOP_K)
+        context["matches"] = hits
+        # Categories whose best match is far behind the top hit are left out
+        cutoff = hits[0]["score"] * Config.SEARCH_MIN_SCORE_RATIO if hits else 0
+        ranked = list(dict.fromkeys(hit["category"] for hit in hits if hit["score"] >= cutoff))
+        matched_files = list(dict.fromkeys(hit["file"] for hit in hits))
+        scan_results = data.get("scan_results", {})
         
-        for category, category_data in data.get("scan_results", {}).items():
-            if self._is_category_relevant(question_lower, category):
-                context["available_data"][category] = {
-                    "file_count": category_data.get("file_count", 0),
-                    "files": [f["name"] for f in category_data.get("files", [])],
-                    "extracted_data": category_data.get("extracted_data", {})
+        for category in ranked[:Config.SEARCH_MAX_CATEGORIES]:
+            category_data = scan_results.get(category)
+            if category_data is None:
+                continue
+            extracted_data = category_data.get("extracted_data", {})
+            # Best matching files first so their digests survive prompt truncation
+            names = sorted(extracted_data, key=lambda name: matched_files.index(name) if name in matched_files else len(matched_files))
+            context["available_data"][category] = {
+                "file_count": category_data.get("file_count", 0),
+                "files": [f["name"] for f in category_data.get("files", [])],
+                "digests": {
+                    name: extracted_data[name]["digest"] for name in names if extracted_data[name].get("digest")
                 }
+            }
         
-        return context
-    
-    def _is_category_relevant(self, question: str, category: str) -> bool:
-        """Determine if a category is relevant to the question"""
-        category_keywords = {
-            "RRF": ["rrf", "resource", "request", "form"],
-            "Training": ["training", "course", "learning", "skill"],
-            "Utilization": ["utilization", "usage", "capacity", "workload"],
-            "Bench Report": ["bench", "available", "idle", "resource"],
-            "Certification List": ["certification", "cert", "qualification"],
-            "Account wise information": ["account", "client", "customer"],
-            "Overall TSC GTs information": ["tsc", "global", "team", "overall"]
-        }
+        # Only the best matching rows of the routed categories reach the prompt
+        context["relevant_rows"] = self.row_index.retrieve(
+            question, self.get_file_payload, categories=list(context["available_data"])
+        ) if context["available_data"] else []
         
-        keywords = category_keywords.get(category, [])
-        return any(keyword in question for keyword in keywords)
+        # Rows of people, accounts and skills named in the question, from any category
+        context["entities"] = self.entity_index.find(question)
+        if context["entities"]:
+            locations = []
+            for entity, _ in context["entities"]:
+                locations += self.entity_index.lookup(entity, Config.ENTITY_MAX_ROWS)
+            seen = {(row["file"], row["sheet"], row["row"]) for row in context["relevant_rows"]}
+            entity_rows = [
+                row for row in self.row_index.rows_at(locations[:Config.ENTITY_MAX_ROWS], question, self.get_file_payload)
+                if (row["file"], row["sheet"], row["row"]) not in seen
+            ]
+            context["relevant_rows"] = entity_rows + context["relevant_rows"]
+        
+        # Joined views over the routed categories, with the rows that match the question best
+        context["joined_views"] = [
+            {
+                "name": name,
+                "inputs": self.join_views.views[name]["inputs"],
+                "rows": self.join_views.matching_rows(name, question, Config.JOIN_MAX_ROWS)
+            }
+            for name in self.join_views.relevant(ranked[:Config.SEARCH_MAX_CATEGORIES], question)
+        ]
+        
+        # Best matching PDF and Word passages
+        context["passages"] = self.vector_index.search(question, categories=list(context["available_data"]) or None)
+        
+        return context
     
     def _get_data_sources(self, data: Dict[str, Any]) -> List[str]:
         """Get list of data sources used for the answer"""
@@ -184,11 +815,23 @@ class OperationsBot:
         """Get dashboard data for visualization"""
         data = await self.scan_all_data()
         scan = data.get("scan_results", {})
-        # Extract metrics
-        active_rrfs = scan.get("RRF", {}).get("file_count", 0)
-        bench_resources = scan.get("Bench Report", {}).get("file_count", 0)
-        active_projects = scan.get("Utilization", {}).get("file_count", 0)
-        trainees = scan.get("Training", {}).get("file_count", 0)
+        # Extract metrics from the column statistics, falling back to file counts for categories without tables
+        stats = {category: self._category_stats(category_data) for category, category_data in scan.items()}
+        
+        def rows_or_files(category: str) -> int:
+            if stats.get(category):
+                return total_rows(stats[category])
+            return scan.get(category, {}).get("file_count", 0)
+        
+        open_rrfs = value_count(stats.get("RRF", {}), _STATUS_COLUMN, _OPEN_STATUS)
+        active_rrfs = open_rrfs if open_rrfs is not None else rows_or_files("RRF")
+        bench_resources = rows_or_files("Bench Report")
+        projects = [
+            info["distinct"] for table in stats.get("Utilization", {}).values()
+            for column, info in table["columns"].items() if _PROJECT_COLUMN.search(column)
+        ]
+        active_projects = max(projects) if projects else rows_or_files("Utilization")
+        trainees = rows_or_files("Training")
 
         # Recent RRF updates (mock: last 3 files from RRF)
         rrf_files = scan.get("RRF", {}).get("files", [])
@@ -220,27 +863,124 @@ class OperationsBot:
             "trainees": trainees,
             "recent_rrf_updates": recent_rrf_updates,
             "training_progress": training_progress,
+            "category_stats": {
+                category: {
+                    "files": scan[category].get("file_count", 0),
+                    "rows": total_rows(category_stats),
+                    "tables": len(category_stats)
+                }
+                for category, category_stats in stats.items()
+            },
             "last_updated": datetime.now().isoformat()
         }
     
-    async def get_category_details(self, category: str) -> Dict[str, Any]:
-        """Get detailed information about a specific category"""
+    def _category_stats(self, category_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Table statistics of every file in a category keyed by "file/sheet", as stored at extraction"""
+        return {
+            f"{file_name}/{sheet}" if sheet else file_name: table
+            for file_name, entry in category_data.get("extracted_data", {}).items()
+            for sheet, table in entry.get("column_stats", {}).items()
+        }
+    
+    async def get_category_details(self, category: str, cursor: str = None, limit: int = None,
+                                   fields: List[str] = None, summary_only: bool = False,
+                                   file_id: str = None, sheet: str = None) -> Dict[str, Any]:
+        """Get one page of a category's files, or of a file's rows when file_id is given; raises ValueError for a bad cursor"""
         data = await self.scan_all_data()
         
         if category not in data.get("scan_results", {}):
             return {"error": f"Category '{category}' not found"}
         
         category_data = data["scan_results"][category]
-        
-        return {
+        details = {
             "category": category,
             "folder_path": category_data["folder_path"],
             "file_count": category_data["file_count"],
-            "files": category_data.get("files", []),
-            "extracted_data": category_data.get("extracted_data", {}),
             "last_scan": category_data.get("last_scan"),
+            "version": category_data.get("version"),
+            "joined_views": self.join_views.describe(category),
             "status": "active" if category_data["file_count"] > 0 else "empty"
         }
+        if summary_only:
+            return details
+        
+        limit = max(1, min(limit or Config.CATEGORY_PAGE_SIZE, Config.CATEGORY_MAX_PAGE_SIZE))
+        offset = self._decode_cursor(cursor, category_data.get("version"))
+        if file_id:
+            rows = await asyncio.to_thread(self._category_rows, category_data, file_id, sheet, offset, limit, fields)
+            return dict(details, **rows)
+        
+        # Files and their extraction summaries, one page at a time in listing order
+        files = category_data.get("files", [])
+        page = files[offset:offset + limit]
+        extracted_data = category_data.get("extracted_data", {})
+        return dict(
+            details,
+            files=[self._project(file_info, fields, ("id", "name")) for file_info in page],
+            extracted_data={
+                f["name"]: self._project(extracted_data[f["name"]], fields, ("file_info",))
+                for f in page if f.get("name") in extracted_data
+            },
+            limit=limit,
+            next_cursor=self._encode_cursor(offset + limit, category_data.get("version")) if offset + limit < len(files) else None
+        )
+    
+    def _category_rows(self, category_data: Dict[str, Any], file_id: str, sheet: Optional[str],
+                       offset: int, limit: int, fields: Optional[List[str]]) -> Dict[str, Any]:
+        """One page of a file's rows, optionally projected to some columns"""
+        file_info = next((f for f in category_data.get("files", []) if f.get("id") == file_id), None)
+        if file_info is None:
+            raise ValueError(f"File '{file_id}' is not in this category")
+        tables = sheet_tables(self.get_file_payload(file_id))
+        if sheet is None and tables:
+            sheet = next(iter(tables))
+        if sheet not in tables:
+            raise ValueError(f"Sheet '{sheet}' not found. Available: {[name for name in tables if name]}")
+        
+        rows = tables[sheet]
+        columns = list(rows[0].keys()) if rows else []
+        if fields:
+            columns = [column for column in columns if column in fields]
+        return {
+            "file_id": file_id,
+            "file": file_info.get("name"),
+            "sheet": sheet,
+            "sheets": [name for name in tables if name],
+            "columns": columns,
+            "total_rows": len(rows),
+            "rows": [
+                # NaN is not valid JSON
+                {column: None if isinstance(row.get(column), float) and row[column] != row[column] else row.get(column)
+                 for column in columns}
+                for row in rows[offset:offset + limit]
+            ],
+            "limit": limit,
+            "next_cursor": self._encode_cursor(offset + limit, category_data.get("version")) if offset + limit < len(rows) else None
+        }
+    
+    @staticmethod
+    def _project(entry: Dict[str, Any], fields: Optional[List[str]], always: tuple) -> Dict[str, Any]:
+        if not fields:
+            return entry
+        return {key: value for key, value in entry.items() if key in fields or key in always}
+    
+    @staticmethod
+    def _encode_cursor(offset: int, version: Optional[str]) -> str:
+        return base64.urlsafe_b64encode(json.dumps({"offset": offset, "version": version}).encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str], version: Optional[str]) -> int:
+        """Offset encoded in a cursor; cursors from before the category last changed are rejected"""
+        if not cursor:
+            return 0
+        try:
+            decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            offset = int(decoded["offset"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
+        if decoded.get("version") != version:
+            raise ValueError("Cursor is stale, the category changed since it was issued")
+        return max(0, offset)
 
 # Global bot instance
 bot = OperationsBot()
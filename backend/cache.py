@@ -0,0 +1,185 @@
+"""
+Extraction payload cache
+Keeps full file extraction payloads in a byte-bounded LRU backed by an on-disk cache
+"""
+
+import os
+import sys
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from config import Config
+
+
+def file_version(file_info: Dict[str, Any]) -> str:
+    """Get a version string for a Graph drive item (changes whenever the file content changes)"""
+    return str(
+        file_info.get("eTag")
+        or file_info.get("cTag")
+        or file_info.get("lastModifiedDateTime")
+        or file_info.get("size", "")
+    )
+
+
+def payload_size(payload: Any) -> int:
+    """Approximate in-memory size of a decoded JSON payload in bytes
+
+    Sums sys.getsizeof over the containers and scalars, counting each object
+    once so the column-name keys json.loads shares between rows are not
+    charged per row. A decoded sheet takes several times its JSON length
+    (every cell is a separate str/int/float object), so the budget is kept
+    against this rather than the encoded size
+    """
+    seen, size, stack = set(), 0, [payload]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return size
+
+
+class PayloadCache:
+    def __init__(self, max_bytes: int, cache_dir: str = None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()  # file_id -> (version, payload, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_loads = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, file_id: str, version: str = None) -> Optional[Dict[str, Any]]:
+        """Get a payload from memory, re-materialising it from disk if it was evicted"""
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry and (version is None or entry[0] == version):
+                self._entries.move_to_end(file_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        stored = self._read_disk(file_id)
+        if not stored or (version is not None and stored.get("version") != version):
+            return None
+
+        self.disk_loads += 1
+        self._store(file_id, stored.get("version"), stored["payload"], payload_size(stored["payload"]))
+        return stored["payload"]
+
+    def put(self, file_id: str, payload: Dict[str, Any], version: str = None):
+        """Add a payload to the cache and persist it to the on-disk extraction cache"""
+        encoded = json.dumps(
+            {"version": version, "payload": payload},
+            default=str,
+            separators=(",", ":")
+        ).encode("utf-8")
+        # Round-trip through JSON so the in-memory copy matches what a disk load returns
+        payload = json.loads(encoded)["payload"]
+        self._write_disk(file_id, encoded)
+        self._store(file_id, version, payload, payload_size(payload))
+
+    def in_memory(self, file_id: str) -> bool:
+        """Whether a payload is currently held in memory (does not touch LRU order or counters)"""
+        return file_id in self._entries
+
+    def invalidate(self, file_id: str) -> bool:
+        """Drop a payload from memory and disk"""
+        with self._lock:
+            entry = self._entries.pop(file_id, None)
+            if entry:
+                self.current_bytes -= entry[2]
+
+        removed = entry is not None
+        path = self._disk_path(file_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+            removed = True
+        return removed
+
+    def clear(self):
+        """Drop all in-memory payloads (the on-disk cache is kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "disk_loads": self.disk_loads,
+            "cache_dir": self.cache_dir
+        }
+
+    def _store(self, file_id: str, version: str, payload: Dict[str, Any], size: int):
+        """Insert an entry and evict least recently used entries until within budget"""
+        with self._lock:
+            old = self._entries.pop(file_id, None)
+            if old:
+                self.current_bytes -= old[2]
+
+            # Payloads larger than the whole budget are only kept on disk
+            if size > self.max_bytes:
+                return
+
+            self._entries[file_id] = (version, payload, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def _disk_path(self, file_id: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in file_id)
+        return os.path.join(self.cache_dir, f"{safe_id}.json")
+
+    def _write_disk(self, file_id: str, encoded: bytes):
+        path = self._disk_path(file_id)
+        if not path:
+            return
+        try:
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(encoded)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Failed to write extraction cache for {file_id}: {e}")
+
+    def _read_disk(self, file_id: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(file_id)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                encoded = f.read()
+            return json.loads(encoded)
+        except (OSError, ValueError) as e:
+            print(f"Failed to read extraction cache for {file_id}: {e}")
+            return None
+
+
+# Global payload cache instance
+payload_cache = PayloadCache(Config.PAYLOAD_CACHE_MAX_BYTES, Config.EXTRACTION_CACHE_DIR)
@@ -0,0 +1,177 @@
+"""
+Column statistics
+Computed once per sheet at extraction time with vectorised pandas/NumPy
+operations: null and distinct counts (HyperLogLog estimates on large sheets),
+min/max, top values and numeric histograms. The digest, the dashboard and the
+SQL query planner read these instead of going back to the rows
+"""
+
+import math
+import re
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+
+from config import Config
+
+_DATE_COLUMN = re.compile(r"date|since|until|start|end|joined|expiry|due", re.IGNORECASE)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over 64-bit pandas hashes"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_series(self, series: pd.Series):
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+        if not len(hashes):
+            return
+        suffix_bits = 64 - self.precision
+        buckets = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << suffix_bits) - 1)
+        # Position of the leftmost set bit of the remaining bits; rest fits a float64 mantissa exactly
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        ranks = (suffix_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+def _plain(value: Any) -> Any:
+    """JSON-safe Python scalar"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 4) if math.isfinite(value) else None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    return value
+
+
+def column_stats(name: str, series: pd.Series) -> Dict[str, Any]:
+    """Statistics of one column"""
+    rows = len(series)
+    values = series.dropna()
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        # Blank strings count as missing, like in the digest
+        values = values[values.astype(str).str.strip() != ""]
+    stats = {"dtype": str(series.dtype), "nulls": rows - len(values)}
+
+    if len(values) >= Config.STATS_HLL_MIN_ROWS:
+        sketch = HyperLogLog()
+        sketch.add_series(values.astype(str))
+        stats["distinct"], stats["distinct_approximate"] = sketch.count(), True
+    else:
+        stats["distinct"], stats["distinct_approximate"] = int(values.astype(str).nunique()), False
+
+    if values.empty:
+        stats["kind"] = "empty"
+        return stats
+
+    if pd.api.types.is_bool_dtype(values):
+        stats["kind"] = "bool"
+    elif pd.api.types.is_numeric_dtype(values):
+        stats["kind"] = "numeric"
+        numbers = values.astype(float)
+        # ±inf (e.g. a division by zero in the sheet) would make every aggregate infinite and break the histogram
+        finite = numbers[np.isfinite(numbers)]
+        if len(finite) < len(numbers):
+            stats["non_finite"] = len(numbers) - len(finite)
+        if finite.empty:
+            stats["kind"] = "empty"
+            return stats
+        stats.update(
+            min=_plain(finite.min()), max=_plain(finite.max()),
+            sum=_plain(finite.sum()), mean=_plain(finite.mean())
+        )
+        counts, edges = np.histogram(finite, bins=min(Config.STATS_HISTOGRAM_BINS, max(stats["distinct"], 1)))
+        stats["histogram"] = {"edges": [_plain(edge) for edge in edges], "counts": counts.tolist()}
+        return stats
+    else:
+        stats["kind"] = "text"
+        if _DATE_COLUMN.search(name) or pd.api.types.is_datetime64_any_dtype(values):
+            with warnings.catch_warnings():
+                # Sheets mix date formats, so pandas cannot infer one and warns on every column it tries
+                warnings.simplefilter("ignore", UserWarning)
+                dates = pd.to_datetime(values, errors="coerce").dropna()
+            if len(dates) >= len(values) / 2:
+                stats.update(kind="datetime", min=_plain(dates.min()), max=_plain(dates.max()))
+                return stats
+
+    text = values.astype(str).str.strip()
+    if stats["distinct"] <= Config.STATS_FULL_VALUES_MAX:
+        # Low-cardinality columns keep every value so filters and digests can total them
+        counts = text.value_counts()
+    elif stats["distinct_approximate"]:
+        # High-cardinality columns on large sheets: top values from a fixed sample keep memory bounded
+        counts = text.sample(n=Config.STATS_HLL_MIN_ROWS, random_state=0).value_counts()
+        stats["top_sampled"] = True
+    else:
+        counts = text.value_counts()
+    # Ties are broken by value so the statistics are stable across scans
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    if stats["distinct"] > Config.STATS_FULL_VALUES_MAX:
+        ordered = ordered[:Config.STATS_TOP_K]
+    stats["top"] = [[value, int(count)] for value, count in ordered]
+    return stats
+
+
+def table_stats(frame: pd.DataFrame) -> Dict[str, Any]:
+    """Statistics of every column of a table"""
+    return {
+        "rows": len(frame),
+        "columns": {str(column): column_stats(str(column), frame[column]) for column in frame.columns}
+    }
+
+
+def payload_stats(payload: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Table statistics of a payload keyed by sheet name ("" for CSV), computed for payloads extracted without them"""
+    if not payload or payload.get("error"):
+        return {}
+    if payload.get("type") == "excel":
+        return {
+            name: sheet.get("stats") or table_stats(pd.DataFrame(sheet.get("data", []), columns=sheet.get("columns") or None))
+            for name, sheet in payload.get("sheets", {}).items()
+        }
+    if payload.get("type") == "csv":
+        return {"": payload.get("stats") or table_stats(pd.DataFrame(payload.get("data", []), columns=payload.get("columns") or None))}
+    return {}
+
+
+def attach_stats(payload: Optional[Dict[str, Any]]) -> bool:
+    """Add statistics to the tables of a payload extracted without them; returns True when something was added"""
+    if not payload or payload.get("error") or payload.get("type") not in ("excel", "csv"):
+        return False
+    tables = list(payload.get("sheets", {}).values()) if payload.get("type") == "excel" else [payload]
+    missing = [table for table in tables if "stats" not in table]
+    for table in missing:
+        table["stats"] = table_stats(pd.DataFrame(table.get("data", []), columns=table.get("columns") or None))
+    return bool(missing)
+
+
+def total_rows(stats: Dict[str, Dict[str, Any]]) -> int:
+    return sum(table["rows"] for table in stats.values())
+
+
+def value_count(stats: Dict[str, Dict[str, Any]], column_pattern: re.Pattern, value_pattern: re.Pattern) -> Optional[int]:
+    """Rows whose value in a matching column matches value_pattern, from fully counted columns; None if no such column"""
+    found, total = False, 0
+    for table in stats.values():
+        for column, info in table["columns"].items():
+            if not column_pattern.search(column) or info.get("distinct", 0) > Config.STATS_FULL_VALUES_MAX:
+                continue
+            found = True
+            total += sum(count for value, count in info.get("top", []) if value_pattern.search(str(value)))
+            break
+    return total if found else None
@@ -1,5 +1,6 @@
 # Configuration file for Operations Bot
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,6 +16,34 @@ class Config:
     LLM_API_KEY = os.getenv("LLM_API_KEY", "")
     LLM_MODEL = os.getenv("LLM_MODEL", "")
     LLM_ENDPOINT = os.getenv("LLM_ENDPOINT", "")  # Optional custom endpoint
+    LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+    LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))  # 0 = use the full context window
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # In-flight calls per provider
+    # Micro-batching of concurrent Hugging Face prompts; 1 sends every prompt on its own
+    HF_BATCH_SIZE = int(os.getenv("HF_BATCH_SIZE", "1"))
+    HF_BATCH_WAIT_MS = float(os.getenv("HF_BATCH_WAIT_MS", "20"))
+    # Mock provider / local mock server for offline benchmarking (LLM_PROVIDER=mock)
+    MOCK_LLM_LATENCY = os.getenv("MOCK_LLM_LATENCY", "lognormal:0.8,0.4")  # fixed:S, uniform:LO,HI, normal:MEAN,STD, lognormal:MEDIAN,SIGMA
+    MOCK_LLM_ERROR_RATE = float(os.getenv("MOCK_LLM_ERROR_RATE", "0"))
+    MOCK_LLM_RATE_LIMIT_RATE = float(os.getenv("MOCK_LLM_RATE_LIMIT_RATE", "0"))
+    MOCK_LLM_CHUNK_DELAY_MS = float(os.getenv("MOCK_LLM_CHUNK_DELAY_MS", "20"))
+    MOCK_LLM_SEED = int(os.getenv("MOCK_LLM_SEED")) if os.getenv("MOCK_LLM_SEED") else None
+    # Ordered failover chain, e.g. "gemini,openai"; defaults to LLM_PROVIDER alone
+    LLM_PROVIDER_CHAIN = [
+        p.strip().lower() for p in os.getenv("LLM_PROVIDER_CHAIN", "").split(",") if p.strip()
+    ] or [LLM_PROVIDER]
+    LLM_PROVIDER_TIMEOUT = float(os.getenv("LLM_PROVIDER_TIMEOUT", "30"))  # Deadline per provider attempt
+    LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "3"))  # Used until p95 is known
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1"))
+    # Adaptive (AIMD) limit on concurrent LLM-backed answers; excess load gets degraded answers
+    LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+    LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+    LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", "32"))
+    LLM_LATENCY_TARGET_SECONDS = float(os.getenv("LLM_LATENCY_TARGET_SECONDS", "10"))
     
     # Bot Configuration
     BOT_NAME = "Operations Bot"
@@ -38,6 +67,68 @@ class Config:
     # Cache Settings
     CACHE_DURATION_HOURS = 24
     ENABLE_CACHING = True
+    PAYLOAD_CACHE_MAX_BYTES = int(os.getenv("PAYLOAD_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    WARM_CACHE_TTL_SECONDS = int(os.getenv("WARM_CACHE_TTL_SECONDS", "300"))
+    WARM_CACHE_DIR = os.getenv("WARM_CACHE_DIR", tempfile.gettempdir())
+    EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", os.path.join(tempfile.gettempdir(), "opsbot_extractions"))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+    ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+    EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+    SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", "20"))  # BM25 hits considered when routing a question
+    SEARCH_MAX_CATEGORIES = int(os.getenv("SEARCH_MAX_CATEGORIES", "3"))
+    SEARCH_MIN_SCORE_RATIO = float(os.getenv("SEARCH_MIN_SCORE_RATIO", "0.25"))  # Relative to the best hit
+    ROW_TOP_K = int(os.getenv("ROW_TOP_K", "15"))  # Rows retrieved into the prompt
+    ROW_MAX_BYTES = int(os.getenv("ROW_MAX_BYTES", "4000"))
+    ROW_MAX_COLUMNS = int(os.getenv("ROW_MAX_COLUMNS", "8"))
+    SQL_ANSWERS_ENABLED = os.getenv("SQL_ANSWERS_ENABLED", "true").lower() == "true"  # Exact answers for aggregate questions
+    SQL_MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "500"))
+    SQL_TIMEOUT_SECONDS = float(os.getenv("SQL_TIMEOUT_SECONDS", "2"))
+    SQL_DB_PATH = os.getenv("SQL_DB_PATH", os.path.join(EXTRACTION_CACHE_DIR, "sql_tables.db"))  # Empty keeps tables in memory
+    SQL_CACHE_MAX_BYTES = int(os.getenv("SQL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # SQLite page cache
+    INTENT_FAST_PATH_ENABLED = os.getenv("INTENT_FAST_PATH_ENABLED", "true").lower() == "true"
+    INTENT_MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.5"))
+    VECTOR_CHUNK_CHARS = int(os.getenv("VECTOR_CHUNK_CHARS", "800"))  # PDF/Word passage size
+    VECTOR_CHUNK_OVERLAP = int(os.getenv("VECTOR_CHUNK_OVERLAP", "150"))
+    VECTOR_TOP_K = int(os.getenv("VECTOR_TOP_K", "5"))
+    VECTOR_MIN_SCORE = float(os.getenv("VECTOR_MIN_SCORE", "0.15"))
+    VECTOR_HNSW_ENABLED = os.getenv("VECTOR_HNSW_ENABLED", "true").lower() == "true"  # Used only if hnswlib is installed
+    VECTOR_HNSW_MIN_CHUNKS = int(os.getenv("VECTOR_HNSW_MIN_CHUNKS", "5000"))
+    ENTITY_MAX_ROWS = int(os.getenv("ENTITY_MAX_ROWS", "10"))  # Rows of named people, accounts or skills added to the prompt
+    ENTITY_MAX_LOCATIONS = int(os.getenv("ENTITY_MAX_LOCATIONS", "1000"))  # Locations per /api/bot/entity response
+    JOIN_VIEWS_ENABLED = os.getenv("JOIN_VIEWS_ENABLED", "true").lower() == "true"  # Bench/certification/utilization joins
+    JOIN_MAX_ROWS = int(os.getenv("JOIN_MAX_ROWS", "15"))  # Joined rows added to the prompt per view
+    CATEGORY_PAGE_SIZE = int(os.getenv("CATEGORY_PAGE_SIZE", "50"))  # Files or rows per /api/bot/category page
+    CATEGORY_MAX_PAGE_SIZE = int(os.getenv("CATEGORY_MAX_PAGE_SIZE", "500"))
+    STATS_HLL_MIN_ROWS = int(os.getenv("STATS_HLL_MIN_ROWS", "10000"))  # Distinct counts are HyperLogLog estimates from here on
+    STATS_TOP_K = int(os.getenv("STATS_TOP_K", "5"))
+    STATS_FULL_VALUES_MAX = int(os.getenv("STATS_FULL_VALUES_MAX", "50"))  # Columns with fewer distinct values keep every count
+    STATS_HISTOGRAM_BINS = int(os.getenv("STATS_HISTOGRAM_BINS", "10"))
+    DIGEST_MAX_CHARS = int(os.getenv("DIGEST_MAX_CHARS", "1500"))  # Per-file digest length cap
+    SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "opsbot_snapshot.json"))
+    VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", os.path.splitext(SNAPSHOT_PATH)[0] + "_vectors.npz")
+    
+    # Background Refresh Settings
+    ENABLE_SCHEDULER = os.getenv("ENABLE_SCHEDULER", "true").lower() == "true"
+    REFRESH_INTERVAL_MINUTES = int(os.getenv("REFRESH_INTERVAL_MINUTES", "60"))
+    REFRESH_JITTER_SECONDS = int(os.getenv("REFRESH_JITTER_SECONDS", "120"))
+    # Per-category cadence overrides, e.g. "RRF=15,Bench Report=30"
+    CATEGORY_REFRESH_MINUTES = {
+        name.strip(): int(minutes)
+        for name, minutes in (
+            item.split("=", 1) for item in os.getenv("CATEGORY_REFRESH_MINUTES", "").split(",") if "=" in item
+        )
+    }
+
+    # Graph Change Notifications
+    GRAPH_NOTIFICATION_URL = os.getenv("GRAPH_NOTIFICATION_URL", "")  # Public URL of /api/bot/notifications
+    GRAPH_CLIENT_STATE = os.getenv("GRAPH_CLIENT_STATE", "")
+    GRAPH_SUBSCRIPTION_RESOURCE = os.getenv("GRAPH_SUBSCRIPTION_RESOURCE", "me/drive/root")
+    GRAPH_SUBSCRIPTION_MINUTES = int(os.getenv("GRAPH_SUBSCRIPTION_MINUTES", "4320"))
+    NOTIFICATION_DEBOUNCE_SECONDS = float(os.getenv("NOTIFICATION_DEBOUNCE_SECONDS", "5"))
+    NOTIFICATION_MAX_DELAY_SECONDS = float(os.getenv("NOTIFICATION_MAX_DELAY_SECONDS", "60"))
 
 # Validate configuration
 def validate_config():
@@ -47,14 +138,18 @@ def validate_config():
     if not Config.ONEDRIVE_ACCESS_TOKEN:
         errors.append("ONEDRIVE_ACCESS_TOKEN is required")
     
-    if not Config.LLM_API_KEY:
+    if not Config.LLM_API_KEY and Config.LLM_PROVIDER != "mock":
         errors.append("LLM_API_KEY is required")
     
     if not Config.ONEDRIVE_BASE_FOLDER:
         errors.append("ONEDRIVE_BASE_FOLDER is required")
     
-    if Config.LLM_PROVIDER not in ["gemini", "huggingface", "openai"]:
-        errors.append("LLM_PROVIDER must be one of: gemini, huggingface, openai")
+    if Config.LLM_PROVIDER not in ["gemini", "huggingface", "openai", "mock"]:
+        errors.append("LLM_PROVIDER must be one of: gemini, huggingface, openai, mock")
+    
+    for provider in Config.LLM_PROVIDER_CHAIN:
+        if provider not in ["gemini", "huggingface", "openai", "mock"]:
+            errors.append(f"LLM_PROVIDER_CHAIN entry '{provider}' must be one of: gemini, huggingface, openai, mock")
     
     return errors
 
@@ -63,6 +158,27 @@ def get_default_model(provider: str) -> str:
     defaults = {
         "gemini": "gemini-1.5-flash",
         "huggingface": "microsoft/DialoGPT-large",
-        "openai": "gpt-3.5-turbo"
+        "openai": "gpt-3.5-turbo",
+        "mock": "mock"
     }
     return defaults.get(provider, "gemini-1.5-flash")
+
+def get_provider_api_key(provider: str) -> str:
+    """Get the API key for a provider (GEMINI_API_KEY, OPENAI_API_KEY, ...), falling back to LLM_API_KEY for the primary"""
+    api_key = os.getenv(f"{provider.upper()}_API_KEY", "")
+    if not api_key and provider == Config.LLM_PROVIDER:
+        api_key = Config.LLM_API_KEY
+    return api_key
+
+def get_provider_model(provider: str) -> str:
+    """Get the model for a provider in the failover chain"""
+    if provider == Config.LLM_PROVIDER and Config.LLM_MODEL:
+        return Config.LLM_MODEL
+    return os.getenv(f"{provider.upper()}_MODEL", "") or get_default_model(provider)
+
+def get_provider_endpoint(provider: str) -> str:
+    """Get a custom endpoint for a provider (GEMINI_ENDPOINT, ...), falling back to LLM_ENDPOINT for the primary"""
+    endpoint = os.getenv(f"{provider.upper()}_ENDPOINT", "")
+    if not endpoint and provider == Config.LLM_PROVIDER:
+        endpoint = Config.LLM_ENDPOINT
+    return endpoint or None
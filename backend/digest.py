@@ -0,0 +1,92 @@
+"""
+Per-file digests
+Compact, deterministic text summaries of extracted files built at scan time from
+the column statistics, so prompts carry counts and distributions instead of raw rows
+"""
+
+import re
+from typing import Dict, Any, List
+
+from config import Config
+from column_stats import payload_stats
+
+# Columns whose values are worth totalling in full
+_STATUS_COLUMN = re.compile(r"status|stage|state|priority|type|band|grade|location|account|skill", re.IGNORECASE)
+
+# Columns with more distinct values than this are treated as identifiers, not categories
+MAX_CATEGORY_VALUES = 25
+TOP_VALUES = 5
+
+
+def _format_number(value: float) -> str:
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+
+
+def _describe_column(name: str, stats: Dict[str, Any]) -> str:
+    """One line describing a column from its statistics, or an empty string when nothing useful can be said"""
+    kind = stats.get("kind")
+    if kind in (None, "empty"):
+        return ""
+
+    missing = stats.get("nulls", 0)
+    suffix = f" ({missing} blank)" if missing else ""
+
+    if kind == "numeric":
+        return (f"{name}: total {_format_number(stats['sum'])}, min {_format_number(stats['min'])}, "
+                f"max {_format_number(stats['max'])}, mean {_format_number(stats['mean'])}{suffix}")
+
+    if kind == "datetime":
+        return f"{name}: {stats['min'][:10]} to {stats['max'][:10]}{suffix}"
+
+    ordered = stats.get("top", [])
+    if kind == "bool":
+        return f"{name}: " + ", ".join(f"{key}={count}" for key, count in ordered) + suffix
+
+    distinct = stats.get("distinct", len(ordered))
+    if distinct <= MAX_CATEGORY_VALUES or _STATUS_COLUMN.search(name):
+        # Status-like columns are totalled in full, other categories show their most common values
+        totalled = _STATUS_COLUMN.search(name) and distinct <= MAX_CATEGORY_VALUES
+        shown = ordered if totalled else ordered[:TOP_VALUES]
+        more = f", +{distinct - len(shown)} more" if distinct > len(shown) else ""
+        return f"{name}: " + ", ".join(f"{key}={count}" for key, count in shown) + more + suffix
+    approximate = "~" if stats.get("distinct_approximate") else ""
+    return f"{name}: {approximate}{distinct} distinct values{suffix}"
+
+
+def digest_table(stats: Dict[str, Any], label: str = None) -> List[str]:
+    """Digest lines for one table from its statistics: row count and one line per column"""
+    heading = f"{label}: {stats['rows']} rows" if label else f"{stats['rows']} rows"
+    lines = [heading]
+    for column, column_info in stats["columns"].items():
+        line = _describe_column(column, column_info)
+        if line:
+            lines.append(f"  {line}")
+    return lines
+
+
+def build_digest(extracted: Dict[str, Any], max_chars: int = None) -> str:
+    """Build the digest text of an extracted payload, capped at max_chars"""
+    max_chars = max_chars or Config.DIGEST_MAX_CHARS
+    if extracted.get("error"):
+        return f"extraction failed: {extracted['error']}"
+
+    file_type = extracted.get("type")
+    lines = []
+    if file_type == "excel":
+        for sheet_name, stats in payload_stats(extracted).items():
+            lines += digest_table(stats, label=f"sheet {sheet_name}")
+    elif file_type == "csv":
+        lines += digest_table(payload_stats(extracted)[""])
+    elif file_type == "pdf":
+        lines.append(f"{extracted.get('total_pages', 0)} pages, {extracted.get('total_characters', 0)} characters")
+        lines.append(" ".join(extracted.get("text", "").split())[:200])
+    elif file_type == "word":
+        lines.append(f"{extracted.get('total_paragraphs', 0)} paragraphs, {extracted.get('total_tables', 0)} tables")
+        lines.append(" ".join(extracted.get("text", "").split())[:200])
+    else:
+        lines.append(f"{file_type or 'unknown'} file")
+
+    digest = "\n".join(line for line in lines if line)
+    if len(digest) > max_chars:
+        digest = digest[:max_chars].rsplit("\n", 1)[0] + "\n  ..."
+    return digest
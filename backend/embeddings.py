@@ -0,0 +1,86 @@
+"""
+Local CPU-only text embeddings
+Signed feature hashing of words and character trigrams into a fixed size
+float32 vector; no model download and stable across processes
+"""
+
+import re
+import zlib
+import numpy as np
+from typing import List
+
+from config import Config
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Phrases that mean the same thing in operations questions
+_CANONICAL_PHRASES = [
+    (re.compile(r"\bhow many\b"), "count"),
+    (re.compile(r"\bnumber of\b"), "count"),
+    (re.compile(r"\bno of\b"), "count"),
+    (re.compile(r"\btotal\b"), "count"),
+    (re.compile(r"\bcerts?\b"), "certification"),
+    (re.compile(r"\bcertifications\b"), "certification"),
+    (re.compile(r"\bbenched\b"), "bench"),
+    (re.compile(r"\bemployees?\b|\bpeople\b|\bresources?\b|\bengineers?\b"), "people"),
+]
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "on", "in", "of", "to", "for", "at", "by",
+    "what", "which", "who", "me", "show", "tell", "give", "do", "does", "we", "our", "there", "currently",
+    "right", "now", "please", "list", "any", "have", "has", "with", "and", "or", "i", "you", "can",
+    "people"
+}
+
+# Question-shape words carry little meaning on their own, so they get a lower weight
+_WEAK_TOKENS = {"count", "many", "much", "status", "details"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, canonicalize common phrasings and drop stopwords"""
+    text = text.lower()
+    for pattern, replacement in _CANONICAL_PHRASES:
+        text = pattern.sub(replacement, text)
+    tokens = []
+    for token in _TOKEN.findall(text):
+        # Crude plural folding: rrfs -> rrf, trainees -> trainee
+        if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "is", "us")):
+            token = token[:-1]
+        if token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = None):
+        self.dim = dim or Config.EMBEDDING_DIM
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a single text into an L2-normalized float32 vector"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = tokenize(text)
+
+        features = []
+        for token in tokens:
+            weight = 0.5 if token in _WEAK_TOKENS else 1.0
+            features.append((f"w:{token}", weight))
+            padded = f"#{token}#"
+            features += [(f"c:{padded[i:i + 3]}", 0.3 * weight) for i in range(len(padded) - 2)]
+
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += weight if (h >> 31) & 1 else -weight
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """Embed several texts into a (len(texts), dim) float32 matrix"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.embed(text)
+        return matrix
+
+
+# Shared embedder instance
+embedder = HashingEmbedder()
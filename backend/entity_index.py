@@ -0,0 +1,183 @@
+"""
+Entity index across files
+Maps normalised people names, employee ids, accounts, skills and certifications
+to the (file, sheet, row) locations where they appear. Posting lists are packed
+64-bit integers in array('Q') buffers and files are added, replaced or removed
+individually
+"""
+
+import re
+import threading
+from array import array
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from search_index import tokenize
+
+# Entity type per column name; checked in order, the first match wins
+ENTITY_COLUMNS = [
+    ("employee_id", re.compile(r"\b(emp|employee|associate|resource)[\s_]*(id|no|number|code)\b", re.IGNORECASE)),
+    ("certification", re.compile(r"certif|\bcert\b", re.IGNORECASE)),
+    ("skill", re.compile(r"skill|technology|\btech\b|competenc", re.IGNORECASE)),
+    ("account", re.compile(r"account|client|customer|project", re.IGNORECASE)),
+    ("person", re.compile(r"\bname\b|employee|associate|resource|manager|mentor|trainee", re.IGNORECASE)),
+]
+
+_MULTI_VALUE = re.compile(r"\s*[,;/|]\s*")
+_NON_WORD = re.compile(r"[^\w\s.-]+")
+_SPACES = re.compile(r"\s+")
+
+# Packed location: 24 bits file slot, 16 bits sheet slot, 24 bits row
+_SHEET_BITS = 24
+_FILE_BITS = 40
+MAX_NGRAM = 4
+
+
+def normalize_entity(value: Any) -> str:
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", str(value).lower())).strip()
+
+
+def column_entity_type(column: str) -> Optional[str]:
+    """Entity type of a column from its header, or None"""
+    for entity_type, pattern in ENTITY_COLUMNS:
+        if pattern.search(column):
+            return entity_type
+    return None
+
+
+class EntityIndex:
+    def __init__(self):
+        self.postings = defaultdict(lambda: array("Q"))  # normalised entity -> packed locations
+        self.entity_types = {}  # normalised entity -> entity type
+        self.display = {}  # normalised entity -> value as first seen
+        self.file_slots = []  # slot -> {"file_id", "category", "file", "sheets": [sheet]} or None
+        self.file_ids = {}  # file_id -> (slot, version, entities)
+        self._lock = threading.Lock()
+
+    def add_file(self, file_id: str, category: str, file_name: str, payload: Optional[Dict[str, Any]],
+                 version: str = None) -> bool:
+        """Index a file's entities, replacing its previous version; skipped when the version is unchanged"""
+        current = self.file_ids.get(file_id)
+        if current and version is not None and current[1] == version:
+            return False
+
+        tables = []
+        if payload and not payload.get("error"):
+            if payload.get("type") == "excel":
+                tables = [(name, sheet.get("data", [])) for name, sheet in payload.get("sheets", {}).items()]
+            elif payload.get("type") == "csv":
+                tables = [(None, payload.get("data", []))]
+
+        found = defaultdict(list)  # entity -> [(sheet slot, row)]
+        types, display = {}, {}
+        for sheet_slot, (_, rows) in enumerate(tables):
+            if not rows:
+                continue
+            typed_columns = [(column, column_entity_type(str(column))) for column in rows[0].keys()]
+            typed_columns = [(column, entity_type) for column, entity_type in typed_columns if entity_type]
+            for row_number, row in enumerate(rows):
+                for column, entity_type in typed_columns:
+                    value = row.get(column)
+                    if value is None or isinstance(value, float) and value != value:
+                        continue
+                    # Skills and certifications are often listed several to a cell
+                    parts = _MULTI_VALUE.split(str(value)) if entity_type in ("skill", "certification") else [str(value)]
+                    for part in parts:
+                        entity = normalize_entity(part)
+                        if len(entity) < 2 or entity in ("nan", "none"):
+                            continue
+                        found[entity].append((sheet_slot, row_number))
+                        types.setdefault(entity, entity_type)
+                        display.setdefault(entity, part.strip())
+
+        with self._lock:
+            self._remove_locked(file_id)
+            slot = len(self.file_slots)
+            self.file_slots.append({
+                "file_id": file_id,
+                "category": category,
+                "file": file_name,
+                "sheets": [sheet for sheet, _ in tables]
+            })
+            for entity, locations in found.items():
+                postings = self.postings[entity]
+                postings.extend((slot << _FILE_BITS) | (sheet_slot << _SHEET_BITS) | row
+                                for sheet_slot, row in locations)
+                self.entity_types.setdefault(entity, types[entity])
+                self.display.setdefault(entity, display[entity])
+            self.file_ids[file_id] = (slot, version, list(found))
+        return True
+
+    def remove_file(self, file_id: str) -> bool:
+        with self._lock:
+            return self._remove_locked(file_id)
+
+    def _remove_locked(self, file_id: str) -> bool:
+        current = self.file_ids.pop(file_id, None)
+        if current is None:
+            return False
+        slot, _, entities = current
+        for entity in entities:
+            postings = self.postings.get(entity)
+            if postings is None:
+                continue
+            kept = array("Q", (location for location in postings if location >> _FILE_BITS != slot))
+            if kept:
+                self.postings[entity] = kept
+            else:
+                del self.postings[entity]
+                self.entity_types.pop(entity, None)
+                self.display.pop(entity, None)
+        self.file_slots[slot] = None
+        return True
+
+    def _decode(self, location: int) -> Dict[str, Any]:
+        file_meta = self.file_slots[location >> _FILE_BITS]
+        return {
+            "file_id": file_meta["file_id"],
+            "category": file_meta["category"],
+            "file": file_meta["file"],
+            "sheet": file_meta["sheets"][(location >> _SHEET_BITS) & 0xFFFF],
+            "row": location & 0xFFFFFF
+        }
+
+    def lookup(self, name: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Locations of one entity"""
+        entity = normalize_entity(name)
+        with self._lock:
+            postings = self.postings.get(entity)
+            if not postings:
+                return []
+            return [dict(self._decode(location), entity=self.display[entity], type=self.entity_types[entity])
+                    for location in postings[:limit]]
+
+    def find(self, text: str) -> List[Tuple[str, str]]:
+        """Entities mentioned in a piece of text as (entity, type), longest matches first"""
+        words = normalize_entity(text).split()
+        found, covered = [], set()
+        with self._lock:
+            for size in range(MAX_NGRAM, 0, -1):
+                for start in range(len(words) - size + 1):
+                    span = set(range(start, start + size))
+                    if span & covered:
+                        continue
+                    entity = " ".join(words[start:start + size])
+                    # A lone stopword ("it", "all") is never taken for an entity
+                    if size == 1 and not tokenize(entity):
+                        continue
+                    if entity in self.postings:
+                        found.append((entity, self.entity_types[entity]))
+                        covered |= span
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        types = defaultdict(int)
+        for entity_type in self.entity_types.values():
+            types[entity_type] += 1
+        return {
+            "files": len(self.file_ids),
+            "entities": len(self.postings),
+            "postings": sum(len(postings) for postings in self.postings.values()),
+            "posting_bytes": sum(postings.itemsize * len(postings) for postings in self.postings.values()),
+            "by_type": dict(types)
+        }
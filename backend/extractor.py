@@ -4,6 +4,8 @@ import os
 import json
 from typing import Dict, List, Any
 
+from column_stats import table_stats
+
 # Utility functions to extract data from files
 
 def extract_excel(file_path):
@@ -21,8 +23,9 @@ def extract_excel(file_path):
                 "summary": {
                     "total_rows": len(df),
                     "total_columns": len(df.columns),
-                    "column_types": df.dtypes.to_dict()
-                }
+                    "column_types": df.dtypes.astype(str).to_dict()
+                },
+                "stats": table_stats(df)
             }
         
         return {
@@ -45,8 +48,9 @@ def extract_csv(file_path):
             "summary": {
                 "total_rows": len(df),
                 "total_columns": len(df.columns),
-                "column_types": df.dtypes.to_dict()
-            }
+                "column_types": df.dtypes.astype(str).to_dict()
+            },
+            "stats": table_stats(df)
         }
     except Exception as e:
         return {"error": f"Failed to extract CSV data: {str(e)}"}
@@ -215,3 +219,44 @@ def get_file_summary(file_path):
             "file_name": os.path.basename(file_path),
             "error": str(e)
         }
+
+def summarize_extraction(extracted, file_name=None):
+    """Build the same quick summary as get_file_summary from an already extracted payload"""
+    file_name = file_name or extracted.get("file_name", "")
+    
+    if extracted.get("error"):
+        return {
+            "file_name": file_name,
+            "error": extracted["error"]
+        }
+    
+    file_type = extracted.get("type")
+    if file_type == "excel":
+        sheets = list(extracted.get("sheets", {}).keys())
+        return {
+            "file_name": file_name,
+            "type": "excel",
+            "sheets": sheets,
+            "sheet_count": len(sheets)
+        }
+    elif file_type == "csv":
+        columns = extracted.get("columns", [])
+        return {
+            "file_name": file_name,
+            "type": "csv",
+            "columns": columns,
+            "column_count": len(columns),
+            "sample_rows": extracted.get("data", [])[:5]
+        }
+    elif file_type == "pdf":
+        return {
+            "file_name": file_name,
+            "type": "pdf",
+            "page_count": extracted.get("total_pages", 0)
+        }
+    else:
+        return {
+            "file_name": file_name,
+            "type": file_type or "unknown",
+            "extension": extracted.get("file_extension", "")
+        }
@@ -17,11 +17,14 @@ try:
     from extractor import extract_file
     from token_manager import token_manager
     from config import Config
+    from cache import payload_cache, file_version
 except ImportError as e:
     print(f"Import error: {e}")
     extract_file = None
     token_manager = None
     Config = None
+    payload_cache = None
+    file_version = None
 
 class FileScanner:
     def __init__(self):
@@ -150,13 +153,23 @@ class FileScanner:
         # Only process supported files
         if file_data["is_supported"]:
             try:
-                extracted = self._extract_file_data(token, file_id, file_name)
+                extracted = self._get_cached_file_data(file_item)
+                if extracted is None:
+                    extracted = self._extract_file_data(token, file_id, file_name)
+                    if payload_cache and not extracted.get("error"):
+                        payload_cache.put(file_id, extracted, file_version(file_item))
                 file_data["extracted_data"] = extracted
             except Exception as e:
                 file_data["error"] = str(e)
         
         return file_data
     
+    def _get_cached_file_data(self, file_item: Dict) -> Optional[Dict[str, Any]]:
+        """Get previously extracted data for an unchanged file from the payload cache"""
+        if not payload_cache:
+            return None
+        return payload_cache.get(file_item.get('id', ''), file_version(file_item))
+    
     def _extract_file_data(self, token: str, file_id: str, file_name: str) -> Dict[str, Any]:
         """Extract data from a file"""
         try:
@@ -295,5 +308,17 @@ class FileScanner:
             "message": message
         }
 
+def compact_scan_result(scan_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a scan result to the aggregated fields the serverless handlers use"""
+    return {
+        "scan_timestamp": scan_result.get("scan_timestamp"),
+        "base_folder": scan_result.get("base_folder"),
+        "total_items": scan_result.get("total_items", 0),
+        "folders": [{"name": f.get("name", "")} for f in scan_result.get("folders", [])],
+        "extracted_data": scan_result.get("extracted_data", {}),
+        "data_source": scan_result.get("data_source", "onedrive"),
+        "message": scan_result.get("message")
+    }
+
 # Global file scanner instance
 file_scanner = FileScanner()
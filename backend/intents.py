@@ -0,0 +1,410 @@
+"""
+Deterministic intent fast path
+Precompiled patterns pick the question shape (count, list, lookup, metric) and a
+small linear model over the hashing embeddings picks the data category, or
+"open" for questions that need the LLM. Matched intents are answered from
+aggregates precomputed at scan time
+"""
+
+import re
+import threading
+import numpy as np
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import Config
+from embeddings import HashingEmbedder, embedder
+from search_index import tokenize
+
+OPEN_ENDED = "open"
+
+_OPEN_ENDED = re.compile(
+    r"\b(why|how come|explain|summari[sz]e|recommend|suggest|compare|trend|should|predict|forecast|insight|analy[sz]e)\b",
+    re.IGNORECASE
+)
+_GROUPED = re.compile(r"\b(per|by|for each|grouped)\b", re.IGNORECASE)
+_COUNT = re.compile(r"\b(how many|number of|count of|count|total number)\b", re.IGNORECASE)
+_METRIC = re.compile(r"\b(average|avg|mean|overall|rate|percentage|percent)\b|%", re.IGNORECASE)
+_LIST = re.compile(r"^\s*(list|show|who|which|name|give me)\b|\b(list of|names of)\b", re.IGNORECASE)
+_LOOKUP = re.compile(r"\b(status of|details of|details for|info on|information on|look ?up|find)\b", re.IGNORECASE)
+
+# Columns whose values identify a row (names, employee ids, RRF ids)
+_IDENTIFIER_COLUMN = re.compile(r"name|employee|emp\b|emp id|\bid\b|rrf", re.IGNORECASE)
+_SPLIT = re.compile(r"[^\w.-]+")
+
+# Words a count question can carry without narrowing what is counted
+_COUNT_WORDS = {
+    "count", "number", "total", "record", "row", "entry", "entrie", "people", "person", "employee", "engineer",
+    "resource", "member", "staff", "currently", "current", "now", "right", "today", "all", "overall", "sheet", "file"
+}
+
+MAX_FILTER_VALUES = 50
+MAX_LIST_ITEMS = 25
+
+# Labelled examples for the category model; "open" marks questions for the LLM
+INTENT_TRAINING_EXAMPLES = [
+    ("how many people are on bench", "Bench Report"),
+    ("who is on the bench", "Bench Report"),
+    ("list bench resources", "Bench Report"),
+    ("how many idle engineers do we have", "Bench Report"),
+    ("available resources not allocated", "Bench Report"),
+    ("bench count", "Bench Report"),
+    ("which employees are unallocated", "Bench Report"),
+    ("show people waiting for a project", "Bench Report"),
+    ("how many open rrfs", "RRF"),
+    ("list open resource requests", "RRF"),
+    ("rrf count per client", "RRF"),
+    ("status of rrf", "RRF"),
+    ("how many positions are open", "RRF"),
+    ("which resource request forms are pending", "RRF"),
+    ("show demand for java developers", "RRF"),
+    ("open requisitions", "RRF"),
+    ("how many trainees are in training", "Training"),
+    ("list people in training", "Training"),
+    ("which courses are running", "Training"),
+    ("training completion count", "Training"),
+    ("who completed the aws course", "Training"),
+    ("learning programs in progress", "Training"),
+    ("how many freshers are being trained", "Training"),
+    ("show the training batch", "Training"),
+    ("what is the utilization", "Utilization"),
+    ("average utilization this month", "Utilization"),
+    ("overall billable percentage", "Utilization"),
+    ("utilization rate of the team", "Utilization"),
+    ("who has low utilization", "Utilization"),
+    ("capacity and workload", "Utilization"),
+    ("billable hours", "Utilization"),
+    ("show utilization by account", "Utilization"),
+    ("how many certifications do we have", "Certification List"),
+    ("list aws certified people", "Certification List"),
+    ("who holds azure certification", "Certification List"),
+    ("certification count", "Certification List"),
+    ("which certs expire soon", "Certification List"),
+    ("show qualified engineers", "Certification List"),
+    ("number of certified employees", "Certification List"),
+    ("gcp certifications", "Certification List"),
+    ("why is utilization dropping", OPEN_ENDED),
+    ("summarize the bench situation", OPEN_ENDED),
+    ("what should we do about open rrfs", OPEN_ENDED),
+    ("recommend people for the new project", OPEN_ENDED),
+    ("compare training and certification progress", OPEN_ENDED),
+    ("explain the trend in demand", OPEN_ENDED),
+    ("hello", OPEN_ENDED),
+    ("what can you do", OPEN_ENDED),
+    ("give me insights on operations", OPEN_ENDED),
+    ("how are we doing this quarter", OPEN_ENDED),
+    ("write an email to the team", OPEN_ENDED),
+    ("what are the risks", OPEN_ENDED),
+]
+
+
+class IntentClassifier:
+    """Softmax regression over hashing-embedding features"""
+
+    def __init__(self, question_embedder: HashingEmbedder = None):
+        self.embedder = question_embedder or embedder
+        self.labels = []
+        self.weights = None
+        self.bias = None
+
+    def train(self, examples: List[Tuple[str, str]] = None, epochs: int = 300, learning_rate: float = 0.5,
+              l2: float = 1e-3) -> "IntentClassifier":
+        examples = examples or INTENT_TRAINING_EXAMPLES
+        self.labels = sorted({label for _, label in examples})
+        features = self.embedder.embed_many([text for text, _ in examples])
+        targets = np.zeros((len(examples), len(self.labels)), dtype=np.float32)
+        for i, (_, label) in enumerate(examples):
+            targets[i, self.labels.index(label)] = 1.0
+
+        # Zero init and full-batch gradient descent keep training deterministic
+        self.weights = np.zeros((features.shape[1], len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(epochs):
+            probabilities = self._softmax(features @ self.weights + self.bias)
+            error = (probabilities - targets) / len(examples)
+            self.weights -= learning_rate * (features.T @ error + l2 * self.weights)
+            self.bias -= learning_rate * error.sum(axis=0)
+        return self
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return shifted / shifted.sum(axis=-1, keepdims=True)
+
+    def predict(self, question: str) -> Tuple[str, float]:
+        probabilities = self._softmax(self.embedder.embed(question) @ self.weights + self.bias)
+        best = int(np.argmax(probabilities))
+        return self.labels[best], float(probabilities[best])
+
+    def classify(self, question: str) -> Dict[str, Any]:
+        """Question shape from the patterns, category from the model"""
+        category, confidence = self.predict(question)
+        if _OPEN_ENDED.search(question) or _GROUPED.search(question):
+            kind = None
+        elif _LOOKUP.search(question):
+            kind = "lookup"
+        elif _COUNT.search(question):
+            kind = "count"
+        elif _METRIC.search(question):
+            kind = "metric"
+        elif _LIST.search(question):
+            kind = "list"
+        else:
+            kind = None
+
+        confident = category != OPEN_ENDED and confidence >= Config.INTENT_MIN_CONFIDENCE
+        # Lookups are resolved by identifier, so they do not need a confident category
+        matched = kind == "lookup" or (kind is not None and confident)
+        return {
+            "kind": kind if matched else OPEN_ENDED,
+            "category": category if matched and confident else None,
+            "confidence": round(confidence, 4)
+        }
+
+
+def _clean(value: Any) -> Optional[str]:
+    text = str(value).strip() if value is not None else ""
+    return text if text and text not in ("nan", "NaT", "None") else None
+
+
+class IntentAggregates:
+    """Per-category aggregates built at scan time: row counts, value counts, members per value, numeric means, identifiers.
+    Each file's contribution is kept so the file can be removed or replaced on its own"""
+
+    def __init__(self):
+        self.categories = defaultdict(lambda: {
+            "files": {},  # file_id -> file name
+            "rows": 0,
+            "value_counts": defaultdict(Counter),  # column -> value -> rows
+            "members": defaultdict(dict),  # (column, value) -> {file_id: identifiers}
+            "numeric": defaultdict(lambda: [0.0, 0]),  # column -> [sum, count]
+            "identifiers": defaultdict(dict)  # lowercased identifier -> {file_id: (file_id, sheet, row)}
+        })
+        self.file_aggregates = {}  # file_id -> (category, contribution)
+        self._lock = threading.RLock()
+
+    def add_file(self, file_id: str, category: str, file_name: str, payload: Optional[Dict[str, Any]]):
+        """Add a file's aggregates to its category, replacing any previous version of it"""
+        contribution = self._file_contribution(file_id, payload)
+        with self._lock:
+            self._remove_locked(file_id)
+            aggregates = self.categories[category]
+            aggregates["files"][file_id] = file_name
+            aggregates["rows"] += contribution["rows"]
+            for column, counts in contribution["value_counts"].items():
+                aggregates["value_counts"][column].update(counts)
+            for key, identifiers in contribution["members"].items():
+                aggregates["members"][key][file_id] = identifiers
+            for column, (total, count) in contribution["numeric"].items():
+                aggregates["numeric"][column][0] += total
+                aggregates["numeric"][column][1] += count
+            for identifier, location in contribution["identifiers"].items():
+                aggregates["identifiers"][identifier][file_id] = location
+            self.file_aggregates[file_id] = (category, contribution)
+
+    def remove_file(self, file_id: str) -> bool:
+        with self._lock:
+            return self._remove_locked(file_id)
+
+    def _remove_locked(self, file_id: str) -> bool:
+        current = self.file_aggregates.pop(file_id, None)
+        if current is None:
+            return False
+        category, contribution = current
+        aggregates = self.categories[category]
+        aggregates["files"].pop(file_id, None)
+        aggregates["rows"] -= contribution["rows"]
+        for column, counts in contribution["value_counts"].items():
+            remaining = aggregates["value_counts"][column]
+            remaining.subtract(counts)
+            for value in counts:
+                if remaining[value] <= 0:
+                    del remaining[value]
+            if not remaining:
+                del aggregates["value_counts"][column]
+        for key in contribution["members"]:
+            aggregates["members"][key].pop(file_id, None)
+            if not aggregates["members"][key]:
+                del aggregates["members"][key]
+        for column, (total, count) in contribution["numeric"].items():
+            aggregates["numeric"][column][0] -= total
+            aggregates["numeric"][column][1] -= count
+            if aggregates["numeric"][column][1] <= 0:
+                del aggregates["numeric"][column]
+        for identifier in contribution["identifiers"]:
+            aggregates["identifiers"][identifier].pop(file_id, None)
+            if not aggregates["identifiers"][identifier]:
+                del aggregates["identifiers"][identifier]
+        if not aggregates["files"]:
+            del self.categories[category]
+        return True
+
+    def _file_contribution(self, file_id: str, payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregates of a single file"""
+        contribution = {
+            "rows": 0,
+            "value_counts": defaultdict(Counter),
+            "members": defaultdict(list),
+            "numeric": defaultdict(lambda: [0.0, 0]),
+            "identifiers": {}
+        }
+        if not payload or payload.get("error"):
+            return contribution
+        if payload.get("type") == "excel":
+            tables = {name: sheet.get("data", []) for name, sheet in payload.get("sheets", {}).items()}
+        elif payload.get("type") == "csv":
+            tables = {None: payload.get("data", [])}
+        else:
+            return contribution
+
+        for sheet, rows in tables.items():
+            if not rows:
+                continue
+            contribution["rows"] += len(rows)
+            columns = list(rows[0].keys())
+            id_column = next((column for column in columns if _IDENTIFIER_COLUMN.search(str(column))), None)
+
+            distinct = defaultdict(set)
+            for row in rows:
+                for column, value in row.items():
+                    text = _clean(value)
+                    if text is not None and not isinstance(value, (int, float)):
+                        distinct[column].add(text)
+
+            for row_number, row in enumerate(rows):
+                identifier = _clean(row.get(id_column)) if id_column else None
+                if identifier:
+                    contribution["identifiers"].setdefault(identifier.lower(), (file_id, sheet, row_number))
+                for column, value in row.items():
+                    text = _clean(value)
+                    if text is None:
+                        continue
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        contribution["numeric"][str(column)][0] += float(value)
+                        contribution["numeric"][str(column)][1] += 1
+                    elif column != id_column and len(distinct[column]) <= MAX_FILTER_VALUES:
+                        contribution["value_counts"][str(column)][text] += 1
+                        members = contribution["members"][(str(column), text)]
+                        if identifier and len(members) < MAX_LIST_ITEMS:
+                            members.append(identifier)
+        return contribution
+
+    def _filters(self, category: str, question: str) -> List[Tuple[str, str]]:
+        """(column, value) pairs whose value appears as a word of the question"""
+        terms = set(tokenize(question))
+        filters = []
+        for column, counts in self.categories[category]["value_counts"].items():
+            for value in counts:
+                value_terms = tokenize(value)
+                if value_terms and set(value_terms) <= terms:
+                    filters.append((column, value))
+        return filters
+
+    def _unmatched_terms(self, category: str, question: str, filters: List[Tuple[str, str]]) -> List[str]:
+        """Question terms that are not count words, the category's name or an applied filter
+
+        Category keywords are not covered: routing words like "open", "available" or "billable" are qualifiers
+        here, and a count that ignores them would include the closed, allocated or non-billable rows
+        """
+        covered = set(tokenize(category))
+        for column, value in filters:
+            covered.update(tokenize(column))
+            covered.update(tokenize(value))
+        return [
+            term for term in tokenize(question)
+            if term not in _COUNT_WORDS and not any(term.startswith(word) for word in covered)
+        ]
+
+    def answer(self, intent: Dict[str, Any], question: str, get_payload) -> Optional[str]:
+        """Answer a matched intent, or None when the aggregates cannot answer it exactly"""
+        with self._lock:
+            return self._answer_locked(intent, question, get_payload)
+
+    def _answer_locked(self, intent: Dict[str, Any], question: str, get_payload) -> Optional[str]:
+        category = intent.get("category")
+        kind = intent["kind"]
+
+        if kind == "lookup":
+            # The predicted category is searched first, then every other one
+            ordered = sorted(self.categories, key=lambda name: name != category)
+            for name in ordered:
+                found = self._lookup(self.categories[name], question, get_payload)
+                if found:
+                    return f"{name} record:\n{found}"
+            return None
+
+        if category not in self.categories:
+            return None
+        aggregates = self.categories[category]
+
+        filters = self._filters(category, question)
+        if len(filters) > 1:
+            return None  # Combined filters need the SQL engine or the LLM
+
+        if kind == "count":
+            if self._unmatched_terms(category, question, filters):
+                return None  # "on bench with java skills": a qualifier the aggregates cannot apply
+            if filters:
+                column, value = filters[0]
+                return f"{aggregates['value_counts'][column][value]} records in {category} have {column} = {value}."
+            return (f"{category} has {aggregates['rows']} records across "
+                    f"{len(aggregates['files'])} file{'s' if len(aggregates['files']) != 1 else ''}.")
+
+        if kind == "list":
+            if not filters:
+                return None
+            column, value = filters[0]
+            members = [
+                member for identifiers in aggregates["members"].get((column, value), {}).values()
+                for member in identifiers
+            ][:MAX_LIST_ITEMS]
+            if not members:
+                return None
+            total = aggregates["value_counts"][column][value]
+            more = f" (showing {len(members)} of {total})" if total > len(members) else ""
+            return f"{category} records with {column} = {value}{more}:\n" + "\n".join(f"- {member}" for member in members)
+
+        if kind == "metric":
+            terms = set(tokenize(question))
+            for column, (total, count) in aggregates["numeric"].items():
+                if count and terms & set(tokenize(column)):
+                    return f"Average {column} in {category}: {total / count:,.2f} over {count} records."
+        return None
+
+    def _lookup(self, aggregates: Dict[str, Any], question: str, get_payload) -> Optional[str]:
+        words = [word for word in _SPLIT.split(question.lower()) if word]
+        # Identifiers can span several words ("john smith"), try the longest first
+        for size in (3, 2, 1):
+            for start in range(len(words) - size + 1):
+                locations = aggregates["identifiers"].get(" ".join(words[start:start + size]))
+                if locations:
+                    return self._format_row(next(iter(locations.values())), get_payload)
+        return None
+
+    def _format_row(self, location: Tuple[str, Optional[str], int], get_payload) -> Optional[str]:
+        file_id, sheet, row_number = location
+        payload = get_payload(file_id) or {}
+        if payload.get("type") == "excel":
+            rows = payload.get("sheets", {}).get(sheet, {}).get("data", [])
+        else:
+            rows = payload.get("data", [])
+        if row_number >= len(rows):
+            return None
+        values = [f"{column}: {_clean(value)}" for column, value in rows[row_number].items() if _clean(value)]
+        return "\n".join(values)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                category: {
+                    "files": len(aggregates["files"]),
+                    "rows": aggregates["rows"],
+                    "filter_columns": len(aggregates["value_counts"]),
+                    "identifiers": len(aggregates["identifiers"])
+                }
+                for category, aggregates in self.categories.items()
+            }
+
+
+# Shared classifier, trained once on the labelled examples
+intent_classifier = IntentClassifier().train()
@@ -0,0 +1,228 @@
+"""
+Cross-file join views
+Rows of the Bench Report, Certification List and Utilization categories are
+merged on a canonical employee key at scan time so questions spanning them
+("which benched engineers hold an AWS cert") see one keyed table. A view is
+rebuilt only when the version of one of its input categories changes
+"""
+
+import re
+import threading
+import pandas as pd
+from typing import Dict, Any, List, Optional, Callable
+
+from entity_index import column_entity_type
+from row_index import sheet_tables
+from search_index import CATEGORY_KEYWORDS, tokenize
+
+# Views materialised at scan time: the base category is left or inner joined with the others in order
+JOIN_VIEWS = {
+    "bench_certifications": {"inputs": ["Bench Report", "Certification List"], "how": "inner"},
+    "bench_utilization": {"inputs": ["Bench Report", "Utilization"], "how": "left"},
+    "certification_utilization": {"inputs": ["Certification List", "Utilization"], "how": "left"},
+}
+
+# Canonical key columns, by preference
+KEY_COLUMNS = ("_employee_id", "_employee_name")
+_KEY_TYPES = {"employee_id": "_employee_id", "person": "_employee_name"}
+_NON_KEY_CHARS = r"[^a-z0-9]+"
+# Person columns that name someone other than the row's employee ("Reporting Manager", "Mentor Name")
+_OTHER_PERSON = re.compile(r"manager|mentor|lead|supervisor|reporting|reports?\s+to|approver|owner|trainer", re.IGNORECASE)
+_OWN_KEY = re.compile(r"\b(emp|employee|associate|resource)\b|\bname\b|\bid\b", re.IGNORECASE)
+
+
+def _canonical(series: pd.Series) -> pd.Series:
+    """Lowercase alphanumerics without leading zeros, so "EMP-0042" and "emp 42" meet"""
+    keys = series.astype(str).str.lower().str.replace(_NON_KEY_CHARS, "", regex=True)
+    keys = keys.str.replace(r"^([a-z]*)0+(?=\d)", r"\1", regex=True)
+    return keys.where(series.notna() & (keys != "") & (keys != "nan") & (keys != "none"))
+
+
+def _key_columns(frame: pd.DataFrame) -> Dict[str, str]:
+    """Canonical key -> source column of a sheet
+
+    Columns naming the employee ("Employee Name", "Emp ID") win over other person columns such as a
+    reporting manager; otherwise the first matching column of each kind is used
+    """
+    keys, fallbacks = {}, {}
+    for column in frame.columns:
+        key = _KEY_TYPES.get(column_entity_type(str(column)))
+        if not key:
+            continue
+        if _OWN_KEY.search(str(column)) and not _OTHER_PERSON.search(str(column)):
+            keys.setdefault(key, column)
+        else:
+            fallbacks.setdefault(key, column)
+    return dict(fallbacks, **keys)
+
+
+def category_frame(category_data: Dict[str, Any],
+                   get_payload: Callable[[str, Optional[str]], Optional[Dict[str, Any]]]) -> Optional[pd.DataFrame]:
+    """All keyed sheets of a category stacked into one frame with canonical key columns, or None"""
+    frames = []
+    for entry in category_data.get("extracted_data", {}).values():
+        file_id = entry.get("file_info", {}).get("id")
+        if not file_id:
+            continue
+        for rows in sheet_tables(get_payload(file_id, entry.get("version"))).values():
+            if not rows:
+                continue
+            frame = pd.DataFrame(rows)
+            keys = _key_columns(frame)
+            if not keys:
+                continue
+            for key, column in keys.items():
+                frame[key] = _canonical(frame[column])
+            frames.append(frame)
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+
+def _join_key(left: pd.DataFrame, right: pd.DataFrame) -> Optional[str]:
+    """Best canonical key present and populated on both sides"""
+    for key in KEY_COLUMNS:
+        if key in left and key in right and left[key].notna().any() and right[key].notna().any():
+            return key
+    return None
+
+
+class JoinViews:
+    def __init__(self):
+        self.views = {}  # name -> {"inputs", "how", "key", "versions", "frame", "text"}
+        self.frames = {}  # category -> (version, frame or None)
+        self.builds = 0
+        self._lock = threading.Lock()
+
+    def _category_frame(self, category: str, category_data: Dict[str, Any],
+                        get_payload: Callable) -> Optional[pd.DataFrame]:
+        version = category_data.get("version")
+        cached = self.frames.get(category)
+        if cached and version is not None and cached[0] == version:
+            return cached[1]
+        frame = category_frame(category_data, get_payload)
+        self.frames[category] = (version, frame)
+        return frame
+
+    def refresh(self, scan_results: Dict[str, Any], get_payload: Callable) -> List[str]:
+        """Rebuild the views whose input categories changed; returns the names of the rebuilt views"""
+        rebuilt = []
+        for name, spec in JOIN_VIEWS.items():
+            inputs = spec["inputs"]
+            versions = [scan_results.get(category, {}).get("version") for category in inputs]
+            current = self.views.get(name)
+            if current and None not in versions and current["versions"] == versions:
+                continue
+
+            frame, key = None, None
+            base = self._category_frame(inputs[0], scan_results.get(inputs[0], {}), get_payload)
+            if base is not None:
+                frame = base
+                for category in inputs[1:]:
+                    other = self._category_frame(category, scan_results.get(category, {}), get_payload)
+                    step_key = _join_key(frame, other) if other is not None else None
+                    if step_key is None:
+                        frame = None
+                        break
+                    # Key columns of the joined side are dropped, clashing columns are labelled with its category
+                    other = other.drop(columns=[column for column in KEY_COLUMNS if column in other and column != step_key])
+                    frame = frame.dropna(subset=[step_key]).merge(
+                        other.dropna(subset=[step_key]), on=step_key, how=spec["how"], suffixes=("", f" ({category})")
+                    )
+                    key = key or step_key
+
+            with self._lock:
+                if frame is None:
+                    self.views.pop(name, None)
+                else:
+                    frame = frame.drop(columns=[column for column in KEY_COLUMNS if column in frame and column != key])
+                    frame = frame.reset_index(drop=True)
+                    values = frame.drop(columns=[key])
+                    values = values.astype(object).where(values.notna(), "").astype(str)
+                    self.views[name] = {
+                        "inputs": inputs,
+                        "how": spec["how"],
+                        "key": key,
+                        "versions": versions,
+                        "frame": frame,
+                        # Lowercased row text for vectorised matching against questions
+                        "text": values.iloc[:, 0].str.cat(
+                            [values[column] for column in values.columns[1:]], sep=" "
+                        ).str.lower() if len(values.columns) else pd.Series([], dtype=str)
+                    }
+                    self.builds += 1
+            rebuilt.append(name)
+        return rebuilt
+
+    def forget(self, categories: set):
+        """Drop the cached frames of some categories so their views are rebuilt by the next refresh"""
+        with self._lock:
+            for category in categories:
+                self.frames.pop(category, None)
+            for view in self.views.values():
+                if set(view["inputs"]) & set(categories):
+                    view["versions"] = None
+
+    def relevant(self, categories: List[str], question: str = "") -> List[str]:
+        """Views whose every input is among the routed categories or named in the question ("benched", "certs")"""
+        terms = set(tokenize(question))
+
+        def wanted(category: str) -> bool:
+            return category in categories or any(
+                term.startswith(keyword) for keyword in CATEGORY_KEYWORDS.get(category, []) for term in terms
+            )
+
+        return [name for name, view in self.views.items() if all(wanted(category) for category in view["inputs"])]
+
+    def matching_rows(self, name: str, question: str, limit: int) -> List[Dict[str, Any]]:
+        """Rows of a view matching the most question terms"""
+        view = self.views.get(name)
+        if view is None:
+            return []
+        terms = [term for term in set(tokenize(question)) if len(term) > 1]
+        if not terms or view["text"].empty:
+            return []
+        scores = sum(view["text"].str.contains(rf"\b{re.escape(term)}", regex=True).astype(int) for term in terms)
+        best = scores.max()
+        if not best:
+            return []
+        frame = view["frame"].drop(columns=[view["key"]])
+        matches = frame[scores == best].head(limit)
+        return [
+            {str(column): str(value) for column, value in row.items() if pd.notna(value) and str(value).strip()}
+            for row in matches.to_dict("records")
+        ]
+
+    def rows(self, name: str, offset: int = 0, limit: int = 100) -> Optional[Dict[str, Any]]:
+        view = self.views.get(name)
+        if view is None:
+            return None
+        frame = view["frame"].drop(columns=[view["key"]])
+        page = frame.iloc[offset:offset + limit]
+        return {
+            "view": name,
+            "total": len(frame),
+            "offset": offset,
+            "columns": [str(column) for column in frame.columns],
+            "rows": page.astype(object).where(page.notna(), None).to_dict("records")
+        }
+
+    def describe(self, category: str = None) -> Dict[str, Any]:
+        """Catalog of the materialised views, optionally only those using a category"""
+        return {
+            name: {
+                "inputs": view["inputs"],
+                "how": view["how"],
+                "key": view["key"].lstrip("_"),
+                "rows": len(view["frame"]),
+                "columns": [str(column) for column in view["frame"].columns if column != view["key"]]
+            }
+            for name, view in self.views.items()
+            if category is None or category in view["inputs"]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "views": {name: len(view["frame"]) for name, view in self.views.items()},
+            "builds": self.builds
+        }
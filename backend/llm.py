@@ -1,15 +1,38 @@
 # LLM Integration for Gemini, Hugging Face, and other models
 from fastapi import HTTPException
-import requests
+import asyncio
+import time
+import httpx
 import json
 from typing import Dict, Any, Optional
+from config import Config, get_provider_api_key, get_provider_model, get_provider_endpoint
+from metrics import metrics
+from resilience import CircuitBreaker
+from batching import MicroBatcher
+from mock_llm import MockResponder
+from prompt_builder import PromptBuilder, prompt_budget
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 class LLMClient:
-    def __init__(self, provider: str, api_key: str = None, model: str = None, endpoint: str = None):
+    # Shared across clients so the in-flight limit applies per provider, not per instance
+    _semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    def __init__(self, provider: str, api_key: str = None, model: str = None, endpoint: str = None,
+                 max_concurrency: int = None):
         self.provider = provider.lower()
         self.api_key = api_key
         self.model = model
         self.endpoint = endpoint
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.breaker = CircuitBreaker(self.provider)
+        self._http = None
+        self._hf_batcher = None
+        self._mock = MockResponder() if self.provider == "mock" else None
         
         # Set default endpoints based on provider
         if self.provider == "gemini" and not self.endpoint:
@@ -19,21 +42,75 @@ class LLMClient:
         elif self.provider == "openai" and not self.endpoint:
             self.endpoint = "https://api.openai.com/v1/chat/completions"
 
-    def query(self, prompt: str, context: dict = None) -> str:
-        """Query the LLM with the given prompt and context"""
+    async def query(self, prompt: str, context: dict = None) -> str:
+        """Query the LLM with the given prompt and context, guarded by the provider's circuit breaker"""
+        if not self.breaker.allow():
+            raise HTTPException(status_code=503, detail=f"{self.provider} circuit open")
+        try:
+            result = await self._query(prompt, context)
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _query(self, prompt: str, context: dict = None) -> str:
+        """Dispatch to the provider adapter"""
         try:
             if self.provider == "gemini":
-                return self._query_gemini(prompt, context)
+                return await self._query_gemini(prompt, context)
             elif self.provider == "huggingface":
-                return self._query_huggingface(prompt, context)
+                return await self._query_huggingface(prompt, context)
             elif self.provider == "openai":
-                return self._query_openai(prompt, context)
+                return await self._query_openai(prompt, context)
+            elif self.provider == "mock":
+                return await self._mock.respond(self._prepare_prompt_with_context(prompt, context))
             else:
                 raise HTTPException(status_code=400, detail=f"Unsupported LLM provider: {self.provider}")
+        except httpx.TimeoutException as e:
+            raise HTTPException(status_code=504, detail=f"LLM request timed out: {type(e).__name__}")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"LLM query failed: {str(e)}")
 
-    def _query_gemini(self, prompt: str, context: dict = None) -> str:
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, created lazily on the running event loop"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(
+                    connect=Config.LLM_CONNECT_TIMEOUT,
+                    read=Config.LLM_READ_TIMEOUT,
+                    write=Config.LLM_CONNECT_TIMEOUT,
+                    pool=Config.LLM_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self._http
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the in-flight call limiter for this provider"""
+        if self.provider not in LLMClient._semaphores:
+            LLMClient._semaphores[self.provider] = asyncio.Semaphore(self.max_concurrency)
+        return LLMClient._semaphores[self.provider]
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        """POST through the pooled client, waiting for a free per-provider slot"""
+        async with self._get_semaphore():
+            return await self._get_http().post(url, **kwargs)
+
+    async def _query_gemini(self, prompt: str, context: dict = None) -> str:
         """Query Google Gemini API"""
         if not self.api_key:
             raise HTTPException(status_code=400, detail="Gemini API key is required")
@@ -49,24 +126,12 @@ class LLMClient:
             "Content-Type": "application/json",
         }
         
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": full_prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.7,
-                "topK": 40,
-                "topP": 0.95,
-                "maxOutputTokens": 2048,
-            }
-        }
+        payload = self._gemini_payload(full_prompt)
         
         # Add API key as query parameter
         params = {"key": self.api_key}
         
-        response = requests.post(url, json=payload, headers=headers, params=params)
+        response = await self._post(url, json=payload, headers=headers, params=params)
         
         if response.status_code != 200:
             raise HTTPException(status_code=500, detail=f"Gemini API error: {response.text}")
@@ -78,7 +143,7 @@ class LLMClient:
         else:
             raise HTTPException(status_code=500, detail="No response from Gemini")
 
-    def _query_huggingface(self, prompt: str, context: dict = None) -> str:
+    async def _query_huggingface(self, prompt: str, context: dict = None) -> str:
         """Query Hugging Face Inference API"""
         if not self.api_key:
             raise HTTPException(status_code=400, detail="Hugging Face API key is required")
@@ -89,13 +154,27 @@ class LLMClient:
         # Prepare the prompt with context
         full_prompt = self._prepare_prompt_with_context(prompt, context)
         
+        if Config.HF_BATCH_SIZE > 1:
+            return await self._get_hf_batcher().submit(full_prompt)
+        
+        results = await self._send_huggingface([full_prompt])
+        return results[0]
+    
+    def _get_hf_batcher(self) -> MicroBatcher:
+        """Get the micro-batcher that coalesces concurrent Hugging Face prompts"""
+        if self._hf_batcher is None:
+            self._hf_batcher = MicroBatcher(self._send_huggingface, Config.HF_BATCH_SIZE, Config.HF_BATCH_WAIT_MS)
+        return self._hf_batcher
+    
+    async def _send_huggingface(self, prompts: list) -> list:
+        """Send one or more prompts in a single Inference API call; returns one text per prompt"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
         payload = {
-            "inputs": full_prompt,
+            "inputs": prompts[0] if len(prompts) == 1 else prompts,
             "parameters": {
                 "max_length": 512,
                 "temperature": 0.7,
@@ -104,14 +183,26 @@ class LLMClient:
         }
         
         url = f"{self.endpoint}/{self.model}"
-        response = requests.post(url, json=payload, headers=headers)
+        response = await self._post(url, json=payload, headers=headers)
         
         if response.status_code != 200:
             raise HTTPException(status_code=500, detail=f"Hugging Face API error: {response.text}")
         
         result = response.json()
         
-        if isinstance(result, list) and len(result) > 0:
+        if len(prompts) == 1:
+            return [self._huggingface_text(result)]
+        if not isinstance(result, list) or len(result) != len(prompts):
+            raise HTTPException(status_code=500, detail=f"Hugging Face API returned an unexpected batch: {str(result)[:200]}")
+        return [self._huggingface_text(item) for item in result]
+    
+    @staticmethod
+    def _huggingface_text(result) -> str:
+        """Extract the generated text from one Inference API result"""
+        if isinstance(result, dict):
+            result = [result]
+        
+        if isinstance(result, list) and len(result) > 0 and isinstance(result[0], dict):
             if "generated_text" in result[0]:
                 return result[0]["generated_text"]
             elif "text" in result[0]:
@@ -120,7 +211,7 @@ class LLMClient:
         # Fallback for different response formats
         return str(result)
 
-    def _query_openai(self, prompt: str, context: dict = None) -> str:
+    async def _query_openai(self, prompt: str, context: dict = None) -> str:
         """Query OpenAI API"""
         if not self.api_key:
             raise HTTPException(status_code=400, detail="OpenAI API key is required")
@@ -136,6 +227,126 @@ class LLMClient:
             "Content-Type": "application/json"
         }
         
+        payload = self._openai_payload(full_prompt)
+        
+        response = await self._post(self.endpoint, json=payload, headers=headers)
+        
+        if response.status_code != 200:
+            raise HTTPException(status_code=500, detail=f"OpenAI API error: {response.text}")
+        
+        result = response.json()
+        
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"]
+        else:
+            raise HTTPException(status_code=500, detail="No response from OpenAI")
+
+    async def stream(self, prompt: str, context: dict = None):
+        """Stream the answer as text chunks; providers without streaming yield one chunk"""
+        if self.provider not in ("gemini", "openai", "mock"):
+            yield await self.query(prompt, context)
+            return
+        
+        if not self.breaker.allow():
+            raise HTTPException(status_code=503, detail=f"{self.provider} circuit open")
+        try:
+            if self.provider == "gemini":
+                async for chunk in self._stream_gemini(prompt, context):
+                    yield chunk
+            elif self.provider == "mock":
+                async for chunk in self._mock.stream(self._prepare_prompt_with_context(prompt, context)):
+                    yield chunk
+            else:
+                async for chunk in self._stream_openai(prompt, context):
+                    yield chunk
+            self.breaker.record_success()
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.record_cancelled()
+            raise
+        except HTTPException:
+            self.breaker.record_failure()
+            raise
+        except httpx.TimeoutException as e:
+            self.breaker.record_failure()
+            raise HTTPException(status_code=504, detail=f"LLM request timed out: {type(e).__name__}")
+        except Exception as e:
+            self.breaker.record_failure()
+            raise HTTPException(status_code=500, detail=f"LLM stream failed: {str(e)}")
+
+    async def _stream_sse(self, url: str, **kwargs):
+        """POST a streaming request and yield the JSON payload of every SSE data line"""
+        async with self._get_semaphore():
+            async with self._get_http().stream("POST", url, **kwargs) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise HTTPException(status_code=500, detail=f"{self.provider} API error: {body.decode(errors='replace')}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        return
+                    if data:
+                        yield json.loads(data)
+
+    async def _stream_gemini(self, prompt: str, context: dict = None):
+        """Stream from Gemini streamGenerateContent"""
+        if not self.api_key:
+            raise HTTPException(status_code=400, detail="Gemini API key is required")
+        
+        if not self.model:
+            self.model = "gemini-1.5-flash"  # Default model
+        
+        full_prompt = self._prepare_prompt_with_context(prompt, context)
+        url = f"{self.endpoint}/{self.model}:streamGenerateContent"
+        params = {"key": self.api_key, "alt": "sse"}
+        
+        async for event in self._stream_sse(url, json=self._gemini_payload(full_prompt),
+                                            headers={"Content-Type": "application/json"}, params=params):
+            for candidate in event.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+
+    async def _stream_openai(self, prompt: str, context: dict = None):
+        """Stream from OpenAI chat completions with stream: true"""
+        if not self.api_key:
+            raise HTTPException(status_code=400, detail="OpenAI API key is required")
+        
+        if not self.model:
+            self.model = "gpt-3.5-turbo"  # Default model
+        
+        full_prompt = self._prepare_prompt_with_context(prompt, context)
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        async for event in self._stream_sse(self.endpoint, json=self._openai_payload(full_prompt, stream=True),
+                                            headers=headers):
+            for choice in event.get("choices", [])[:1]:
+                content = choice.get("delta", {}).get("content")
+                if content:
+                    yield content
+
+    def _gemini_payload(self, full_prompt: str) -> Dict[str, Any]:
+        """Build the Gemini generateContent request body"""
+        return {
+            "contents": [{
+                "parts": [{
+                    "text": full_prompt
+                }]
+            }],
+            "generationConfig": {
+                "temperature": 0.7,
+                "topK": 40,
+                "topP": 0.95,
+                "maxOutputTokens": 2048,
+            }
+        }
+
+    def _openai_payload(self, full_prompt: str, stream: bool = False) -> Dict[str, Any]:
+        """Build the OpenAI chat completions request body"""
         payload = {
             "model": self.model,
             "messages": [
@@ -151,59 +362,90 @@ class LLMClient:
             "temperature": 0.7,
             "max_tokens": 2048
         }
-        
-        response = requests.post(self.endpoint, json=payload, headers=headers)
-        
-        if response.status_code != 200:
-            raise HTTPException(status_code=500, detail=f"OpenAI API error: {response.text}")
-        
-        result = response.json()
-        
-        if "choices" in result and len(result["choices"]) > 0:
-            return result["choices"][0]["message"]["content"]
-        else:
-            raise HTTPException(status_code=500, detail="No response from OpenAI")
+        if stream:
+            payload["stream"] = True
+        return payload
 
     def _prepare_prompt_with_context(self, prompt: str, context: dict = None) -> str:
         """Prepare the prompt with context information"""
         if not context:
             return prompt
         
-        context_str = ""
+        return self.build_prompt(prompt, context)["prompt"]
+
+    def build_prompt(self, prompt: str, context: dict) -> Dict[str, Any]:
+        """Pack the context into the model's token budget: summary, relevant rows, file digests, then file lists"""
+        builder = PromptBuilder(prompt_budget(self.model))
         
         # Add bot information
         if "bot_info" in context:
             bot_info = context["bot_info"]
-            context_str += f"Bot: {bot_info.get('name', 'Operations Bot')}\n"
-            context_str += f"Description: {bot_info.get('description', '')}\n"
-            context_str += f"Available Categories: {', '.join(bot_info.get('categories', []))}\n\n"
+            builder.add_section("bot_info", 0, [
+                f"Bot: {bot_info.get('name', 'Operations Bot')}",
+                f"Description: {bot_info.get('description', '')}",
+                f"Available Categories: {', '.join(bot_info.get('categories', []))}"
+            ])
         
         # Add data summary
         if "data_summary" in context:
             summary = context["data_summary"]
-            context_str += f"Data Summary:\n"
-            context_str += f"- Total Categories: {summary.get('total_categories', 0)}\n"
-            context_str += f"- Total Files: {summary.get('total_files', 0)}\n"
-            context_str += f"- Last Scan: {summary.get('last_scan', 'Unknown')}\n\n"
-        
-        # Add available data
-        if "available_data" in context:
-            available_data = context["available_data"]
-            if available_data:
-                context_str += "Available Data:\n"
-                for category, data in available_data.items():
-                    context_str += f"- {category}: {data.get('file_count', 0)} files\n"
-                    if data.get('files'):
-                        context_str += f"  Files: {', '.join(data['files'][:5])}"  # Show first 5 files
-                        if len(data['files']) > 5:
-                            context_str += f" (and {len(data['files']) - 5} more)"
-                        context_str += "\n"
-                context_str += "\n"
-        
-        # Combine context and prompt
-        full_prompt = f"{context_str}Question: {prompt}\n\nPlease provide a helpful answer based on the available data."
-        
-        return full_prompt
+            builder.add_section("data_summary", 0, [
+                f"- Total Categories: {summary.get('total_categories', 0)}",
+                f"- Total Files: {summary.get('total_files', 0)}",
+                f"- Last Scan: {summary.get('last_scan', 'Unknown')}"
+            ], header="Data Summary:")
+        
+        available_data = context.get("available_data", {})
+        builder.add_section("available_data", 0, [
+            f"- {category}: {data.get('file_count', 0)} files"
+            for category, data in available_data.items()
+        ], header="Available Data:")
+        
+        # Document passages retrieved for this question
+        builder.add_section("passages", 1, [
+            self._format_passage(passage) for passage in context.get("passages", [])
+        ], header="Relevant Passages:")
+        
+        # Rows joined across categories on the employee key
+        view_lines = []
+        for view in context.get("joined_views", []):
+            if view.get("rows"):
+                view_lines.append(f"- {' x '.join(view['inputs'])}:")
+                view_lines.extend(
+                    "    " + "; ".join(f"{column}={value}" for column, value in row.items()) for row in view["rows"]
+                )
+        builder.add_section("joined_views", 1, view_lines, header="Joined Rows:")
+        
+        # Precomputed per-file digests summarize whole files
+        digest_lines = []
+        for category, data in available_data.items():
+            for file_name, digest in data.get("digests", {}).items():
+                digest_lines.append(f"- {category} / {file_name}:")
+                digest_lines.extend(f"    {line}" for line in digest.splitlines())
+        builder.add_section("digests", 2, digest_lines, header="File Digests:")
+        
+        # Rows retrieved for this question, already capped by the row and byte budget
+        builder.add_section("relevant_rows", 1, [
+            self._format_row(row) for row in context.get("relevant_rows", [])
+        ], header="Relevant Rows:")
+        
+        # File names are the least informative, so they only fill what is left
+        builder.add_section("file_lists", 3, [
+            f"- {category}: {', '.join(data['files'])}"
+            for category, data in available_data.items() if data.get("files")
+        ], header="Files:")
+        
+        return builder.build(prompt)
+
+    def _format_row(self, row: Dict[str, Any]) -> str:
+        """Render a retrieved row as a single compact line"""
+        values = "; ".join(f"{column}={value}" for column, value in row.get("values", {}).items())
+        return f"- [{row.get('category', '')} / {row.get('file', '')} / {row.get('sheet', '')}] {values}"
+
+    def _format_passage(self, passage: Dict[str, Any]) -> str:
+        """Render a retrieved document passage with its source"""
+        page = f" p.{passage['page']}" if passage.get("page") else ""
+        return f"- [{passage.get('category', '')} / {passage.get('file', '')}{page}] {passage.get('text', '')}"
 
     def get_available_models(self) -> Dict[str, list]:
         """Get available models for each provider"""
@@ -224,5 +466,176 @@ class LLMClient:
                 "gpt-3.5-turbo",
                 "gpt-4",
                 "gpt-4-turbo"
+            ],
+            "mock": [
+                "mock"
             ]
         }
+
+
+class ProviderChain:
+    """Ordered list of LLM clients with failover and optional hedged requests"""
+    
+    def __init__(self, clients: list, deadline: float = None, hedge: bool = None, hedge_delay: float = None):
+        self.clients = clients
+        self.deadline = deadline or Config.LLM_PROVIDER_TIMEOUT
+        self.hedge = Config.LLM_HEDGE_ENABLED if hedge is None else hedge
+        self.default_hedge_delay = hedge_delay if hedge_delay is not None else Config.LLM_HEDGE_DELAY_SECONDS
+        self.primary = clients[0]
+    
+    @classmethod
+    def from_config(cls) -> "ProviderChain":
+        """Build the chain from LLM_PROVIDER_CHAIN"""
+        clients = []
+        for provider in Config.LLM_PROVIDER_CHAIN:
+            clients.append(LLMClient(
+                provider=provider,
+                api_key=get_provider_api_key(provider),
+                model=get_provider_model(provider),
+                endpoint=get_provider_endpoint(provider)
+            ))
+        return cls(clients)
+    
+    @property
+    def provider(self) -> str:
+        return ">".join(client.provider for client in self.clients)
+    
+    @property
+    def model(self) -> str:
+        return self.primary.model
+    
+    def build_prompt(self, prompt: str, context: dict) -> Dict[str, Any]:
+        return self.primary.build_prompt(prompt, context)
+    
+    def get_available_models(self) -> Dict[str, list]:
+        return self.primary.get_available_models()
+    
+    async def aclose(self):
+        for client in self.clients:
+            await client.aclose()
+    
+    def available(self) -> bool:
+        """Whether any provider's circuit would currently let a call through"""
+        return any(client.breaker.would_allow() for client in self.clients)
+    
+    def hedge_delay(self) -> float:
+        """Delay before firing the hedge: the primary's recent p95, once there is enough history"""
+        tracker = metrics.tracker(f"llm.{self.primary.provider}")
+        p95 = tracker.percentile(95)
+        if p95 is None or len(tracker.samples) < 20:
+            return self.default_hedge_delay
+        return p95
+    
+    async def query(self, prompt: str, context: dict = None) -> str:
+        """Query providers in order; move on after an error or deadline, and hedge on slowness if enabled"""
+        pending = set()
+        errors = []
+        next_index = 0
+        
+        def start_next():
+            nonlocal next_index
+            client = self.clients[next_index]
+            next_index += 1
+            pending.add(asyncio.create_task(self._attempt(client, prompt, context)))
+        
+        start_next()
+        try:
+            while pending:
+                can_hedge = self.hedge and next_index < len(self.clients)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay() if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Primary is slower than usual: fire the next provider alongside it
+                    start_next()
+                    continue
+                
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+                
+                if not pending and next_index < len(self.clients):
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        details = "; ".join(self._describe(e) for e in errors)
+        raise HTTPException(status_code=502, detail=f"All LLM providers failed: {details}")
+    
+    async def stream(self, prompt: str, context: dict = None):
+        """Stream from the first provider that starts producing output
+
+        Every wait for the next chunk, the first included, is bounded by the per-attempt deadline, so a
+        provider that stalls mid-stream fails the response instead of holding it open
+        """
+        errors = []
+        for client in self.clients:
+            started = time.perf_counter()
+            produced = False
+            chunks = client.stream(prompt, context)
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.deadline)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        # The stream saw a cancellation, but a stalled provider is failing
+                        client.breaker.record_failure()
+                        raise HTTPException(status_code=504, detail=f"{client.provider} stalled for {self.deadline}s")
+                    produced = True
+                    yield chunk
+                metrics.record(f"llm.{client.provider}", time.perf_counter() - started)
+                return
+            except Exception as e:
+                metrics.record(f"llm.{client.provider}", time.perf_counter() - started, success=False)
+                if produced:
+                    raise
+                errors.append(e)
+            finally:
+                await chunks.aclose()
+        
+        details = "; ".join(self._describe(e) for e in errors)
+        raise HTTPException(status_code=502, detail=f"All LLM providers failed: {details}")
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "providers": [client.provider for client in self.clients],
+            "deadline_seconds": self.deadline,
+            "hedging": self.hedge,
+            "hedge_delay_seconds": round(self.hedge_delay(), 3) if self.hedge else None,
+            "stats": {
+                client.provider: metrics.tracker(f"llm.{client.provider}").summary()
+                for client in self.clients
+            },
+            "circuits": {client.provider: client.breaker.status() for client in self.clients},
+            "batching": {
+                client.provider: client._hf_batcher.stats() for client in self.clients if client._hf_batcher
+            }
+        }
+    
+    async def _attempt(self, client: LLMClient, prompt: str, context: dict = None) -> str:
+        """One provider call under the per-attempt deadline, recording latency and success"""
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(client.query(prompt, context), timeout=self.deadline)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            # The query saw a cancellation, but a provider that outlives the deadline is failing
+            client.breaker.record_failure()
+            metrics.record(f"llm.{client.provider}", time.perf_counter() - started, success=False)
+            raise HTTPException(status_code=504, detail=f"{client.provider} exceeded {self.deadline}s deadline")
+        except Exception:
+            metrics.record(f"llm.{client.provider}", time.perf_counter() - started, success=False)
+            raise
+        metrics.record(f"llm.{client.provider}", time.perf_counter() - started)
+        return result
+    
+    def _describe(self, error: Exception) -> str:
+        return error.detail if isinstance(error, HTTPException) else str(error)
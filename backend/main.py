@@ -1,13 +1,68 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from bot import bot
-from config import Config, validate_config
+from config import Config, validate_config, get_default_model
+from cache import payload_cache
+from scheduler import scheduler
+from metrics import metrics
+from answer_cache import answer_cache, semantic_cache
+from resilience import llm_limiter
+from notifications import ChangeQueue, SubscriptionManager, parse_notifications
 import asyncio
+import json
 
-app = FastAPI()
+change_queue = ChangeQueue(bot.refresh_files)
+subscription_manager = SubscriptionManager()
+
+warmup_state = {"status": "pending", "source": None, "error": None}
+
+async def warm_up():
+    """Load the last snapshot, then refresh with a full scan if it is missing or stale"""
+    warmup_state["status"] = "warming"
+    try:
+        # Rebuilding the indexes from the snapshot is slow; the app serves probes meanwhile
+        if await asyncio.to_thread(bot.load_snapshot):
+            warmup_state["source"] = "snapshot"
+            if bot._is_cache_valid():
+                warmup_state["status"] = "ready"
+                return
+        # A stale snapshot is still served while the refresh runs
+        await asyncio.to_thread(bot.rescan, True)
+        warmup_state["source"] = warmup_state["source"] or "scan"
+        warmup_state["status"] = "ready"
+    except Exception as e:
+        warmup_state["status"] = "failed"
+        warmup_state["error"] = str(e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep a reference to the task so it is not collected and can be cancelled on shutdown
+    warmup_state["task"] = asyncio.create_task(warm_up())
+    if Config.ENABLE_SCHEDULER:
+        scheduler.add_category_refreshes(bot)
+        if subscription_manager.enabled:
+            scheduler.add_job(
+                "renew_subscription",
+                subscription_manager.expiration_minutes * 60 / 2,
+                subscription_manager.ensure_subscription,
+                run_immediately=True
+            )
+        scheduler.start()
+    yield
+    warmup_state["task"].cancel()
+    try:
+        await warmup_state["task"]
+    except asyncio.CancelledError:
+        pass
+    await scheduler.stop()
+    await bot.llm_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware to allow frontend connections
 app.add_middleware(
@@ -29,6 +84,20 @@ class BotQuestionRequest(BaseModel):
 
 class CategoryRequest(BaseModel):
     category: str
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
+    fields: Optional[List[str]] = None  # File keys, or row columns when file_id is given
+    summary_only: bool = False
+    file_id: Optional[str] = None  # Page through this file's rows instead of the file list
+    sheet: Optional[str] = None
+
+class CacheControlRequest(BaseModel):
+    category: Optional[str] = None
+    file_id: Optional[str] = None
+
+class SQLQueryRequest(BaseModel):
+    sql: str
+    max_rows: Optional[int] = None
 
 @app.get("/api/")
 def read_root():
@@ -44,6 +113,24 @@ def read_root():
         "categories": Config.DATA_CATEGORIES
     }
 
+# Liveness probe - the process is up and serving requests
+@app.get("/api/health/live")
+def liveness():
+    return {"status": "alive"}
+
+# Readiness probe - only succeeds once scan data is loaded in memory
+@app.get("/api/health/ready")
+def readiness():
+    ready = bot.is_ready
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "warmup": warmup_state["status"],
+        "source": warmup_state["source"],
+        "error": warmup_state["error"],
+        "last_scan": bot.last_scan.isoformat() if bot.last_scan else None
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
 # Bot Question Endpoint - Main interface for users
 @app.post("/api/bot/ask")
 async def ask_bot(req: BotQuestionRequest):
@@ -56,6 +143,61 @@ async def ask_bot(req: BotQuestionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Bot query failed: {str(e)}")
 
+# Streaming answers over Server-Sent Events
+@app.post("/api/bot/ask/stream")
+async def ask_bot_stream(req: BotQuestionRequest):
+    if not req.question.strip():
+        raise HTTPException(status_code=400, detail="Question is required")
+    
+    async def event_stream():
+        async for event, data in bot.stream_answer(req.question):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Latency metrics
+@app.get("/api/bot/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+# Read-only SQL over the extracted sheets
+@app.post("/api/bot/query")
+def run_sql_query(req: SQLQueryRequest):
+    try:
+        return bot.sql_engine.query(req.sql, req.max_rows)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
+
+# Tables available to /api/bot/query
+@app.get("/api/bot/query/tables")
+def get_sql_tables():
+    return bot.sql_engine.describe()
+
+# Where a person, employee id, account or skill appears across the extracted sheets
+@app.get("/api/bot/entity")
+def lookup_entity(name: str, limit: int = 100):
+    limit = max(1, min(limit, Config.ENTITY_MAX_LOCATIONS))
+    return {"entity": name, "locations": bot.entity_index.lookup(name, limit)}
+
+# Views joined across categories on the employee key
+@app.get("/api/bot/views")
+def get_join_views():
+    return bot.join_views.describe()
+
+@app.get("/api/bot/views/{name}")
+def get_join_view_rows(name: str, offset: int = Query(0, ge=0),
+                       limit: int = Query(100, ge=1, le=Config.CATEGORY_MAX_PAGE_SIZE)):
+    rows = bot.join_views.rows(name, offset, limit)
+    if rows is None:
+        raise HTTPException(status_code=404, detail=f"View '{name}' not found")
+    return rows
+
 # Get dashboard data
 @app.get("/api/bot/dashboard")
 async def get_dashboard():
@@ -75,8 +217,15 @@ async def get_category_details(req: CategoryRequest):
         if req.category not in Config.DATA_CATEGORIES:
             raise HTTPException(status_code=400, detail=f"Invalid category. Available: {Config.DATA_CATEGORIES}")
         
-        data = await bot.get_category_details(req.category)
+        data = await bot.get_category_details(
+            req.category, cursor=req.cursor, limit=req.limit, fields=req.fields,
+            summary_only=req.summary_only, file_id=req.file_id, sheet=req.sheet
+        )
         return data
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get category details: {str(e)}")
 
@@ -89,6 +238,82 @@ async def scan_data():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to scan data: {str(e)}")
 
+# Cache statistics (admin endpoint)
+@app.get("/api/bot/cache/stats")
+def get_cache_stats():
+    try:
+        stats = bot.cache_stats()
+        payload_stats = payload_cache.stats()
+        stats["answer_cache"] = answer_cache.stats()
+        stats["semantic_cache"] = semantic_cache.stats()
+        stats["payload_cache"] = dict(
+            payload_stats,
+            memory_pressure=round(payload_stats["memory_bytes"] / payload_stats["max_bytes"], 4) if payload_stats["max_bytes"] else 0.0
+        )
+        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get cache stats: {str(e)}")
+
+# Invalidate cached payloads of a category or a single file (admin endpoint)
+@app.post("/api/bot/cache/invalidate")
+def invalidate_cache(req: CacheControlRequest):
+    if not req.category and not req.file_id:
+        raise HTTPException(status_code=400, detail="category or file_id is required")
+    if req.category and req.category not in Config.DATA_CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Invalid category. Available: {Config.DATA_CATEGORIES}")
+    
+    try:
+        return bot.invalidate(category=req.category, file_id=req.file_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to invalidate cache: {str(e)}")
+
+# Pre-warm a category or a single file (admin endpoint)
+@app.post("/api/bot/cache/warm")
+async def warm_cache(req: CacheControlRequest):
+    if not req.category and not req.file_id:
+        raise HTTPException(status_code=400, detail="category or file_id is required")
+    if req.category and req.category not in Config.DATA_CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Invalid category. Available: {Config.DATA_CATEGORIES}")
+    
+    try:
+        result = {}
+        if req.category:
+            await asyncio.to_thread(bot.refresh_category, req.category)
+            result["category"] = req.category
+        if req.file_id:
+            if not await asyncio.to_thread(bot.warm_file, req.file_id):
+                raise HTTPException(status_code=404, detail=f"File '{req.file_id}' not found in scan data")
+            result["file_id"] = req.file_id
+        result["payload_cache"] = payload_cache.stats()
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to warm cache: {str(e)}")
+
+# Graph change notification webhook
+@app.post("/api/bot/notifications")
+async def receive_notifications(request: Request, validationToken: Optional[str] = None):
+    # Subscription handshake: echo the token back as plain text
+    if validationToken is not None:
+        return PlainTextResponse(validationToken)
+    
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid notification payload")
+    
+    parsed = parse_notifications(body, Config.GRAPH_CLIENT_STATE)
+    if parsed["item_ids"] or parsed["full_rescan"]:
+        change_queue.enqueue(parsed["item_ids"], parsed["full_rescan"])
+    
+    # Graph expects a 202 within a few seconds; re-extraction happens after the debounce window
+    return JSONResponse(status_code=202, content={
+        "queued_items": len(parsed["item_ids"]),
+        "full_rescan": parsed["full_rescan"],
+        "rejected": parsed["rejected"]
+    })
+
 # Get bot status
 @app.get("/api/bot/status")
 def get_bot_status():
@@ -100,8 +325,16 @@ def get_bot_status():
             "categories": Config.DATA_CATEGORIES,
             "last_scan": bot.last_scan.isoformat() if bot.last_scan else None,
             "cache_valid": bot._is_cache_valid(),
+            "payload_cache": payload_cache.stats(),
+            "scheduler": scheduler.status(),
+            "notifications": {
+                "queue": change_queue.status(),
+                "subscription": subscription_manager.status()
+            },
             "llm_provider": Config.LLM_PROVIDER,
-            "llm_model": Config.LLM_MODEL or get_default_model(Config.LLM_PROVIDER)
+            "llm_model": Config.LLM_MODEL or get_default_model(Config.LLM_PROVIDER),
+            "llm_chain": bot.llm_client.status(),
+            "llm_limiter": llm_limiter.status()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get bot status: {str(e)}")
@@ -0,0 +1,81 @@
+"""
+Lightweight in-process latency metrics
+Keeps a sliding window of samples per metric name and reports percentiles
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+def _percentile(ordered: list, p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, success: bool = True):
+        """Record one observation; failed calls are counted but kept out of the latency window"""
+        with self._lock:
+            self.count += 1
+            if success:
+                self.samples.append(seconds)
+            else:
+                self.errors += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Get the p-th percentile (0-100) of the recent samples in seconds"""
+        with self._lock:
+            ordered = sorted(self.samples)
+        return _percentile(ordered, p)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            ordered = sorted(self.samples)
+            count, errors = self.count, self.errors
+
+        def pct(p):
+            value = _percentile(ordered, p)
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "count": count,
+            "errors": errors,
+            "success_rate": round((count - errors) / count, 4) if count else None,
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else None,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99)
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._trackers = {}
+        self._lock = threading.Lock()
+
+    def tracker(self, name: str) -> LatencyTracker:
+        with self._lock:
+            if name not in self._trackers:
+                self._trackers[name] = LatencyTracker()
+            return self._trackers[name]
+
+    def record(self, name: str, seconds: float, success: bool = True):
+        self.tracker(name).record(seconds, success)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            names = sorted(self._trackers)
+        return {name: self._trackers[name].summary() for name in names}
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
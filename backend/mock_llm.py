@@ -0,0 +1,234 @@
+"""
+Mock LLM for offline benchmarking
+In-process responder behind the "mock" provider, plus a local HTTP server that
+mimics the Gemini, OpenAI and Hugging Face response shapes with configurable
+latency, streaming, errors and rate limiting
+
+Run the server with:
+    python mock_llm.py --port 8099 --latency lognormal:0.8,0.4 --error-rate 0.02 --rate-limit-rate 0.05
+and point the real adapters at it, e.g. GEMINI_ENDPOINT=http://127.0.0.1:8099/v1beta/models,
+OPENAI_ENDPOINT=http://127.0.0.1:8099/v1/chat/completions, HUGGINGFACE_ENDPOINT=http://127.0.0.1:8099/models
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Dict, Any, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from config import Config
+
+
+class LatencyModel:
+    """Latency distribution in seconds: fixed:S, uniform:LO,HI, normal:MEAN,STD or lognormal:MEDIAN,SIGMA"""
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, kind: str, params: List[float], rng: random.Random):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}', expected one of: {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.params = params
+        self.rng = rng
+
+    @classmethod
+    def parse(cls, spec: str, rng: random.Random = None) -> "LatencyModel":
+        kind, _, values = spec.partition(":")
+        params = [float(value) for value in values.split(",") if value.strip()]
+        return cls(kind.strip().lower(), params or [0.0], rng or random.Random())
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = self.rng.uniform(self.params[0], self.params[-1])
+        elif self.kind == "normal":
+            value = self.rng.gauss(self.params[0], self.params[1] if len(self.params) > 1 else 0.0)
+        else:
+            value = self.rng.lognormvariate(math.log(max(self.params[0], 1e-6)),
+                                            self.params[1] if len(self.params) > 1 else 0.0)
+        return max(value, 0.0)
+
+    def describe(self) -> str:
+        return f"{self.kind}:{','.join(str(param) for param in self.params)}"
+
+
+class MockResponder:
+    def __init__(self, latency: str = None, error_rate: float = None, rate_limit_rate: float = None,
+                 chunk_delay_ms: float = None, seed: int = None):
+        self.rng = random.Random(seed if seed is not None else Config.MOCK_LLM_SEED)
+        self.latency = LatencyModel.parse(latency or Config.MOCK_LLM_LATENCY, self.rng)
+        self.error_rate = Config.MOCK_LLM_ERROR_RATE if error_rate is None else error_rate
+        self.rate_limit_rate = Config.MOCK_LLM_RATE_LIMIT_RATE if rate_limit_rate is None else rate_limit_rate
+        self.chunk_delay = (Config.MOCK_LLM_CHUNK_DELAY_MS if chunk_delay_ms is None else chunk_delay_ms) / 1000
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def answer(self, prompt: str) -> str:
+        """Deterministic answer text for a prompt"""
+        question = ""
+        for line in prompt.splitlines():
+            if line.startswith("Question:"):
+                question = line[len("Question:"):].strip()
+        return (f"Mock answer to '{question or prompt[:80]}'. The prompt carried {len(prompt)} characters "
+                f"across {prompt.count(chr(10)) + 1} lines of context.")
+
+    async def respond(self, prompt: str) -> str:
+        """Wait for one latency sample, then fail or answer according to the configured rates"""
+        self.requests += 1
+        await asyncio.sleep(self.latency.sample())
+        self.check_failure()
+        return self.answer(prompt)
+
+    def check_failure(self):
+        """Raise a 429 or 500 for the configured fraction of requests"""
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            self.rate_limited += 1
+            raise HTTPException(status_code=429, detail="Mock rate limit exceeded")
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.errors += 1
+            raise HTTPException(status_code=500, detail="Mock upstream error")
+
+    async def stream(self, prompt: str):
+        """Yield the answer word by word: first chunk after a latency sample, the rest after chunk_delay each"""
+        self.requests += 1
+        await asyncio.sleep(self.latency.sample())
+        self.check_failure()
+        words = self.answer(prompt).split(" ")
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(self.chunk_delay)
+            yield word if index == 0 else f" {word}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency.describe(),
+            "error_rate": self.error_rate,
+            "rate_limit_rate": self.rate_limit_rate,
+            "chunk_delay_ms": round(self.chunk_delay * 1000, 1),
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited
+        }
+
+
+def _sse(payload: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def create_mock_app(responder: MockResponder = None) -> FastAPI:
+    """HTTP stand-in for the Gemini, OpenAI and Hugging Face inference APIs"""
+    responder = responder or MockResponder()
+    app = FastAPI(title="Mock LLM")
+
+    def error_response(e: HTTPException) -> JSONResponse:
+        return JSONResponse(status_code=e.status_code, content={"error": {"code": e.status_code, "message": e.detail}})
+
+    @app.get("/stats")
+    def stats():
+        return responder.stats()
+
+    @app.post("/v1beta/models/{model_action}")
+    async def gemini(model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        body = await request.json()
+        prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+
+        if action == "streamGenerateContent":
+            chunks = responder.stream(prompt)
+            try:
+                first = await chunks.__anext__()
+            except HTTPException as e:
+                return error_response(e)
+
+            async def events():
+                yield _sse({"candidates": [{"content": {"parts": [{"text": first}], "role": "model"}}]})
+                async for chunk in chunks:
+                    yield _sse({"candidates": [{"content": {"parts": [{"text": chunk}], "role": "model"}}]})
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        try:
+            text = await responder.respond(prompt)
+        except HTTPException as e:
+            return error_response(e)
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}],
+            "modelVersion": model
+        }
+
+    @app.post("/v1/chat/completions")
+    async def openai(request: Request):
+        body = await request.json()
+        prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+        model = body.get("model", "mock")
+
+        if body.get("stream"):
+            chunks = responder.stream(prompt)
+            try:
+                first = await chunks.__anext__()
+            except HTTPException as e:
+                return error_response(e)
+
+            async def events():
+                yield _sse({"model": model, "choices": [{"index": 0, "delta": {"content": first}}]})
+                async for chunk in chunks:
+                    yield _sse({"model": model, "choices": [{"index": 0, "delta": {"content": chunk}}]})
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        try:
+            text = await responder.respond(prompt)
+        except HTTPException as e:
+            return error_response(e)
+        return {
+            "id": f"mock-{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]
+        }
+
+    @app.post("/models/{model:path}")
+    async def huggingface(model: str, request: Request):
+        body = await request.json()
+        inputs = body.get("inputs", "")
+        try:
+            if isinstance(inputs, list):
+                # One latency sample for the whole batch, like a single upstream call
+                texts = [responder.answer(prompt) for prompt in inputs]
+                await responder.respond("")
+                return [[{"generated_text": text}] for text in texts]
+            return [{"generated_text": await responder.respond(inputs)}]
+        except HTTPException as e:
+            return error_response(e)
+
+    return app
+
+
+def _main(argv: Optional[List[str]] = None):
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local mock of the Gemini, OpenAI and Hugging Face APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", default=Config.MOCK_LLM_LATENCY, help="e.g. fixed:0.2, uniform:0.1,0.5, lognormal:0.8,0.4")
+    parser.add_argument("--error-rate", type=float, default=Config.MOCK_LLM_ERROR_RATE)
+    parser.add_argument("--rate-limit-rate", type=float, default=Config.MOCK_LLM_RATE_LIMIT_RATE)
+    parser.add_argument("--chunk-delay-ms", type=float, default=Config.MOCK_LLM_CHUNK_DELAY_MS)
+    parser.add_argument("--seed", type=int, default=Config.MOCK_LLM_SEED)
+    args = parser.parse_args(argv)
+
+    responder = MockResponder(args.latency, args.error_rate, args.rate_limit_rate, args.chunk_delay_ms, args.seed)
+    uvicorn.run(create_mock_app(responder), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    _main()
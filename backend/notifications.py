@@ -0,0 +1,212 @@
+"""
+Microsoft Graph change notifications
+Receives drive change notifications, debounces and coalesces bursts into a single
+re-extraction, keeps the Graph subscription renewed, and provides a local
+stand-in emitter for testing the whole path offline
+"""
+
+import sys
+import time
+import uuid
+import asyncio
+import requests
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Callable, Optional
+
+from config import Config
+from token_manager import token_manager
+
+GRAPH_SUBSCRIPTIONS_URL = "https://graph.microsoft.com/v1.0/subscriptions"
+
+
+def parse_notifications(body: Dict[str, Any], client_state: str = None) -> Dict[str, Any]:
+    """Extract changed item ids from a Graph notification payload, rejecting foreign client states"""
+    item_ids = []
+    full_rescan = False
+    rejected = 0
+
+    for notification in body.get("value", []):
+        if client_state and notification.get("clientState") != client_state:
+            rejected += 1
+            continue
+
+        item_id = (notification.get("resourceData") or {}).get("id")
+        if item_id:
+            item_ids.append(item_id)
+        else:
+            # Drive subscriptions only say "something under this folder changed"
+            full_rescan = True
+
+    return {"item_ids": item_ids, "full_rescan": full_rescan, "rejected": rejected}
+
+
+class ChangeQueue:
+    def __init__(self, on_flush: Callable[[List[str], bool], Any], debounce_seconds: float = None,
+                 max_delay_seconds: float = None):
+        self.on_flush = on_flush
+        self.debounce_seconds = debounce_seconds if debounce_seconds is not None else Config.NOTIFICATION_DEBOUNCE_SECONDS
+        self.max_delay_seconds = max_delay_seconds if max_delay_seconds is not None else Config.NOTIFICATION_MAX_DELAY_SECONDS
+        self.pending_ids = set()
+        self.full_rescan = False
+        self._first_at = None
+        self._last_at = None
+        self._task = None
+        self.received = 0
+        self.flushes = 0
+        self.last_flush = None
+        self.last_error = None
+
+    def enqueue(self, item_ids: List[str], full_rescan: bool = False):
+        """Queue changed items; a flush runs once the burst has been quiet for the debounce window"""
+        now = time.monotonic()
+        self.received += len(item_ids) or 1
+        self.pending_ids.update(item_ids)
+        self.full_rescan = self.full_rescan or full_rescan
+        self._first_at = self._first_at or now
+        self._last_at = now
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_when_quiet())
+
+    async def flush(self):
+        """Run the re-extraction for everything queued so far"""
+        if not self.pending_ids and not self.full_rescan:
+            return
+
+        item_ids, full_rescan = sorted(self.pending_ids), self.full_rescan
+        self.pending_ids = set()
+        self.full_rescan = False
+        self._first_at = None
+
+        try:
+            await asyncio.to_thread(self.on_flush, item_ids, full_rescan)
+            self.last_error = None
+        except Exception as e:
+            print(f"Change notification flush failed: {e}")
+            self.last_error = str(e)
+        self.flushes += 1
+        self.last_flush = datetime.now().isoformat()
+
+    def status(self) -> Dict[str, Any]:
+        """Get queue counters"""
+        return {
+            "pending_items": len(self.pending_ids),
+            "pending_full_rescan": self.full_rescan,
+            "received": self.received,
+            "flushes": self.flushes,
+            "last_flush": self.last_flush,
+            "last_error": self.last_error
+        }
+
+    async def _flush_when_quiet(self):
+        while self._first_at is not None:
+            now = time.monotonic()
+            quiet_at = self._last_at + self.debounce_seconds
+            deadline = self._first_at + self.max_delay_seconds
+            flush_at = min(quiet_at, deadline)
+            if now >= flush_at:
+                await self.flush()
+                # Items enqueued during the flush saw this task alive, so this loop picks them up
+                continue
+            await asyncio.sleep(flush_at - now)
+
+
+class SubscriptionManager:
+    def __init__(self, notification_url: str = None, resource: str = None, client_state: str = None,
+                 expiration_minutes: int = None):
+        self.notification_url = notification_url or Config.GRAPH_NOTIFICATION_URL
+        self.resource = resource or Config.GRAPH_SUBSCRIPTION_RESOURCE
+        self.client_state = client_state or Config.GRAPH_CLIENT_STATE
+        self.expiration_minutes = expiration_minutes or Config.GRAPH_SUBSCRIPTION_MINUTES
+        self.subscription_id = None
+        self.expires_at = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.notification_url)
+
+    def ensure_subscription(self) -> Optional[Dict[str, Any]]:
+        """Renew the current subscription, creating a new one if renewal is not possible"""
+        if not self.enabled:
+            return None
+
+        token = token_manager.get_valid_token() or Config.ONEDRIVE_ACCESS_TOKEN
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        expiration = (datetime.now(timezone.utc) + timedelta(minutes=self.expiration_minutes)).isoformat()
+
+        if self.subscription_id:
+            response = requests.patch(
+                f"{GRAPH_SUBSCRIPTIONS_URL}/{self.subscription_id}",
+                json={"expirationDateTime": expiration},
+                headers=headers,
+                timeout=30
+            )
+            if response.status_code == 200:
+                return self._store(response.json())
+            print(f"Subscription renewal failed: {response.status_code} - {response.text}")
+
+        response = requests.post(
+            GRAPH_SUBSCRIPTIONS_URL,
+            json={
+                "changeType": "updated",
+                "notificationUrl": self.notification_url,
+                "resource": self.resource,
+                "expirationDateTime": expiration,
+                "clientState": self.client_state
+            },
+            headers=headers,
+            timeout=30
+        )
+        if response.status_code != 201:
+            raise Exception(f"Subscription creation failed: {response.status_code} - {response.text}")
+        return self._store(response.json())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "resource": self.resource,
+            "subscription_id": self.subscription_id,
+            "expires_at": self.expires_at
+        }
+
+    def _store(self, subscription: Dict[str, Any]) -> Dict[str, Any]:
+        self.subscription_id = subscription.get("id")
+        self.expires_at = subscription.get("expirationDateTime")
+        return subscription
+
+
+def build_notification(item_id: str = None, client_state: str = None,
+                       resource: str = None) -> Dict[str, Any]:
+    """Build a single notification shaped like the ones Graph sends"""
+    notification = {
+        "subscriptionId": "local-emitter",
+        "subscriptionExpirationDateTime": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+        "clientState": client_state if client_state is not None else Config.GRAPH_CLIENT_STATE,
+        "changeType": "updated",
+        "resource": resource or Config.GRAPH_SUBSCRIPTION_RESOURCE,
+        "tenantId": token_manager.tenant_id,
+        "resourceData": {"@odata.type": "#Microsoft.Graph.DriveItem"}
+    }
+    if item_id:
+        notification["resourceData"]["id"] = item_id
+    return notification
+
+
+def emit_local_notifications(url: str, item_ids: List[str] = None, client_state: str = None) -> Dict[str, Any]:
+    """Local stand-in for Graph: run the validation handshake, then post change notifications"""
+    validation_token = uuid.uuid4().hex
+    handshake = requests.post(url, params={"validationToken": validation_token}, timeout=10)
+    if handshake.status_code != 200 or handshake.text != validation_token:
+        raise Exception(f"Validation handshake failed: {handshake.status_code} - {handshake.text}")
+
+    notifications = [build_notification(item_id, client_state) for item_id in item_ids or [None]]
+    response = requests.post(url, json={"value": notifications}, timeout=10)
+    return {"status_code": response.status_code, "response": response.json()}
+
+
+if __name__ == "__main__":
+    # Usage: python notifications.py http://localhost:8000/api/bot/notifications [ITEM_ID ...]
+    if len(sys.argv) < 2:
+        print("Usage: python notifications.py NOTIFICATION_URL [ITEM_ID ...]")
+        sys.exit(1)
+    print(emit_local_notifications(sys.argv[1], sys.argv[2:]))
@@ -0,0 +1,100 @@
+"""
+Token-budgeted prompt builder
+Packs prompt sections by priority into a per-model token budget and assembles
+the prompt in a single join
+"""
+
+from typing import Dict, Any, List
+
+from config import Config
+
+# Rough characters-per-token ratio for English text and table data
+CHARS_PER_TOKEN = 4
+
+# Context windows in tokens; unknown models fall back to the smallest common window
+MODEL_CONTEXT_TOKENS = {
+    "gemini-1.5-flash": 1048576,
+    "gemini-1.5-pro": 2097152,
+    "gemini-1.0-pro": 30720,
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "microsoft/DialoGPT-large": 1024,
+    "microsoft/DialoGPT-medium": 1024,
+    "facebook/blenderbot-400M-distill": 128,
+    "google/flan-t5-large": 512,
+    "EleutherAI/gpt-neo-2.7B": 2048,
+}
+DEFAULT_CONTEXT_TOKENS = 4096
+
+# Tokens kept free for the completion (matches maxOutputTokens / max_tokens)
+OUTPUT_TOKENS = 2048
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast token estimate without a tokenizer"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def prompt_budget(model: str) -> int:
+    """Prompt token budget for a model: its context window minus the output reserve, capped by config"""
+    window = MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+    available = max(window - OUTPUT_TOKENS, window // 2)
+    return min(available, Config.PROMPT_TOKEN_BUDGET) if Config.PROMPT_TOKEN_BUDGET else available
+
+
+class PromptBuilder:
+    def __init__(self, budget_tokens: int):
+        self.budget_tokens = budget_tokens
+        self.sections = []  # (name, priority, header, lines) in display order
+
+    def add_section(self, name: str, priority: int, lines: List[str], header: str = None):
+        """Add a section; lower priority numbers are packed first, lines are kept in order"""
+        if lines:
+            self.sections.append((name, priority, header, lines))
+
+    def build(self, question: str) -> Dict[str, Any]:
+        """Pack sections into the budget and assemble the prompt"""
+        tail = f"Question: {question}\n\nPlease provide a helpful answer based on the available data."
+        used = estimate_tokens(tail)
+
+        included = {}
+        truncated = []
+        for index in sorted(range(len(self.sections)), key=lambda i: (self.sections[i][1], i)):
+            name, _, header, lines = self.sections[index]
+            # +1 per line for the newline, +1 for the blank line after the section
+            cost = (estimate_tokens(header) + 1 if header else 0) + 1
+            if used + cost > self.budget_tokens:
+                truncated.append(name)
+                continue
+
+            kept = []
+            for line in lines:
+                line_cost = estimate_tokens(line) + 1
+                if used + cost + line_cost > self.budget_tokens:
+                    break
+                kept.append(line)
+                cost += line_cost
+
+            if kept:
+                included[index] = kept
+                used += cost
+            if len(kept) < len(lines):
+                truncated.append(name)
+
+        parts = []
+        for index, (name, _, header, _) in enumerate(self.sections):
+            if index in included:
+                if header:
+                    parts.append(header)
+                parts.extend(included[index])
+                parts.append("")
+        parts.append(tail)
+
+        return {
+            "prompt": "\n".join(parts),
+            "prompt_tokens": used,
+            "budget_tokens": self.budget_tokens,
+            "sections": {self.sections[i][0]: len(kept) for i, kept in included.items()},
+            "truncated": truncated
+        }
@@ -0,0 +1,125 @@
+"""
+Resilience primitives for upstream LLM calls
+Circuit breaker with half-open probing and an AIMD adaptive concurrency limiter
+"""
+
+import time
+from typing import Dict, Any
+
+from config import Config
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_seconds: float = None,
+                 half_open_probes: int = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_seconds = reset_seconds or Config.CIRCUIT_RESET_SECONDS
+        self.half_open_probes = half_open_probes or Config.CIRCUIT_HALF_OPEN_PROBES
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probes_in_flight = 0
+        self.rejected = 0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; in half-open state only a few probes are let through"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.probes_in_flight = 0
+
+        if self.state == self.HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self.probes_in_flight += 1
+
+        return True
+
+    def would_allow(self) -> bool:
+        """Like allow() but without side effects"""
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.reset_seconds
+        if self.state == self.HALF_OPEN:
+            return self.probes_in_flight < self.half_open_probes
+        return True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self.probes_in_flight = 0
+
+    def record_cancelled(self):
+        """A call was abandoned (e.g. a losing hedge); frees its probe slot without judging the upstream"""
+        if self.state == self.HALF_OPEN:
+            self.probes_in_flight = max(self.probes_in_flight - 1, 0)
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.probes_in_flight = 0
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(max(self.reset_seconds - (time.monotonic() - self.opened_at), 0), 1)
+            if self.state == self.OPEN else None
+        }
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: grows by ~1 per limit's worth of fast successes, halves on failure or slowness"""
+
+    def __init__(self, initial: int = None, minimum: int = None, maximum: int = None,
+                 latency_target: float = None, backoff: float = 0.5):
+        self.limit = float(initial or Config.LLM_CONCURRENCY_INITIAL)
+        self.minimum = minimum or Config.LLM_CONCURRENCY_MIN
+        self.maximum = maximum or Config.LLM_CONCURRENCY_MAX
+        self.latency_target = latency_target or Config.LLM_LATENCY_TARGET_SECONDS
+        self.backoff = backoff
+        self.in_flight = 0
+        self.shed = 0
+
+    def try_acquire(self) -> bool:
+        """Take a slot, or return False immediately when at the limit"""
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, success: bool):
+        """Return a slot and adapt the limit to the observed outcome"""
+        self.in_flight = max(self.in_flight - 1, 0)
+        if success and latency <= self.latency_target:
+            self.limit = min(self.limit + 1 / self.limit, self.maximum)
+        else:
+            self.limit = max(self.limit * self.backoff, self.minimum)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "shed": self.shed,
+            "latency_target_seconds": self.latency_target
+        }
+
+
+# Global limiter for LLM-backed answers
+llm_limiter = AdaptiveLimiter()
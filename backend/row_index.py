@@ -0,0 +1,145 @@
+"""
+Row-level retrieval
+BM25 index with one document per sheet row; returns the top rows for a question
+with only the relevant columns, within a row and byte budget. Row values are
+read back from the payload cache, the index only keeps references
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Any, List, Optional, Callable
+
+from config import Config
+from search_index import BM25Index, tokenize
+
+# Columns that identify a row and are always kept by the projection
+_IDENTIFIER_COLUMN = re.compile(r"name|employee|emp\b|emp id|\bid\b|rrf", re.IGNORECASE)
+
+# Fewer matching columns than this are padded with the leading columns of the sheet
+MIN_COLUMNS = 3
+MAX_VALUE_CHARS = 80
+
+
+def sheet_tables(payload: Optional[Dict[str, Any]]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """Rows of every table in a payload keyed by sheet name (None for CSV)"""
+    if not payload or payload.get("error"):
+        return {}
+    if payload.get("type") == "excel":
+        return {name: sheet.get("data", []) for name, sheet in payload.get("sheets", {}).items()}
+    if payload.get("type") == "csv":
+        return {None: payload.get("data", [])}
+    return {}
+
+
+def _present(value: Any) -> bool:
+    return value is not None and str(value).strip() not in ("", "nan", "NaT", "None")
+
+
+class RowIndex(BM25Index):
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        super().__init__(k1, b)
+        self.files = {}  # file_id -> {"category", "file"}
+
+    def add_file(self, file_id: str, category: str, file_name: str, payload: Optional[Dict[str, Any]]):
+        """Index every row of a file, replacing any previous version of it"""
+        documents = []
+        for sheet, rows in sheet_tables(payload).items():
+            for row_number, row in enumerate(rows):
+                frequencies = Counter()
+                for value in row.values():
+                    if _present(value):
+                        frequencies.update(tokenize(value))
+                if frequencies:
+                    documents.append(((file_id, sheet, row_number), frequencies))
+        self.files[file_id] = {"category": category, "file": file_name}
+        self.add_group(file_id, documents)
+
+    def remove_file(self, file_id: str) -> bool:
+        self.files.pop(file_id, None)
+        return self.remove_group(file_id)
+
+    def retrieve(self, question: str, get_payload: Callable[[str], Optional[Dict[str, Any]]],
+                 categories: List[str] = None, k: int = None, max_bytes: int = None,
+                 max_columns: int = None) -> List[Dict[str, Any]]:
+        """Top rows for a question as {category, file, sheet, row, score, values} with projected columns"""
+        k = k or Config.ROW_TOP_K
+        max_bytes = max_bytes or Config.ROW_MAX_BYTES
+        max_columns = max_columns or Config.ROW_MAX_COLUMNS
+        terms = set(tokenize(question))
+        allowed = set(categories) if categories else None
+
+        rows = []
+        used_bytes = 0
+        payloads = {}
+        def accept(location) -> bool:
+            file_meta = self.files.get(location[0])
+            return file_meta is not None and (allowed is None or file_meta["category"] in allowed)
+
+        # Only the top k candidates are selected; a question can match most rows of every sheet
+        for (file_id, sheet, row_number), score in self.ranked(terms, k, accept):
+            file_meta = self.files.get(file_id)
+            if file_meta is None:
+                continue
+
+            if file_id not in payloads:
+                payloads[file_id] = sheet_tables(get_payload(file_id))
+            sheet_rows = payloads[file_id].get(sheet, [])
+            if row_number >= len(sheet_rows):
+                continue
+
+            values = self._project(sheet_rows[row_number], terms, max_columns)
+            size = sum(len(column) + len(value) + 2 for column, value in values.items())
+            if used_bytes + size > max_bytes:
+                break
+            used_bytes += size
+            rows.append({
+                "category": file_meta["category"],
+                "file": file_meta["file"],
+                "sheet": sheet or "",
+                "row": row_number,
+                "score": round(score, 4),
+                "values": values
+            })
+        return rows
+
+    def rows_at(self, locations: List[Dict[str, Any]], question: str,
+                get_payload: Callable[[str], Optional[Dict[str, Any]]],
+                max_columns: int = None) -> List[Dict[str, Any]]:
+        """Rows at known {file_id, category, file, sheet, row} locations, projected like retrieved rows"""
+        max_columns = max_columns or Config.ROW_MAX_COLUMNS
+        terms = set(tokenize(question))
+        rows = []
+        payloads = {}
+        for location in locations:
+            file_id = location["file_id"]
+            if file_id not in payloads:
+                payloads[file_id] = sheet_tables(get_payload(file_id))
+            sheet_rows = payloads[file_id].get(location["sheet"], [])
+            if location["row"] >= len(sheet_rows):
+                continue
+            rows.append({
+                "category": location["category"],
+                "file": location["file"],
+                "sheet": location["sheet"] or "",
+                "row": location["row"],
+                "score": None,
+                "values": self._project(sheet_rows[location["row"]], terms, max_columns)
+            })
+        return rows
+
+    def _project(self, row: Dict[str, Any], terms: set, max_columns: int) -> Dict[str, str]:
+        """Keep identifier columns and the columns whose name or value matches the question"""
+        present = [(str(column), value) for column, value in row.items() if _present(value)]
+        keep = []
+        for column, value in present:
+            if (_IDENTIFIER_COLUMN.search(column) or terms & set(tokenize(column))
+                    or terms & set(tokenize(value))):
+                keep.append(column)
+        for column, _ in present:
+            if len(keep) >= MIN_COLUMNS:
+                break
+            if column not in keep:
+                keep.append(column)
+
+        keep = set(keep[:max_columns])
+        return {column: str(value)[:MAX_VALUE_CHARS] for column, value in present if column in keep}
@@ -0,0 +1,121 @@
+"""
+In-process refresh scheduler
+Runs periodic jobs (per-category rescans and other maintenance) with jitter,
+so replicas started together do not refresh in lockstep
+"""
+
+import time
+import random
+import asyncio
+import inspect
+from datetime import datetime
+from typing import Dict, Any, Callable
+
+from config import Config
+
+
+class RefreshScheduler:
+    def __init__(self, jitter_seconds: int = None):
+        self.jitter_seconds = jitter_seconds if jitter_seconds is not None else Config.REFRESH_JITTER_SECONDS
+        self.jobs = {}  # name -> job dict
+        self._task = None
+        self._wakeup = None
+
+    def add_job(self, name: str, interval_seconds: float, func: Callable, run_immediately: bool = False):
+        """Register a job; sync functions run in a worker thread, coroutine functions on the loop"""
+        self.jobs[name] = {
+            "interval": interval_seconds,
+            "func": func,
+            "next_run": time.monotonic() if run_immediately else self._next_run(interval_seconds),
+            "last_run": None,
+            "last_duration": None,
+            "last_error": None,
+            "runs": 0
+        }
+        if self._wakeup:
+            self._wakeup.set()
+
+    def add_category_refreshes(self, bot):
+        """Register a refresh job per data category using its configured cadence"""
+        for category in Config.DATA_CATEGORIES:
+            minutes = Config.CATEGORY_REFRESH_MINUTES.get(category, Config.REFRESH_INTERVAL_MINUTES)
+            self.add_job(
+                f"refresh:{category}",
+                minutes * 60,
+                lambda category=category: bot.refresh_category(category)
+            )
+
+    def start(self):
+        """Start the scheduler loop on the running event loop"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the scheduler loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        """Get the state of every registered job"""
+        now = time.monotonic()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "jobs": {
+                name: {
+                    "interval_seconds": job["interval"],
+                    "next_run_in_seconds": round(max(job["next_run"] - now, 0), 1),
+                    "last_run": job["last_run"],
+                    "last_duration_seconds": job["last_duration"],
+                    "last_error": job["last_error"],
+                    "runs": job["runs"]
+                }
+                for name, job in self.jobs.items()
+            }
+        }
+
+    def _next_run(self, interval_seconds: float) -> float:
+        jitter = random.uniform(-self.jitter_seconds, self.jitter_seconds)
+        return time.monotonic() + max(interval_seconds + jitter, 1)
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            for name, job in list(self.jobs.items()):
+                if job["next_run"] <= now:
+                    await self._run_job(name, job)
+
+            if self.jobs:
+                delay = max(min(job["next_run"] for job in self.jobs.values()) - time.monotonic(), 0)
+            else:
+                delay = 60
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_job(self, name: str, job: Dict[str, Any]):
+        started = time.monotonic()
+        try:
+            if inspect.iscoroutinefunction(job["func"]):
+                await job["func"]()
+            else:
+                await asyncio.to_thread(job["func"])
+            job["last_error"] = None
+        except Exception as e:
+            print(f"Scheduled job {name} failed: {e}")
+            job["last_error"] = str(e)
+        job["runs"] += 1
+        job["last_run"] = datetime.now().isoformat()
+        job["last_duration"] = round(time.monotonic() - started, 3)
+        job["next_run"] = self._next_run(job["interval"])
+
+
+# Global scheduler instance
+scheduler = RefreshScheduler()
@@ -0,0 +1,229 @@
+"""
+BM25 search index over scanned files
+One document per sheet (or per file for CSV, PDF and Word) built from the
+category, file name, sheet name, column headers and cell values, used to route
+questions to the relevant categories, files and sheets
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "on", "in", "of", "to", "for", "at", "by", "and", "or",
+    "what", "which", "who", "whom", "how", "many", "much", "me", "show", "tell", "give", "do", "does", "we",
+    "our", "there", "please", "list", "any", "have", "has", "with", "i", "you", "can", "this", "that", "it"
+}
+
+# Words that point at a category even when the data itself does not contain them
+CATEGORY_KEYWORDS = {
+    "RRF": ["rrf", "resource", "request", "form", "demand", "open", "position"],
+    "Training": ["training", "course", "learning", "skill", "trainee"],
+    "Utilization": ["utilization", "usage", "capacity", "workload", "billable"],
+    "Bench Report": ["bench", "available", "idle", "resource", "unallocated"],
+    "Certification List": ["certification", "cert", "qualification", "certified"],
+    "Account wise information": ["account", "client", "customer"],
+    "Overall TSC GTs information": ["tsc", "global", "team", "overall"]
+}
+
+# Removed documents are compacted away once there are at least this many
+MIN_COMPACT_TOMBSTONES = 1000
+
+# Term frequency multipliers per field
+FIELD_WEIGHTS = {
+    "category": 3.0,
+    "keywords": 2.0,
+    "file": 2.0,
+    "sheet": 2.0,
+    "column": 2.0,
+    "value": 1.0
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with stopwords dropped and plurals folded"""
+    tokens = []
+    for token in _TOKEN.findall(str(text).lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "is", "us")):
+            token = token[:-1]
+        if token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _file_documents(category: str, file_name: str, payload: Optional[Dict[str, Any]]) -> List[Tuple[Optional[str], Dict[str, List[str]]]]:
+    """Split a file into (sheet, fields) documents"""
+    base = {
+        "category": [category],
+        "keywords": CATEGORY_KEYWORDS.get(category, []),
+        "file": [file_name]
+    }
+    if not payload or payload.get("error"):
+        return [(None, base)]
+
+    file_type = payload.get("type")
+    if file_type == "excel":
+        documents = []
+        for sheet_name, sheet in payload.get("sheets", {}).items():
+            documents.append((sheet_name, dict(
+                base,
+                sheet=[sheet_name],
+                column=[str(column) for column in sheet.get("columns", [])],
+                value=[value for row in sheet.get("data", []) for value in row.values() if value is not None]
+            )))
+        return documents or [(None, base)]
+    if file_type == "csv":
+        return [(None, dict(
+            base,
+            column=[str(column) for column in payload.get("columns", [])],
+            value=[value for row in payload.get("data", []) for value in row.values() if value is not None]
+        ))]
+    if file_type in ("pdf", "word"):
+        return [(None, dict(base, value=[payload.get("text", "")]))]
+    return [(None, base)]
+
+
+class BM25Index:
+    """BM25 over weighted term frequencies; documents are added and removed in groups (one group per file)"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = []  # doc_id -> metadata, None once removed
+        self.doc_lengths = []
+        self.doc_terms = []  # doc_id -> terms, kept so a group's postings can be removed
+        self.postings = defaultdict(dict)  # term -> {doc_id: weighted term frequency}
+        self.groups = {}  # group key -> [doc_id]
+        self.total_length = 0.0
+        self.live_docs = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+
+    def add_group(self, key: str, documents: List[Tuple[Any, Counter]]):
+        """Index (metadata, term frequencies) documents under a key, replacing what the key held before"""
+        with self._lock:
+            self._remove_locked(key)
+            doc_ids = []
+            for metadata, frequencies in documents:
+                doc_id = len(self.docs)
+                length = sum(frequencies.values())
+                self.docs.append(metadata)
+                self.doc_lengths.append(length)
+                self.doc_terms.append(list(frequencies))
+                for term, frequency in frequencies.items():
+                    self.postings[term][doc_id] = frequency
+                self.total_length += length
+                self.live_docs += 1
+                doc_ids.append(doc_id)
+            self.groups[key] = doc_ids
+
+    def remove_group(self, key: str) -> bool:
+        with self._lock:
+            return self._remove_locked(key)
+
+    def _remove_locked(self, key: str) -> bool:
+        doc_ids = self.groups.pop(key, None)
+        if not doc_ids:
+            return False
+        for doc_id in doc_ids:
+            for term in self.doc_terms[doc_id]:
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self.postings[term]
+            self.total_length -= self.doc_lengths[doc_id]
+            self.live_docs -= 1
+            self.docs[doc_id] = None
+            self.doc_terms[doc_id] = []
+        # Files replaced over many rescans leave tombstones behind; renumber once they outweigh live documents
+        if len(self.docs) - self.live_docs > max(MIN_COMPACT_TOMBSTONES, self.live_docs):
+            self._compact_locked()
+        return True
+
+    def _compact_locked(self):
+        """Drop removed documents and renumber the rest"""
+        remap = {}
+        docs, doc_lengths, doc_terms = [], [], []
+        for doc_id, metadata in enumerate(self.docs):
+            if metadata is None:
+                continue
+            remap[doc_id] = len(docs)
+            docs.append(metadata)
+            doc_lengths.append(self.doc_lengths[doc_id])
+            doc_terms.append(self.doc_terms[doc_id])
+        self.docs, self.doc_lengths, self.doc_terms = docs, doc_lengths, doc_terms
+        for term, postings in self.postings.items():
+            self.postings[term] = {remap[doc_id]: frequency for doc_id, frequency in postings.items()}
+        self.groups = {key: [remap[doc_id] for doc_id in doc_ids] for key, doc_ids in self.groups.items()}
+        self.compactions += 1
+
+    def ranked(self, terms: set, limit: int = None,
+               accept: Callable[[Any], bool] = None) -> List[Tuple[Any, float]]:
+        """(metadata, score) of the matching documents, best first; doc ids are not stable across compactions
+
+        With a limit only the best `limit` documents accepted by `accept` are selected, with a bounded heap
+        instead of sorting every match
+        """
+        with self._lock:
+            scores = self._score_locked(terms)
+            if accept is not None:
+                scores = {doc_id: score for doc_id, score in scores.items() if accept(self.docs[doc_id])}
+            if limit is None:
+                best = sorted(scores.items(), key=lambda item: -item[1])
+            else:
+                best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(self.docs[doc_id], score) for doc_id, score in best]
+
+    def _score_locked(self, terms: set) -> Dict[int, float]:
+        """BM25 score of every document matching at least one term"""
+        scores = defaultdict(float)
+        if not self.live_docs:
+            return scores
+        average_length = self.total_length / self.live_docs
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (self.live_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "groups": len(self.groups),
+            "documents": self.live_docs,
+            "terms": len(self.postings),
+            "tombstones": len(self.docs) - self.live_docs,
+            "compactions": self.compactions,
+            "average_length": round(self.total_length / self.live_docs, 1) if self.live_docs else 0
+        }
+
+
+class SearchIndex(BM25Index):
+    def add_file(self, file_id: str, category: str, file_name: str, payload: Optional[Dict[str, Any]]):
+        """Index a file, replacing any previous version of it"""
+        documents = []
+        for sheet, fields in _file_documents(category, file_name, payload):
+            frequencies = Counter()
+            for field, texts in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for text in texts:
+                    for token in tokenize(text):
+                        frequencies[token] += weight
+            documents.append(({"file_id": file_id, "category": category, "file": file_name, "sheet": sheet}, frequencies))
+        self.add_group(file_id, documents)
+
+    def remove_file(self, file_id: str) -> bool:
+        return self.remove_group(file_id)
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Top-k documents by BM25 score"""
+        return [dict(metadata, score=round(score, 4)) for metadata, score in self.ranked(set(tokenize(query)), k)]
@@ -0,0 +1,301 @@
+"""
+Embedded SQL engine over extracted sheets
+Every Excel sheet and CSV file is loaded into a SQLite table at scan time. The
+database file lives next to the extraction cache, so only a bounded page cache
+is held in memory. Used by the read-only /api/bot/query endpoint and to answer
+recognised aggregate questions ("how many open RRFs per client") exactly,
+without the LLM
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import pandas as pd
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import Config
+from search_index import tokenize
+from column_stats import payload_stats, table_stats
+
+_IDENTIFIER = re.compile(r"[^a-z0-9]+")
+
+# Columns with at most this many distinct values can be filtered on by value
+MAX_FILTER_VALUES = 50
+
+_AGGREGATE_INTENT = re.compile(
+    r"\b(how many|number of|count of|count|total|sum of|average|avg|mean)\b", re.IGNORECASE
+)
+_GROUP_BY = re.compile(
+    r"\b(?:per|by|for each|each|across|grouped by)\s+([a-z0-9 _-]+?)(?:\s+(?:for|of|in|where|with|and|that|who)\b|[?.,]|$)",
+    re.IGNORECASE
+)
+_SUM_OF = re.compile(r"\b(?:total|sum of|sum)\s+([a-z0-9 _-]+?)(?:\s+(?:per|by|for|of|in|across)\b|[?.]|$)", re.IGNORECASE)
+_AVERAGE_OF = re.compile(r"\b(?:average|avg|mean)\s+([a-z0-9 _-]+?)(?:\s+(?:per|by|for|of|in|across)\b|[?.]|$)", re.IGNORECASE)
+
+# Statements the authorizer lets through while a user query runs
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION}
+if hasattr(sqlite3, "SQLITE_RECURSIVE"):
+    _ALLOWED_ACTIONS.add(sqlite3.SQLITE_RECURSIVE)
+
+
+def _identifier(name: str, taken: set, max_length: int = 60) -> str:
+    """Lowercase SQL-safe identifier, made unique against the names already taken"""
+    base = _IDENTIFIER.sub("_", str(name).lower()).strip("_")[:max_length] or "col"
+    if base[0].isdigit():
+        base = f"c_{base}"
+    candidate, suffix = base, 2
+    while candidate in taken:
+        candidate = f"{base}_{suffix}"
+        suffix += 1
+    taken.add(candidate)
+    return candidate
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class SQLEngine:
+    def __init__(self, path: str = None):
+        self.path = path if path is not None else Config.SQL_DB_PATH
+        if self.path:
+            # Tables are rebuilt from the payloads on every start, so a previous database is discarded
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            for stale in (self.path, f"{self.path}-journal"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        self._conn = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+        # Nothing here needs to survive a crash; the page cache is the only table memory held
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(f"PRAGMA cache_size=-{max(Config.SQL_CACHE_MAX_BYTES // 1024, 64)}")
+        self._lock = threading.Lock()
+        self.tables = {}  # table -> {"file_id", "category", "file", "sheet", "rows", "columns": {sql: original}}
+        self.file_tables = {}  # file_id -> [table]
+        self._filter_values = {}  # table -> {token: (column, value)}
+        self.queries = 0
+
+    def register_file(self, file_id: str, category: str, file_name: str, payload: Optional[Dict[str, Any]]):
+        """Load every table of a file, replacing any previous version of it"""
+        tables = []
+        if payload and not payload.get("error"):
+            if payload.get("type") == "excel":
+                tables = [(name, sheet.get("data", []), sheet.get("columns", []))
+                          for name, sheet in payload.get("sheets", {}).items()]
+            elif payload.get("type") == "csv":
+                tables = [(None, payload.get("data", []), payload.get("columns", []))]
+
+        # Filterable values come from the statistics computed at extraction
+        stats = payload_stats(payload)
+        with self._lock:
+            self._remove_locked(file_id)
+            self.file_tables[file_id] = [
+                self._add_table_locked(file_id, category, file_name, sheet, pd.DataFrame(rows, columns=columns),
+                                       stats.get(sheet if sheet is not None else ""))
+                for sheet, rows, columns in tables if columns
+            ]
+
+    def register_frame(self, file_id: str, category: str, name: str, frame: pd.DataFrame) -> str:
+        """Load a DataFrame built elsewhere (e.g. a joined view) as a table, replacing any previous version"""
+        with self._lock:
+            self._remove_locked(file_id)
+            table = self._add_table_locked(file_id, category, name, None, frame)
+            self.file_tables[file_id] = [table]
+            return table
+
+    def _add_table_locked(self, file_id: str, category: str, file_name: str, sheet: Optional[str],
+                          frame: pd.DataFrame, stats: Dict[str, Any] = None) -> str:
+        table = _identifier(f"{category}_{file_name.rsplit('.', 1)[0]}_{sheet or ''}", set(self.tables))
+        taken = set()
+        mapping = {_identifier(column, taken): str(column) for column in frame.columns}
+        stats = stats or table_stats(frame)
+        frame = frame.set_axis(list(mapping), axis=1)
+        frame.to_sql(table, self._conn, index=False)
+        self.tables[table] = {
+            "file_id": file_id,
+            "category": category,
+            "file": file_name,
+            "sheet": sheet,
+            "rows": len(frame),
+            "columns": mapping
+        }
+        self._filter_values[table] = self._value_tokens(mapping, stats)
+        return table
+
+    def remove_file(self, file_id: str) -> bool:
+        with self._lock:
+            return self._remove_locked(file_id)
+
+    def _remove_locked(self, file_id: str) -> bool:
+        names = self.file_tables.pop(file_id, None)
+        if not names:
+            return False
+        for table in names:
+            self._conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+            self.tables.pop(table, None)
+            self._filter_values.pop(table, None)
+        return True
+
+    def _value_tokens(self, mapping: Dict[str, str], stats: Dict[str, Any]) -> Dict[str, Tuple[str, str]]:
+        """Map single-token values of low-cardinality text columns to (column, value) for filtering"""
+        tokens = {}
+        for column, original in mapping.items():
+            info = stats["columns"].get(original, {})
+            if info.get("kind") != "text" or info.get("distinct", 0) > min(MAX_FILTER_VALUES, Config.STATS_FULL_VALUES_MAX):
+                continue
+            for value, _ in info.get("top", []):
+                value_tokens = tokenize(value)
+                if len(value_tokens) == 1:
+                    tokens.setdefault(value_tokens[0], (column, value))
+        return tokens
+
+    def table_for(self, file_id: str, sheet: Optional[str]) -> Optional[str]:
+        for table in self.file_tables.get(file_id, []):
+            if self.tables[table]["sheet"] == sheet:
+                return table
+        return None
+
+    def query(self, sql: str, max_rows: int = None) -> Dict[str, Any]:
+        """Run a single read-only SELECT; raises ValueError for anything else"""
+        # Callers (the /api/bot/query body among them) cannot raise the cap or ask for a negative fetch
+        max_rows = max(1, min(max_rows or Config.SQL_MAX_ROWS, Config.SQL_MAX_ROWS))
+        statement = sql.strip().rstrip(";").strip()
+        if not statement or ";" in statement:
+            raise ValueError("Exactly one SQL statement is allowed")
+        if not re.match(r"(select|with)\b", statement, re.IGNORECASE):
+            raise ValueError("Only SELECT queries are allowed")
+
+        deadline = time.monotonic() + Config.SQL_TIMEOUT_SECONDS
+        started = time.perf_counter()
+        with self._lock:
+            self._conn.set_authorizer(
+                lambda action, *args: sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+            )
+            # Abort queries that run past the deadline
+            self._conn.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+            try:
+                cursor = self._conn.execute(statement)
+                columns = [description[0] for description in cursor.description or []]
+                rows = cursor.fetchmany(max_rows + 1)
+            except sqlite3.DatabaseError as e:
+                raise ValueError(f"SQL error: {e}")
+            finally:
+                self._conn.set_authorizer(None)
+                self._conn.set_progress_handler(None, 0)
+            self.queries += 1
+
+        return {
+            "columns": columns,
+            "rows": [list(row) for row in rows[:max_rows]],
+            "row_count": min(len(rows), max_rows),
+            "truncated": len(rows) > max_rows,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def plan_aggregate(self, question: str, table: str) -> Optional[Dict[str, Any]]:
+        """Turn an aggregate question about one table into SQL, or None if it is not one"""
+        if table not in self.tables or not _AGGREGATE_INTENT.search(question):
+            return None
+        columns = self.tables[table]["columns"]
+        numeric_columns = self._numeric_columns(table)
+
+        def match_column(phrase: str, numeric_only: bool = False) -> Optional[str]:
+            wanted = set(tokenize(phrase))
+            best, best_overlap = None, 0
+            for sql_column, original in columns.items():
+                if numeric_only and sql_column not in numeric_columns:
+                    continue
+                overlap = len(wanted & set(tokenize(original)))
+                if overlap > best_overlap:
+                    best, best_overlap = sql_column, overlap
+            return best
+
+        group_by = None
+        group_match = _GROUP_BY.search(question)
+        if group_match:
+            group_by = match_column(group_match.group(1))
+
+        aggregate, label = "COUNT(*)", "count"
+        for pattern, function in ((_AVERAGE_OF, "AVG"), (_SUM_OF, "SUM")):
+            measure_match = pattern.search(question)
+            measure = match_column(measure_match.group(1), numeric_only=True) if measure_match else None
+            if measure:
+                aggregate, label = f"ROUND({function}({_quote(measure)}), 2)", f"{function.lower()}_{measure}"
+                break
+
+        filters = []
+        filter_values = self._filter_values.get(table, {})
+        for token in tokenize(question):
+            if token in filter_values:
+                column, value = filter_values[token]
+                if column != group_by and (column, value) not in filters:
+                    filters.append((column, value))
+
+        # Statistics hold stripped values
+        where = " AND ".join(f"TRIM({_quote(column)}) = ?" for column, _ in filters)
+        sql = f"SELECT {_quote(group_by) + ', ' if group_by else ''}{aggregate} AS {_quote(label)} FROM {_quote(table)}"
+        if where:
+            sql += f" WHERE {where}"
+        if group_by:
+            sql += f" GROUP BY {_quote(group_by)} ORDER BY 2 DESC, 1"
+        return {
+            "table": table,
+            "sql": sql,
+            "params": [value for _, value in filters],
+            "group_by": columns.get(group_by) if group_by else None,
+            "filters": {columns[column]: value for column, value in filters},
+            "measure": label
+        }
+
+    def run_plan(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a planned aggregate (internal SQL, so parameters are allowed)"""
+        started = time.perf_counter()
+        with self._lock:
+            cursor = self._conn.execute(plan["sql"], plan["params"])
+            columns = [description[0] for description in cursor.description]
+            rows = [list(row) for row in cursor.fetchmany(Config.SQL_MAX_ROWS)]
+            self.queries += 1
+        return {"columns": columns, "rows": rows, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    def _numeric_columns(self, table: str) -> set:
+        with self._lock:
+            info = self._conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+        return {row[1] for row in info if row[2] in ("INTEGER", "REAL")}
+
+    def describe(self) -> Dict[str, Any]:
+        """Catalog of the registered tables"""
+        return {
+            table: {
+                "category": meta["category"],
+                "file": meta["file"],
+                "sheet": meta["sheet"],
+                "rows": meta["rows"],
+                "columns": meta["columns"]
+            }
+            for table, meta in self.tables.items()
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tables": len(self.tables),
+            "rows": sum(meta["rows"] for meta in self.tables.values()),
+            "database": self.path or ":memory:",
+            "database_bytes": os.path.getsize(self.path) if self.path and os.path.exists(self.path) else None,
+            "queries": self.queries
+        }
+
+
+def format_aggregate_answer(plan: Dict[str, Any], result: Dict[str, Any], source: str) -> str:
+    """Render an aggregate result as a short answer"""
+    conditions = ", ".join(f"{column} = {value}" for column, value in plan["filters"].items())
+    scope = f" where {conditions}" if conditions else ""
+    if plan["group_by"]:
+        lines = [f"{plan['measure']} by {plan['group_by']}{scope} (from {source}):"]
+        lines += [f"- {row[0] if row[0] is not None else '(blank)'}: {row[1]}" for row in result["rows"]]
+        return "\n".join(lines)
+    value = result["rows"][0][0] if result["rows"] else 0
+    if plan["measure"] == "count":
+        return f"There are {value} matching rows{scope} in {source}."
+    return f"{plan['measure']}{scope} in {source}: {value}"
@@ -0,0 +1,36 @@
+from answer_cache import SemanticCache, anchor_terms, evaluate_semantic_cache
+from embeddings import HashingEmbedder
+
+
+def cache():
+    return SemanticCache(HashingEmbedder(), 8, 0.85, 60)
+
+
+def lookup(semantic, question):
+    return semantic.lookup(question, "p", "m", lambda categories: "v")
+
+
+def test_eval_set_has_no_false_hits():
+    result = evaluate_semantic_cache(threshold=0.85)
+    assert result["false_hit_rate"] == 0.0
+    assert result["hit_rate"] == 1.0
+
+
+def test_name_swap_in_a_long_question_is_a_miss():
+    semantic = cache()
+    cached = "how many people are on bench in the Pune office this month and what are their skills"
+    semantic.put(cached, "p", "m", {"answer": "12"}, ["Bench Report"], "v")
+    assert lookup(semantic, cached.replace("Pune", "Delhi")) is None
+    assert lookup(semantic, cached)["answer"] == "12"
+
+
+def test_paraphrase_sharing_the_anchors_is_a_hit():
+    semantic = cache()
+    semantic.put("how many people are on bench in Pune", "p", "m", {"answer": "4"}, ["Bench Report"], "v")
+    assert lookup(semantic, "bench count in Pune")["answer"] == "4"
+
+
+def test_anchors_are_names_places_and_ids():
+    assert anchor_terms("what is the utilization of employee 10423 this month") == {"10423"}
+    assert anchor_terms("how many open RRFs are there for Acme") == {"acme"}
+    assert anchor_terms("how many people are on bench") == frozenset()
@@ -0,0 +1,36 @@
+import asyncio
+import gc
+
+from batching import MicroBatcher
+
+
+def test_full_batch_is_sent_once_and_routed_back():
+    calls = []
+
+    async def send(items):
+        calls.append(list(items))
+        await asyncio.sleep(0)
+        gc.collect()  # an unreferenced send task would be collected here
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(send, max_batch=3, max_wait_ms=1000)
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(3))), 1)
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert results == [0, 2, 4]
+    assert calls == [[0, 1, 2]]
+    assert batcher.stats()["in_flight"] == 0
+
+
+def test_send_failure_reaches_every_caller():
+    async def send(items):
+        raise RuntimeError("upstream down")
+
+    async def run():
+        batcher = MicroBatcher(send, max_batch=10, max_wait_ms=5)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
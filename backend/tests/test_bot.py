@@ -0,0 +1,203 @@
+import asyncio
+import time
+
+import pytest
+
+import bot as bot_module
+from answer_cache import answer_cache
+from cache import PayloadCache
+from config import Config
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = PayloadCache(max_bytes=64 * 1024 * 1024, cache_dir=str(tmp_path))
+    monkeypatch.setattr(bot_module, "payload_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def bot(cache, monkeypatch):
+    monkeypatch.setattr(Config, "VECTOR_INDEX_PATH", "")
+    monkeypatch.setattr(Config, "SQL_DB_PATH", "")
+    return bot_module.OperationsBot()
+
+
+def bench(names):
+    return {"type": "csv", "columns": ["Employee Name", "Status"],
+            "data": [{"Employee Name": name, "Status": "Available"} for name in names]}
+
+
+def scan(cache, files):
+    """Scan results for Bench Report files given as {file_id: (version, payload)}"""
+    extracted = {}
+    for file_id, (version, payload) in files.items():
+        cache.put(file_id, payload, version)
+        extracted[f"{file_id}.csv"] = {"file_info": {"id": file_id, "name": f"{file_id}.csv"}, "version": version}
+    return {"Bench Report": {"files": [entry["file_info"] for entry in extracted.values()], "extracted_data": extracted}}
+
+
+def found(bot, name):
+    return {hit["file_id"] for hit in bot.search_index.search(name)}
+
+
+def test_failed_extraction_is_not_cached(bot, cache, monkeypatch):
+    extracted = []
+    monkeypatch.setattr(bot.onedrive_client, "download_file", lambda file_id, path: None)
+
+    def extract(path):
+        extracted.append(path)
+        return {"error": "File is corrupt"}
+
+    monkeypatch.setattr(bot_module, "extract_file", extract)
+    file_info = {"id": "f1", "name": "bench.xlsx", "eTag": "v1"}
+
+    assert "failed" in bot._extract_file(file_info)["digest"]
+    assert cache.get("f1") is None
+    # The next scan retries the download instead of serving the error
+    bot._extract_file(file_info)
+    assert len(extracted) == 2
+
+
+def test_index_update_touches_only_changed_and_removed_files(bot, cache):
+    first = bot._update_indexes(scan(cache, {"a": ("1", bench(["Asha Rao"])), "b": ("1", bench(["Ben Ito"]))}))
+    assert (first["files"], first["changed"], first["removed"]) == (2, 2, 0)
+
+    unchanged = bot._update_indexes(scan(cache, {"a": ("1", bench(["Asha Rao"])), "b": ("1", bench(["Ben Ito"]))}))
+    assert (unchanged["changed"], unchanged["removed"]) == (0, 0)
+
+    update = bot._update_indexes(scan(cache, {"a": ("2", bench(["Chen Wu"]))}))
+    assert (update["files"], update["changed"], update["removed"]) == (1, 1, 1)
+    assert found(bot, "chen") == {"a"}
+    assert found(bot, "asha") == set() and found(bot, "ben") == set()
+    assert set(bot.sql_engine.file_tables) == {"a"}
+    assert set(bot.entity_index.file_ids) == {"a"}
+
+
+def test_invalidate_drops_indexes_and_answers_of_the_file(bot, cache):
+    bot._update_indexes(scan(cache, {"a": ("1", bench(["Asha Rao"])), "b": ("1", bench(["Ben Ito"]))}))
+    key = answer_cache.make_key("who is on bench", "mock", "mock", "v1")
+    answer_cache.put(key, {"answer": "Asha Rao"}, ["Bench Report"])
+
+    result = bot.invalidate(file_id="a")
+
+    assert result["invalidated"] == ["a"]
+    assert cache.get("a") is None
+    assert "a" not in bot.indexed_files and "b" in bot.indexed_files
+    assert found(bot, "asha") == set() and found(bot, "ben") == {"b"}
+    assert "a" not in bot.sql_engine.file_tables and "a" not in bot.entity_index.file_ids
+    assert answer_cache.get(key) is None
+
+
+def test_cursor_round_trips_offset():
+    cursor = bot_module.OperationsBot._encode_cursor(40, "v1")
+    assert bot_module.OperationsBot._decode_cursor(cursor, "v1") == 40
+    assert bot_module.OperationsBot._decode_cursor(None, "v1") == 0
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30=", "WzFd", "eyJvZmZzZXQiOiAieCJ9"])
+def test_malformed_cursor_is_rejected(cursor):
+    # Garbage, {}, [1] and {"offset": "x"}
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        bot_module.OperationsBot._decode_cursor(cursor, "v1")
+
+
+def test_cursor_from_an_older_version_is_stale():
+    cursor = bot_module.OperationsBot._encode_cursor(40, "v1")
+    with pytest.raises(ValueError, match="stale"):
+        bot_module.OperationsBot._decode_cursor(cursor, "v2")
+
+
+def test_category_pages_follow_the_cursor(bot, monkeypatch):
+    files = [{"id": f"f{i}", "name": f"f{i}.csv"} for i in range(5)]
+    data = {"scan_results": {"Bench Report": {
+        "folder_path": "Bench", "file_count": 5, "version": "v1", "files": files, "extracted_data": {}
+    }}}
+
+    async def scan_all_data():
+        return data
+
+    monkeypatch.setattr(bot, "scan_all_data", scan_all_data)
+    pages, cursor = [], None
+    while True:
+        page = asyncio.run(bot.get_category_details("Bench Report", cursor=cursor, limit=2))
+        pages.append([f["id"] for f in page["files"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [["f0", "f1"], ["f2", "f3"], ["f4"]]
+
+
+def test_index_failure_is_isolated_to_its_file(bot, cache, monkeypatch):
+    bot._update_indexes(scan(cache, {"a": ("1", bench(["Asha Rao"])), "b": ("1", bench(["Ben Ito"]))}))
+    register = bot.sql_engine.register_file
+
+    def failing(file_id, *args):
+        if file_id == "a":
+            raise TypeError("unsupported column type")
+        return register(file_id, *args)
+
+    monkeypatch.setattr(bot.sql_engine, "register_file", failing)
+    results = scan(cache, {"a": ("2", bench(["Chen Wu"])), "b": ("2", bench(["Dev Shah"]))})
+    update = bot._update_indexes(results)
+
+    assert update["failed"] == {"a.csv": "unsupported column type"}
+    assert results["Bench Report"]["extracted_data"]["a.csv"]["index_error"] == "unsupported column type"
+    assert found(bot, "dev") == {"b"}
+    # The failed file keeps its previous SQL and entity entries and is retried on the next scan
+    assert "a" in bot.sql_engine.file_tables and bot.entity_index.lookup("asha rao")
+    assert bot.indexed_files["a"][2] == "1"
+
+    monkeypatch.setattr(bot.sql_engine, "register_file", register)
+    retry = bot._update_indexes(results)
+    assert retry["changed"] == 1 and retry["failed"] == {}
+    assert "index_error" not in results["Bench Report"]["extracted_data"]["a.csv"]
+
+
+def test_answer_work_runs_off_the_event_loop(bot, monkeypatch):
+    async def scan_all_data():
+        return {"scan_results": {}}
+
+    def slow_intent(question):
+        time.sleep(0.2)
+        return {"answer": "4 people", "confidence": "high"}
+
+    monkeypatch.setattr(bot, "scan_all_data", scan_all_data)
+    monkeypatch.setattr(bot, "_answer_with_intent", slow_intent)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        answer = await bot.answer_question("how many people are on bench")
+        task.cancel()
+        return answer, ticks
+
+    answer, ticks = asyncio.run(run())
+    assert answer["answer"] == "4 people"
+    assert ticks >= 5  # the loop kept serving while the intent answer was computed
+
+
+def test_invalidate_refreshes_the_affected_category(bot, cache, monkeypatch):
+    files = {"a": ("1", bench(["Asha Rao"])), "b": ("1", bench(["Ben Ito"]))}
+    results = scan(cache, files)
+    bot._update_indexes(results)
+    bot.cache["scan_data"] = {"scan_results": results}
+    refreshed = []
+
+    def refresh_category(category):
+        refreshed.append(category)
+        return bot._update_indexes(scan(cache, files))
+
+    monkeypatch.setattr(bot, "refresh_category", refresh_category)
+    result = bot.invalidate(file_id="a")
+
+    assert refreshed == ["Bench Report"] and result["refreshed"] == ["Bench Report"]
+    assert result["deferred"] == {}
+    assert found(bot, "asha") == {"a"} and "a" in bot.indexed_files
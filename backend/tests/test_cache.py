@@ -0,0 +1,31 @@
+import json
+
+from cache import PayloadCache, payload_size
+
+
+def sheet(rows):
+    return {"type": "csv", "columns": ["Name", "Hours"], "data": [{"Name": f"P{i}", "Hours": i * 1.5} for i in range(rows)]}
+
+
+def test_size_reflects_decoded_objects_not_json_length():
+    payload = json.loads(json.dumps(sheet(1000)))
+    assert payload_size(payload) > 3 * len(json.dumps(payload))
+
+
+def test_shared_objects_are_counted_once():
+    row = {"Name": "P1"}
+    assert payload_size([row, row, row]) < payload_size([dict(row), dict(row), dict(row)])
+
+
+def test_budget_is_kept_against_estimated_size(tmp_path):
+    one = payload_size(json.loads(json.dumps(sheet(200))))
+    cache = PayloadCache(max_bytes=int(one * 2.5), cache_dir=str(tmp_path))
+    for file_id in ("a", "b", "c"):
+        cache.put(file_id, sheet(200), version="1")
+
+    assert cache.current_bytes <= cache.max_bytes
+    assert not cache.in_memory("a") and cache.in_memory("c")
+    assert cache.evictions == 1
+    # Evicted payloads come back from disk with the same accounting
+    assert cache.get("a", "1")["data"][3]["Name"] == "P3"
+    assert cache.current_bytes <= cache.max_bytes
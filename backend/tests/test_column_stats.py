@@ -0,0 +1,37 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_stats import HyperLogLog, column_stats
+
+
+def test_infinite_values_are_left_out_of_the_numeric_stats():
+    stats = column_stats("Hours", pd.Series([1.0, np.inf, -np.inf, np.nan, 3.0]))
+    assert stats["kind"] == "numeric"
+    assert stats["nulls"] == 1 and stats["non_finite"] == 2
+    assert (stats["min"], stats["max"], stats["sum"], stats["mean"]) == (1.0, 3.0, 4.0, 2.0)
+    assert sum(stats["histogram"]["counts"]) == 2
+
+
+def test_column_of_only_infinite_values_is_empty():
+    assert column_stats("Ratio", pd.Series([np.inf, -np.inf]))["kind"] == "empty"
+
+
+def test_date_columns_are_detected_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        dates = column_stats("Start Date", pd.Series(["2024-01-05", "05/02/2024", "n/a", "2024-03-01"]))
+        text = column_stats("Due", pd.Series(["soon", "later"]))
+    assert dates["kind"] == "datetime"
+    assert dates["min"].startswith("2024-01-05") and dates["max"].startswith("2024-")
+    assert text["kind"] == "text"
+
+
+@pytest.mark.parametrize("distinct", [1000, 50000])
+def test_hyperloglog_estimate_is_within_its_error_bound(distinct):
+    sketch = HyperLogLog(precision=12)
+    sketch.add_series(pd.Series([f"employee-{i}" for i in range(distinct)] * 2))
+    # Standard error is 1.04 / sqrt(2 ** 12) = 1.6%; allow three of them
+    assert abs(sketch.count() - distinct) <= 0.05 * distinct
@@ -0,0 +1,45 @@
+from entity_index import EntityIndex
+
+BENCH = {"type": "excel", "sheets": {"Bench": {"columns": ["Employee Name", "Emp ID", "Skills"], "data": [
+    {"Employee Name": "Asha Rao", "Emp ID": "EMP-0042", "Skills": "Java, AWS"},
+    {"Employee Name": "Ben Ito", "Emp ID": "EMP-0043", "Skills": "Python"},
+]}}}
+CERTS = {"type": "csv", "columns": ["Employee Name", "Certification"], "data": [
+    {"Employee Name": "Asha Rao", "Certification": "AWS SAA"},
+]}
+
+
+def index():
+    entities = EntityIndex()
+    entities.add_file("bench", "Bench Report", "bench.xlsx", BENCH, "1")
+    entities.add_file("certs", "Certification List", "certs.csv", CERTS, "1")
+    return entities
+
+
+def test_exact_lookup_finds_every_location():
+    locations = index().lookup("ASHA  rao")
+    assert {(hit["file"], hit["sheet"], hit["row"]) for hit in locations} == {("bench.xlsx", "Bench", 0), ("certs.csv", None, 0)}
+    assert {hit["type"] for hit in locations} == {"person"}
+
+
+def test_multi_value_cells_are_split():
+    assert [hit["row"] for hit in index().lookup("java")] == [0]
+    assert index().lookup("emp-0043")[0]["type"] == "employee_id"
+
+
+def test_partial_mentions_in_a_question():
+    found = index().find("which certifications does Asha Rao hold besides aws saa")
+    assert ("asha rao", "person") in found
+    assert ("aws saa", "certification") in found
+    # The longer match wins, so "aws" alone is not reported inside "aws saa"
+    assert ("aws", "skill") not in found
+    assert index().lookup("asha") == []
+
+
+def test_lookup_after_a_file_is_removed():
+    entities = index()
+    assert entities.remove_file("bench")
+    assert [hit["file"] for hit in entities.lookup("asha rao")] == ["certs.csv"]
+    assert entities.lookup("python") == []
+    assert entities.find("who knows python") == []
+    assert entities.stats()["files"] == 1
@@ -0,0 +1,59 @@
+from intents import IntentAggregates
+
+BENCH = {"type": "csv", "columns": ["Employee Name", "Status", "Location"], "data": [
+    {"Employee Name": f"Person {i}", "Status": "Available" if i % 2 else "Blocked", "Location": ["Pune", "Chennai"][i % 2]}
+    for i in range(60)
+]}
+
+
+def aggregates() -> IntentAggregates:
+    index = IntentAggregates()
+    index.add_file("bench-1", "Bench Report", "bench.csv", BENCH)
+    return index
+
+
+def count(index: IntentAggregates, question: str):
+    return index.answer({"kind": "count", "category": "Bench Report"}, question, lambda file_id: BENCH)
+
+
+def test_plain_count_uses_the_category_total():
+    assert count(aggregates(), "how many people are on bench") == "Bench Report has 60 records across 1 file."
+
+
+def test_count_with_a_matching_filter():
+    assert count(aggregates(), "how many people on bench are blocked") == "30 records in Bench Report have Status = Blocked."
+
+
+def test_qualified_count_falls_through():
+    # Skills are not a column here, so the aggregates cannot apply the qualifier
+    index = aggregates()
+    assert count(index, "how many people are on bench with java skills") is None
+    assert count(index, "how many bench resources know python") is None
+    assert count(index, "how many people are blocked in pune for over a month") is None
+
+
+def test_removed_file_no_longer_counts():
+    index = aggregates()
+    index.remove_file("bench-1")
+    assert count(index, "how many people are on bench") is None
+    assert index.stats() == {}
+
+
+RRF = {"type": "csv", "columns": ["RRF Id", "Status"], "data": [
+    {"RRF Id": f"R{i}", "Status": "Active" if i < 2 else "Closed"} for i in range(3)
+]}
+
+
+def test_qualifier_keyword_without_a_filter_falls_through():
+    # "open" routes to RRF but no column holds it, so the total would wrongly include closed rows
+    index = IntentAggregates()
+    index.add_file("rrf-1", "RRF", "rrf.csv", RRF)
+
+    def rrf_count(question):
+        return index.answer({"kind": "count", "category": "RRF"}, question, lambda file_id: RRF)
+
+    assert rrf_count("how many open rrfs") is None
+    assert rrf_count("how many open positions") is None
+    assert rrf_count("how many rrfs are open") is None
+    assert rrf_count("how many rrfs are closed") == "1 records in RRF have Status = Closed."
+    assert rrf_count("how many rrfs") == "RRF has 3 records across 1 file."
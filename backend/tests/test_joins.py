@@ -0,0 +1,73 @@
+import pandas as pd
+
+from joins import JoinViews, _key_columns
+
+
+def csv(rows):
+    return {"type": "csv", "columns": list(rows[0]), "data": rows}
+
+
+PAYLOADS = {
+    "bench": csv([
+        {"Employee Name": "Asha Rao", "Emp ID": "EMP-0042", "Reporting Manager": "Ravi Iyer"},
+        {"Employee Name": "Ben Ito", "Emp ID": "EMP-0043", "Reporting Manager": "Ravi Iyer"},
+        {"Employee Name": "Chen Wu", "Emp ID": "EMP-0044", "Reporting Manager": "Mia Lee"},
+    ]),
+    "certs": csv([
+        {"Employee ID": "emp 42", "Certification": "AWS SAA"},
+        {"Employee ID": "EMP-0044", "Certification": "CKA"},
+        {"Employee ID": "EMP-0099", "Certification": "PMP"},
+    ]),
+    "utilization": csv([
+        {"Employee ID": "EMP-0042", "Utilization %": 0},
+        {"Employee ID": "EMP-0099", "Utilization %": 85},
+    ]),
+}
+
+
+def scan_results():
+    def category(file_id, version):
+        return {"version": version, "extracted_data": {
+            f"{file_id}.csv": {"file_info": {"id": file_id}, "version": version}
+        }}
+
+    return {
+        "Bench Report": category("bench", "b1"),
+        "Certification List": category("certs", "c1"),
+        "Utilization": category("utilization", "u1"),
+    }
+
+
+def get_payload(file_id, version=None):
+    return PAYLOADS[file_id]
+
+
+def test_every_view_is_joined_on_the_employee_id():
+    views = JoinViews()
+    assert sorted(views.refresh(scan_results(), get_payload)) == [
+        "bench_certifications", "bench_utilization", "certification_utilization"
+    ]
+    described = views.describe()
+    assert {name: (view["key"], view["rows"]) for name, view in described.items()} == {
+        "bench_certifications": ("employee_id", 2),  # inner: Asha and Chen hold a cert
+        "bench_utilization": ("employee_id", 3),  # left: every benched employee
+        "certification_utilization": ("employee_id", 3),  # left: every certification
+    }
+    certified = views.rows("bench_certifications")["rows"]
+    assert {(row["Employee Name"], row["Certification"]) for row in certified} == {
+        ("Asha Rao", "AWS SAA"), ("Chen Wu", "CKA")
+    }
+
+
+def test_unchanged_inputs_are_not_rebuilt_until_forgotten():
+    views = JoinViews()
+    views.refresh(scan_results(), get_payload)
+    assert views.refresh(scan_results(), get_payload) == []
+    views.forget({"Utilization"})
+    assert sorted(views.refresh(scan_results(), get_payload)) == ["bench_utilization", "certification_utilization"]
+
+
+def test_key_prefers_the_employee_over_other_people():
+    frame = pd.DataFrame(columns=["Reporting Manager", "Employee Name"])
+    assert _key_columns(frame) == {"_employee_name": "Employee Name"}
+    assert _key_columns(pd.DataFrame(columns=["Mentor Name"])) == {"_employee_name": "Mentor Name"}
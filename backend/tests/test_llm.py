@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from llm import LLMClient, ProviderChain
+from resilience import CircuitBreaker
+
+
+def client(name: str, answer=None, delay: float = 0, error: str = None, calls: list = None) -> LLMClient:
+    """Mock-backed client whose query waits, then answers or fails"""
+    llm = LLMClient("mock")
+    llm.provider = name
+    llm.breaker = CircuitBreaker(name, failure_threshold=5, reset_seconds=60)
+
+    async def query(prompt, context=None):
+        if calls is not None:
+            calls.append((name, time.perf_counter()))
+        await asyncio.sleep(delay)
+        if error:
+            raise HTTPException(status_code=500, detail=error)
+        return answer
+
+    llm._query = query
+    return llm
+
+
+def streaming(llm: LLMClient, chunks: list, stall_after: int = None) -> LLMClient:
+    async def stream(prompt, context=None):
+        for index, chunk in enumerate(chunks):
+            if index == stall_after:
+                await asyncio.sleep(60)
+            yield chunk
+
+    llm.stream = stream
+    return llm
+
+
+def test_fails_over_to_the_next_provider_on_error():
+    chain = ProviderChain([client("first", error="quota exceeded"), client("second", "answer")], deadline=1, hedge=False)
+    assert asyncio.run(chain.query("question")) == "answer"
+    assert chain.clients[0].breaker.status()["consecutive_failures"] == 1
+
+
+def test_all_providers_failing_is_a_502():
+    chain = ProviderChain([client("first", error="down"), client("second", error="also down")], deadline=1, hedge=False)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(chain.query("question"))
+    assert error.value.status_code == 502
+    assert "down" in error.value.detail and "also down" in error.value.detail
+
+
+def test_hedge_fires_after_the_delay_and_the_faster_answer_wins():
+    calls = []
+    chain = ProviderChain(
+        [client("slow-primary", "slow", delay=0.5, calls=calls), client("hedge", "fast", calls=calls)],
+        deadline=5, hedge=True, hedge_delay=0.05
+    )
+    started = time.perf_counter()
+    assert asyncio.run(chain.query("question")) == "fast"
+    assert [name for name, _ in calls] == ["slow-primary", "hedge"]
+    assert calls[1][1] - calls[0][1] >= 0.04
+    assert time.perf_counter() - started < 0.4
+
+
+def test_no_hedge_without_hedging_enabled():
+    calls = []
+    chain = ProviderChain(
+        [client("primary", "answer", delay=0.1, calls=calls), client("backup", "other", calls=calls)],
+        deadline=5, hedge=False
+    )
+    assert asyncio.run(chain.query("question")) == "answer"
+    assert [name for name, _ in calls] == ["primary"]
+
+
+def collect(chain: ProviderChain) -> list:
+    async def run():
+        return [chunk async for chunk in chain.stream("question")]
+
+    return asyncio.run(run())
+
+
+def test_stream_stalling_before_output_fails_over():
+    stalled = streaming(client("stalled"), ["never"], stall_after=0)
+    chain = ProviderChain([stalled, streaming(client("backup"), ["a", "b"])], deadline=0.05, hedge=False)
+    assert collect(chain) == ["a", "b"]
+    assert stalled.breaker.status()["consecutive_failures"] == 1
+
+
+def test_stream_stalling_mid_response_is_cut_off():
+    chain = ProviderChain([streaming(client("stalled"), ["a", "b"], stall_after=1),
+                           streaming(client("backup"), ["x"])], deadline=0.05, hedge=False)
+    received = []
+
+    async def run():
+        async for chunk in chain.stream("question"):
+            received.append(chunk)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(asyncio.wait_for(run(), 2))
+    assert error.value.status_code == 504
+    assert received == ["a"]
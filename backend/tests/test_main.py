@@ -0,0 +1,61 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+import main
+from config import Config
+
+
+def test_probes_are_served_while_the_snapshot_loads(monkeypatch):
+    loading, release = threading.Event(), threading.Event()
+
+    def load_snapshot():
+        loading.set()
+        release.wait(5)
+        return False
+
+    monkeypatch.setattr(Config, "ENABLE_SCHEDULER", False)
+    monkeypatch.setattr(main.bot, "load_snapshot", load_snapshot)
+    monkeypatch.setattr(main.bot, "rescan", lambda if_stale=False: {})
+    with TestClient(main.app) as client:
+        assert loading.wait(5)
+        assert client.get("/api/health/live").status_code == 200
+        assert client.get("/api/health/ready").json()["warmup"] == "warming"
+        release.set()
+    assert main.warmup_state["task"].done()
+
+
+def test_waiting_scans_reuse_the_scan_they_waited_for(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SNAPSHOT_PATH", str(tmp_path / "snapshot.json"))
+    monkeypatch.setattr(Config, "VECTOR_INDEX_PATH", "")
+    monkeypatch.setattr(Config, "SQL_DB_PATH", "")
+    bot = main.bot.__class__()
+    scanned = []
+
+    def scan_category(category):
+        scanned.append(category)
+        return {"folder_path": category, "files": [], "file_count": 0, "extracted_data": {}}
+
+    monkeypatch.setattr(bot, "_scan_category", scan_category)
+    bot.rescan(True)
+    bot.rescan(True)
+    assert len(scanned) == len(Config.DATA_CATEGORIES)
+    bot.rescan()
+    assert len(scanned) == 2 * len(Config.DATA_CATEGORIES)
+
+
+def test_entity_lookup_limit_is_clamped(monkeypatch):
+    limits = []
+    monkeypatch.setattr(Config, "ENTITY_MAX_LOCATIONS", 50)
+    monkeypatch.setattr(main.bot.entity_index, "lookup", lambda name, limit: limits.append(limit) or [])
+    for limit in (10, 10 ** 9, -5):
+        main.lookup_entity("asha rao", limit)
+    assert limits == [10, 50, 1]
+
+
+def test_join_view_paging_is_bounded():
+    client = TestClient(main.app)
+    assert client.get("/api/bot/views/bench_utilization", params={"offset": -1}).status_code == 422
+    assert client.get("/api/bot/views/bench_utilization", params={"limit": 0}).status_code == 422
+    assert client.get("/api/bot/views/bench_utilization",
+                      params={"limit": Config.CATEGORY_MAX_PAGE_SIZE + 1}).status_code == 422
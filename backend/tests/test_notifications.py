@@ -0,0 +1,53 @@
+import asyncio
+
+from notifications import ChangeQueue, parse_notifications
+
+
+def test_items_enqueued_during_a_flush_are_delivered():
+    flushed = []
+
+    async def run():
+        queue = None
+
+        def on_flush(item_ids, full_rescan):
+            flushed.append(item_ids)
+            if item_ids == ["a"]:
+                # Arrives while the first flush is running
+                loop.call_soon_threadsafe(queue.enqueue, ["b"])
+
+        loop = asyncio.get_running_loop()
+        queue = ChangeQueue(on_flush, debounce_seconds=0.01, max_delay_seconds=1)
+        queue.enqueue(["a"])
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if len(flushed) == 2 and not queue.pending_ids:
+                break
+        return queue
+
+    queue = asyncio.run(run())
+    assert flushed == [["a"], ["b"]]
+    assert queue.status()["pending_items"] == 0
+
+
+def test_burst_is_coalesced_into_one_flush():
+    flushed = []
+
+    async def run():
+        queue = ChangeQueue(lambda item_ids, full_rescan: flushed.append((item_ids, full_rescan)),
+                            debounce_seconds=0.05, max_delay_seconds=1)
+        queue.enqueue(["b"])
+        queue.enqueue(["a"])
+        queue.enqueue([], full_rescan=True)
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    assert flushed == [(["a", "b"], True)]
+
+
+def test_foreign_client_state_is_rejected():
+    body = {"value": [
+        {"clientState": "secret", "resourceData": {"id": "item-1"}},
+        {"clientState": "other", "resourceData": {"id": "item-2"}},
+        {"clientState": "secret"}
+    ]}
+    assert parse_notifications(body, "secret") == {"item_ids": ["item-1"], "full_rescan": True, "rejected": 1}
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from llm import LLMClient, ProviderChain
+from resilience import CircuitBreaker
+
+
+def hung_client() -> LLMClient:
+    client = LLMClient("mock")
+    client.breaker = CircuitBreaker("mock", failure_threshold=2, reset_seconds=60)
+
+    async def never_answers(prompt, context=None):
+        await asyncio.sleep(60)
+
+    client._query = never_answers
+    return client
+
+
+def test_deadline_expiries_open_the_breaker():
+    client = hung_client()
+    chain = ProviderChain([client], deadline=0.05, hedge=False)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(HTTPException) as error:
+                await chain._attempt(client, "question")
+            assert error.value.status_code == 504
+
+    asyncio.run(run())
+    status = client.breaker.status()
+    assert status["state"] == CircuitBreaker.OPEN
+    assert status["trips"] == 1
+    assert not client.breaker.would_allow()
+
+
+def test_cancelled_call_is_not_a_failure():
+    breaker = CircuitBreaker("mock", failure_threshold=1)
+    breaker.record_cancelled()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
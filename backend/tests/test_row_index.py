@@ -0,0 +1,41 @@
+from row_index import RowIndex
+from search_index import SearchIndex
+
+BENCH = {"type": "csv", "columns": ["Name", "Skill"],
+         "data": [{"Name": f"Person {i}", "Skill": "java" if i % 10 == 0 else "python"} for i in range(100)]}
+TRAINING = {"type": "csv", "columns": ["Name", "Course"],
+            "data": [{"Name": "Person 0", "Course": "java basics"}]}
+PAYLOADS = {"bench": BENCH, "training": TRAINING}
+
+
+def index():
+    rows = RowIndex()
+    rows.add_file("bench", "Bench Report", "bench.csv", BENCH)
+    rows.add_file("training", "Training", "training.csv", TRAINING)
+    return rows
+
+
+def test_top_k_matches_a_full_sort():
+    rows = index()
+    full = rows.ranked({"java", "person"})
+    assert rows.ranked({"java", "person"}, 5) == full[:5]
+
+
+def test_retrieve_returns_best_rows_of_allowed_categories():
+    hits = index().retrieve("java", PAYLOADS.get, categories=["Bench Report"], k=3)
+    assert len(hits) == 3
+    assert {hit["category"] for hit in hits} == {"Bench Report"}
+    assert all(hit["values"]["Skill"] == "java" for hit in hits)
+
+
+def test_category_filter_is_applied_before_the_limit():
+    # The training row outranks the bench rows but is not allowed, so it must not use up the k slots
+    hits = index().retrieve("java basics", PAYLOADS.get, categories=["Bench Report"], k=2)
+    assert len(hits) == 2 and hits[0]["file"] == "bench.csv"
+
+
+def test_search_limits_results():
+    search = SearchIndex()
+    search.add_file("bench", "Bench Report", "bench.csv", BENCH)
+    search.add_file("training", "Training", "training.csv", TRAINING)
+    assert len(search.search("java", k=1)) == 1
@@ -0,0 +1,52 @@
+import pytest
+
+from config import Config
+from sql_engine import SQLEngine
+
+ROWS = {"type": "csv", "columns": ["Id"], "data": [{"Id": i} for i in range(12)]}
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SQL_MAX_ROWS", 5)
+    engine = SQLEngine(str(tmp_path / "tables.db"))
+    engine.register_file("f1", "Bench Report", "bench.csv", ROWS)
+    return engine
+
+
+def table(engine):
+    return next(iter(engine.tables))
+
+
+def test_max_rows_cannot_exceed_the_configured_cap(engine):
+    result = engine.query(f'SELECT * FROM "{table(engine)}"', max_rows=1000)
+    assert result["row_count"] == 5
+    assert result["truncated"]
+
+
+@pytest.mark.parametrize("max_rows", [-1, -100])
+def test_negative_max_rows_returns_at_least_one_row(engine, max_rows):
+    result = engine.query(f'SELECT * FROM "{table(engine)}"', max_rows=max_rows)
+    assert result["row_count"] == 1
+    assert result["rows"] == [[0]]
+
+
+def test_smaller_max_rows_is_honoured(engine):
+    result = engine.query(f'SELECT * FROM "{table(engine)}"', max_rows=3)
+    assert result["rows"] == [[0], [1], [2]]
+
+
+def test_only_select_is_allowed(engine):
+    with pytest.raises(ValueError):
+        engine.query(f'DELETE FROM "{table(engine)}"')
+
+
+def test_tables_are_stored_in_the_database_file(engine):
+    assert engine.stats()["database_bytes"] > 0
+    engine.remove_file("f1")
+    assert engine.stats()["tables"] == 0
+
+
+def test_a_new_engine_starts_from_an_empty_database(engine):
+    fresh = SQLEngine(engine.path)
+    assert fresh.query("SELECT count(*) FROM sqlite_master")["rows"] == [[0]]
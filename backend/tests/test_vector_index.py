@@ -0,0 +1,39 @@
+from vector_index import VectorIndex
+
+POLICY = {"type": "pdf", "text": "", "pages": [
+    {"page_number": 1, "text": "Employees on the bench must complete one certification within thirty days."},
+    {"page_number": 2, "text": "Laptops are returned to IT on the last working day."},
+]}
+HANDBOOK = {"type": "word", "text": "Travel expenses are reimbursed within two weeks of submitting receipts."}
+
+
+def index(path=""):
+    vectors = VectorIndex(path=path)
+    vectors.add_file("policy", "Bench Report", "bench_policy.pdf", POLICY)
+    vectors.add_file("handbook", "Training", "handbook.docx", HANDBOOK)
+    return vectors
+
+
+def test_nearest_passage_ranks_first():
+    hits = index().search("how soon must benched employees get certified", k=3, min_score=0)
+    assert hits[0]["file"] == "bench_policy.pdf" and hits[0]["page"] == 1
+    assert [hit["score"] for hit in hits] == sorted((hit["score"] for hit in hits), reverse=True)
+    assert index().search("travel expense reimbursement", k=1, min_score=0)[0]["file"] == "handbook.docx"
+
+
+def test_category_filter():
+    hits = index().search("certification", k=5, categories=["Training"], min_score=0)
+    assert hits and {hit["category"] for hit in hits} == {"Training"}
+
+
+def test_saved_index_loads_back_with_the_same_results(tmp_path):
+    path = str(tmp_path / "vectors.npz")
+    saved = index(path)
+    saved.save()
+
+    loaded = VectorIndex(path=path)
+    assert loaded.load()
+    question = "when are laptops returned"
+    assert loaded.search(question, k=3, min_score=0) == saved.search(question, k=3, min_score=0)
+    # Loaded documents are not re-embedded when their text is unchanged
+    assert loaded.add_file("policy", "Bench Report", "bench_policy.pdf", POLICY) is False
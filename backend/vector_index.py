@@ -0,0 +1,218 @@
+"""
+Vector index over PDF and Word passages
+Document text is split into overlapping chunks, embedded with the local hashing
+embedder and searched by cosine similarity: brute-force NumPy by default, HNSW
+when hnswlib is installed and the index is large. Files are re-embedded only
+when their text hash changes, and the index is persisted next to the snapshot
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from config import Config
+from embeddings import HashingEmbedder, embedder
+
+try:
+    import hnswlib
+    HNSW_AVAILABLE = True
+except ImportError:
+    HNSW_AVAILABLE = False
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def chunk_text(text: str, chunk_chars: int = None, overlap_chars: int = None) -> List[str]:
+    """Split text into chunks of about chunk_chars, breaking at sentence ends and overlapping by overlap_chars"""
+    chunk_chars = chunk_chars or Config.VECTOR_CHUNK_CHARS
+    overlap_chars = overlap_chars if overlap_chars is not None else Config.VECTOR_CHUNK_OVERLAP
+    sentences = [sentence for sentence in _SENTENCE_END.split(" ".join(text.split())) if sentence]
+
+    chunks, current = [], ""
+    for sentence in sentences:
+        # Sentences longer than a chunk are hard-split
+        while len(sentence) > chunk_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:chunk_chars])
+            sentence = sentence[chunk_chars - overlap_chars:]
+        if current and len(current) + len(sentence) + 1 > chunk_chars:
+            chunks.append(current)
+            current = current[-overlap_chars:].split(" ", 1)[-1] if overlap_chars else ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def document_chunks(payload: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Chunks of a PDF (per page) or Word document as {text, page}"""
+    if not payload or payload.get("error"):
+        return []
+    if payload.get("type") == "pdf":
+        return [
+            {"text": chunk, "page": page.get("page_number")}
+            for page in payload.get("pages", [])
+            for chunk in chunk_text(page.get("text", ""))
+        ]
+    if payload.get("type") == "word" and payload.get("text"):
+        return [{"text": chunk, "page": None} for chunk in chunk_text(payload["text"])]
+    return []
+
+
+class VectorIndex:
+    def __init__(self, passage_embedder: HashingEmbedder = None, path: str = None):
+        self.embedder = passage_embedder or embedder
+        self.path = path if path is not None else Config.VECTOR_INDEX_PATH
+        self.files = {}  # file_id -> {"hash", "category", "file", "chunks": [{text, page}], "vectors": ndarray}
+        self._matrix = None  # all chunk vectors stacked, rebuilt after changes
+        self._rows = []  # matrix row -> (file_id, chunk index)
+        self._hnsw = None
+        self._dirty = True
+        self._lock = threading.Lock()
+        self.embedded_files = 0
+
+    @staticmethod
+    def content_hash(payload: Dict[str, Any]) -> str:
+        return hashlib.sha1(payload.get("text", "").encode("utf-8")).hexdigest()
+
+    def add_file(self, file_id: str, category: str, file_name: str, payload: Optional[Dict[str, Any]]) -> bool:
+        """Embed a document's chunks unless the same text is already indexed; returns True when it changed"""
+        if not payload or payload.get("type") not in ("pdf", "word"):
+            return self.remove_file(file_id)
+        content_hash = self.content_hash(payload)
+        existing = self.files.get(file_id)
+        if existing and existing["hash"] == content_hash:
+            # Unchanged text; only the location may have moved
+            existing.update(category=category, file=file_name)
+            return False
+
+        chunks = document_chunks(payload)
+        vectors = self.embedder.embed_many([chunk["text"] for chunk in chunks])
+        with self._lock:
+            self.files[file_id] = {
+                "hash": content_hash,
+                "category": category,
+                "file": file_name,
+                "chunks": chunks,
+                "vectors": vectors
+            }
+            self._dirty = True
+            self.embedded_files += 1
+        return True
+
+    def remove_file(self, file_id: str) -> bool:
+        with self._lock:
+            if self.files.pop(file_id, None) is None:
+                return False
+            self._dirty = True
+            return True
+
+    def _rebuild_locked(self):
+        vectors, rows = [], []
+        for file_id, entry in self.files.items():
+            if len(entry["vectors"]):
+                vectors.append(entry["vectors"])
+                rows += [(file_id, index) for index in range(len(entry["vectors"]))]
+        self._matrix = np.vstack(vectors) if vectors else np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._rows = rows
+        self._hnsw = None
+        if HNSW_AVAILABLE and Config.VECTOR_HNSW_ENABLED and len(rows) >= Config.VECTOR_HNSW_MIN_CHUNKS:
+            self._hnsw = hnswlib.Index(space="ip", dim=self.embedder.dim)
+            self._hnsw.init_index(max_elements=len(rows), ef_construction=200, M=16)
+            self._hnsw.add_items(self._matrix, np.arange(len(rows)))
+            self._hnsw.set_ef(64)
+        self._dirty = False
+
+    def search(self, query: str, k: int = None, categories: List[str] = None,
+               min_score: float = None) -> List[Dict[str, Any]]:
+        """Top-k passages by cosine similarity, optionally restricted to categories"""
+        k = k or Config.VECTOR_TOP_K
+        min_score = min_score if min_score is not None else Config.VECTOR_MIN_SCORE
+        vector = self.embedder.embed(query)
+        with self._lock:
+            if self._dirty:
+                self._rebuild_locked()
+            if not self._rows:
+                return []
+            # Over-fetch when filtering so k passages survive the category filter
+            fetch = min(len(self._rows), k * 4 if categories else k)
+            if self._hnsw is not None:
+                labels, distances = self._hnsw.knn_query(vector, k=fetch)
+                candidates = [(int(label), 1 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+            else:
+                scores = self._matrix @ vector
+                top = np.argpartition(-scores, fetch - 1)[:fetch]
+                candidates = [(int(row), float(scores[row])) for row in top[np.argsort(-scores[top])]]
+
+            passages = []
+            for row, score in candidates:
+                file_id, index = self._rows[row]
+                entry = self.files[file_id]
+                if score < min_score or (categories and entry["category"] not in categories):
+                    continue
+                chunk = entry["chunks"][index]
+                passages.append({
+                    "category": entry["category"],
+                    "file": entry["file"],
+                    "page": chunk["page"],
+                    "text": chunk["text"],
+                    "score": round(score, 4)
+                })
+                if len(passages) >= k:
+                    break
+            return passages
+
+    def save(self):
+        """Persist chunks and vectors so a restart does not re-embed unchanged documents"""
+        if not self.path:
+            return
+        with self._lock:
+            file_ids = list(self.files)
+            metadata = [
+                {key: self.files[file_id][key] for key in ("hash", "category", "file", "chunks")}
+                for file_id in file_ids
+            ]
+            arrays = {f"v{i}": self.files[file_id]["vectors"] for i, file_id in enumerate(file_ids)}
+        try:
+            temp_path = f"{self.path}.tmp.npz"
+            np.savez(temp_path, meta=np.array(json.dumps({"dim": self.embedder.dim, "file_ids": file_ids,
+                                                          "files": metadata})), **arrays)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save vector index: {e}")
+
+    def load(self) -> bool:
+        """Load a persisted index; returns False when there is none or it was built with another embedding size"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path) as stored:
+                meta = json.loads(str(stored["meta"]))
+                if meta["dim"] != self.embedder.dim:
+                    return False
+                files = {}
+                for i, (file_id, entry) in enumerate(zip(meta["file_ids"], meta["files"])):
+                    files[file_id] = dict(entry, vectors=stored[f"v{i}"])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Failed to load vector index: {e}")
+            return False
+        with self._lock:
+            self.files = files
+            self._dirty = True
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": len(self.files),
+            "chunks": sum(len(entry["chunks"]) for entry in self.files.values()),
+            "embedded_files": self.embedded_files,
+            "backend": "hnsw" if self._hnsw is not None else "numpy",
+            "hnsw_available": HNSW_AVAILABLE,
+            "path": self.path
+        }
@@ -0,0 +1,82 @@
+"""
+Warm cache for the serverless handlers
+Persists the last aggregated result and its timestamp to a compact file in /tmp,
+so later invocations inside the same container can skip the full OneDrive scan
+"""
+
+import os
+import json
+import time
+from typing import Dict, Any, Callable, Optional
+
+from config import Config
+
+
+class WarmCache:
+    def __init__(self, name: str, ttl_seconds: int = None, cache_dir: str = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.WARM_CACHE_TTL_SECONDS
+        self.path = os.path.join(cache_dir or Config.WARM_CACHE_DIR, f"opsbot_{name}.json")
+        self._value = None
+        self._timestamp = None
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        """Get the cached value if it is still fresh (memory first, then the /tmp file)"""
+        if self._value is None:
+            self._load()
+
+        if self._value is None or time.time() - self._timestamp > self.ttl_seconds:
+            return None
+        return self._value
+
+    def set(self, value: Dict[str, Any]):
+        """Store a value in memory and persist it for the next invocation"""
+        self._value = value
+        self._timestamp = time.time()
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"timestamp": self._timestamp, "value": value}, f, default=str, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Failed to persist warm cache {self.name}: {e}")
+
+    def get_or_compute(self, compute: Callable[[], Dict[str, Any]],
+                       cache_if: Callable[[Dict[str, Any]], bool] = None) -> Dict[str, Any]:
+        """Return the cached value, or compute, store and return a fresh one"""
+        value = self.get()
+        if value is not None:
+            return dict(value, cache_age_seconds=round(self.age_seconds(), 1))
+
+        value = compute()
+        if cache_if is None or cache_if(value):
+            self.set(value)
+        return value
+
+    def age_seconds(self) -> Optional[float]:
+        """Get the age of the cached value in seconds"""
+        return time.time() - self._timestamp if self._timestamp else None
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                stored = json.load(f)
+            self._value = stored["value"]
+            self._timestamp = stored["timestamp"]
+        except (OSError, ValueError, KeyError):
+            self._value = None
+            self._timestamp = None
+
+
+# Shared aggregated scan result for the dashboard and ask handlers
+scan_cache = WarmCache("scan_summary")
+
+def get_scan_summary() -> Dict[str, Any]:
+    """Get the aggregated scan result, reusing the warm cache of this container"""
+    # Imported lazily so warm invocations never pay for the pandas/extractor imports
+    from file_scanner import file_scanner, compact_scan_result
+
+    def scan():
+        return compact_scan_result(file_scanner.scan_all_folders())
+
+    return scan_cache.get_or_compute(scan, cache_if=lambda result: result["data_source"] != "fallback")
@@ -51,15 +51,16 @@ export async function getDashboard() {
   return await apiRequest('/bot/dashboard');
 }
 
-// Get category details
-export async function getCategoryDetails(category) {
+// Get category details, one page at a time
+// options: { cursor, limit, fields, summary_only, file_id, sheet }
+export async function getCategoryDetails(category, options = {}) {
   if (!category) {
     throw new Error('Category is required');
   }
   
   return await apiRequest('/bot/category', {
     method: 'POST',
-    body: JSON.stringify({ category }),
+    body: JSON.stringify({ category, ...options }),
   });
 }
 